@@ -1,17 +1,33 @@
 # --- Standard imports ---
 import sys
-import pandas as pd
+import os
+import time
+_STARTUP_T0 = time.perf_counter()
 import matplotlib.pyplot as plt
 import numpy as np
 import json
+from functools import lru_cache
 from matplotlib.font_manager import FontProperties
+from xrd_core.startup import StartupProfiler, lazy_import
+# pandas is only needed once data is loaded or exported
+pd = lazy_import("pandas")
 big_caslon_path = "/System/Library/Fonts/Supplemental/BigCaslon.ttf"
-big_caslon_font = FontProperties(fname=big_caslon_path, size=40)
+
+
+@lru_cache(maxsize=None)
+def big_caslon_font():
+    """Title/label font, built on first use; the default family if Big Caslon (macOS) is missing."""
+    if os.path.exists(big_caslon_path):
+        return FontProperties(fname=big_caslon_path, size=40)
+    return FontProperties(size=40)
+
+
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QMainWindow, QPushButton, QVBoxLayout, QColorDialog, QFontDialog, QInputDialog,
     QFileDialog, QTabWidget, QHBoxLayout, QTableWidget, QTableWidgetItem, QMessageBox, QSizePolicy, QCheckBox,
     QLineEdit, QLabel, QFontComboBox, QDoubleSpinBox, QComboBox, QScrollArea, QDialog, QStatusBar
 )
+from PyQt5.QtCore import QTimer
 
 # --- Manuel XRD veri girişi dialogu ---
 class ManualDataEntryDialog(QDialog):
@@ -172,13 +188,12 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.ticker as ticker
 # --- Navigation Toolbar import ---
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT
-# --- Peak detection import ---
-from scipy.signal import find_peaks, savgol_filter
-from scipy import sparse
-from scipy.sparse.linalg import spsolve
-# --- AI trend analysis imports ---
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
+# --- Peak detection / smoothing (scipy.signal is executed on first use) ---
+signal = lazy_import("scipy.signal")
+# --- Shared analysis core (no Qt) ---
+(xrd_peaks, baseline, loaders, matching, export) = (
+    lazy_import(f"xrd_core.{name}") for name in ("peaks", "baseline", "loaders", "matching", "export"))
+# (sklearn is imported inside interpret_trend_ai, its only user)
 
 
 class RenkDegistirici(QMainWindow):
@@ -290,36 +305,9 @@ class RenkDegistirici(QMainWindow):
         x and y should be 1D arrays or Series.
         Returns a list of FWHM values (same order as peaks).
         """
-        fwhm_list = []
         x_vals = x.values if hasattr(x, "values") else np.array(x)
         y_vals = y.values if hasattr(y, "values") else np.array(y)
-        for peak_idx in peaks:
-            peak_x = x_vals[peak_idx]
-            peak_y = y_vals[peak_idx]
-            half_max = peak_y / 2.0
-            # Search to the left
-            left_idx = peak_idx
-            while left_idx > 0 and y_vals[left_idx] > half_max:
-                left_idx -= 1
-            # Interpolate x_left
-            if left_idx != peak_idx and y_vals[left_idx] != y_vals[left_idx+1]:
-                frac = (half_max - y_vals[left_idx]) / (y_vals[left_idx+1] - y_vals[left_idx])
-                x_left = x_vals[left_idx] + frac * (x_vals[left_idx+1] - x_vals[left_idx])
-            else:
-                x_left = x_vals[left_idx]
-            # Search to the right
-            right_idx = peak_idx
-            while right_idx < len(y_vals) - 1 and y_vals[right_idx] > half_max:
-                right_idx += 1
-            # Interpolate x_right
-            if right_idx != peak_idx and y_vals[right_idx] != y_vals[right_idx-1]:
-                frac = (half_max - y_vals[right_idx]) / (y_vals[right_idx-1] - y_vals[right_idx])
-                x_right = x_vals[right_idx] + frac * (x_vals[right_idx-1] - x_vals[right_idx])
-            else:
-                x_right = x_vals[right_idx]
-            fwhm = abs(x_right - x_left)
-            fwhm_list.append(fwhm)
-        return fwhm_list
+        return list(xrd_peaks.compute_fwhm(x_vals, y_vals, peaks))
 
     def export_peaks(self):
         try:
@@ -327,47 +315,16 @@ class RenkDegistirici(QMainWindow):
                 QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
                 return
 
-            x = self.df.iloc[:, 0]
-            y = self.df.iloc[:, 1]
-            peaks, _ = find_peaks(y, height=np.max(y) * 0.1)
+            x = self.df.iloc[:, 0].to_numpy(dtype=float)
+            y = self.df.iloc[:, 1].to_numpy(dtype=float)
+            peaks = xrd_peaks.find_relative_peaks(y, 0.1)
 
             if len(peaks) == 0:
                 QMessageBox.information(self, "Bilgi", "Hiç tepe noktası bulunamadı.")
                 return
 
-            # Compute FWHM for each peak
-            fwhm_values = self.compute_fwhm(x, y, peaks)
-
-            peak_positions = x.iloc[peaks].reset_index(drop=True)
-            peak_heights = y.iloc[peaks].reset_index(drop=True)
-            # PDF matching
-            matches = []
-            for theta in peak_positions:
-                matched = []
-                for phase, ref_peaks in self.pdf_db.items():
-                    for ref in ref_peaks:
-                        if abs(theta - ref) <= 0.3:
-                            matched.append(phase)
-                            break
-                matches.append(", ".join(matched) if matched else "-")
-
-            peak_df = pd.DataFrame({
-                "2θ": peak_positions,
-                "Intensity": peak_heights,
-                "FWHM": fwhm_values,
-                "PDF Match": matches
-            })
-
-            # Add crystallinity classification based on FWHM thresholds
-            crystallinity = []
-            for f in fwhm_values:
-                if f < 0.2:
-                    crystallinity.append("Highly Crystalline")
-                elif f < 0.5:
-                    crystallinity.append("Moderately Crystalline")
-                else:
-                    crystallinity.append("Poorly Crystalline")
-            peak_df["Crystallinity"] = crystallinity
+            # 2θ, d, Q, FWHM, PDF matches and crystallinity class
+            peak_df = export.peak_table(x, y, peaks, cards=self.pdf_db)
 
             save_path, _ = QFileDialog.getSaveFileName(self, "Tepe Noktalarını Kaydet", "", "CSV Files (*.csv)")
             if save_path:
@@ -628,11 +585,7 @@ class RenkDegistirici(QMainWindow):
         self.xrd_datasets = []
         self.control_rows = []
         # Load PDF database if available
-        try:
-            with open("pdf_cards.json", "r") as f:
-                self.pdf_db = json.load(f)
-        except FileNotFoundError:
-            self.pdf_db = {}
+        self.pdf_db = matching.load_cards("pdf_cards.json")
 
         # Basic inputs (defaults); user can change via UI later
         self.add_xrd_button = QPushButton("Veri Ekle")
@@ -753,9 +706,9 @@ class RenkDegistirici(QMainWindow):
         # else: start with an empty axes; user can add datasets later from the UI
 
         # Use explicit FontProperties for all axes labels and title
-        self.ax.set_title("XRD Pattern", fontproperties=big_caslon_font)
-        self.ax.set_xlabel("2θ (°)", fontproperties=big_caslon_font)
-        self.ax.set_ylabel("Intensity (a.u.)", fontproperties=big_caslon_font)
+        self.ax.set_title("XRD Pattern", fontproperties=big_caslon_font())
+        self.ax.set_xlabel("2θ (°)", fontproperties=big_caslon_font())
+        self.ax.set_ylabel("Intensity (a.u.)", fontproperties=big_caslon_font())
         # Filter legend so only valid labels are shown
         handles, labels = self.ax.get_legend_handles_labels()
         handles = [h for h, l in zip(handles, labels) if l and not l.startswith("_")]
@@ -890,7 +843,7 @@ class RenkDegistirici(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "Yeni XRD Dosyası", "", "Text Files (*.txt)")
         if file_path:
             try:
-                df = pd.read_csv(file_path, sep="\t", header=None)
+                df = loaders.read_xy_frame(file_path)
                 x = df.iloc[:, 0].values
                 y = df.iloc[:, 1].values
                 # Offset input
@@ -981,9 +934,9 @@ class RenkDegistirici(QMainWindow):
         xlabel = self.xlabel_input.text() if hasattr(self, "xlabel_input") else current_xlabel
         ylabel = self.ylabel_input.text() if hasattr(self, "ylabel_input") else current_ylabel
         # Use explicit FontProperties
-        self.ax.set_xlabel(xlabel, fontproperties=big_caslon_font)
-        self.ax.set_ylabel(ylabel, fontproperties=big_caslon_font)
-        self.ax.set_title(current_title, fontproperties=big_caslon_font)
+        self.ax.set_xlabel(xlabel, fontproperties=big_caslon_font())
+        self.ax.set_ylabel(ylabel, fontproperties=big_caslon_font())
+        self.ax.set_title(current_title, fontproperties=big_caslon_font())
         # Restore axis limits if possible
         if current_xlim is not None:
             self.ax.set_xlim(current_xlim)
@@ -1006,9 +959,9 @@ class RenkDegistirici(QMainWindow):
         xlabel = self.xlabel_input.text()
         ylabel = self.ylabel_input.text()
         # Use explicit FontProperties for style
-        self.ax.set_xlabel(xlabel, fontproperties=big_caslon_font)
-        self.ax.set_ylabel(ylabel, fontproperties=big_caslon_font)
-        self.ax.set_title("XRD Pattern", fontproperties=big_caslon_font)
+        self.ax.set_xlabel(xlabel, fontproperties=big_caslon_font())
+        self.ax.set_ylabel(ylabel, fontproperties=big_caslon_font())
+        self.ax.set_title("XRD Pattern", fontproperties=big_caslon_font())
         self.canvas.draw()
 
     def select_line_color(self):
@@ -1824,11 +1777,9 @@ class RenkDegistirici(QMainWindow):
     def dosya_yukle(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Dosya Seç", "", "Excel Files (*.xlsx *.xls);;Text Files (*.txt *.csv)")
         if filename:
+            self.df = loaders.read_table(filename)
             if filename.endswith(('.xlsx', '.xls')):
-                self.df = pd.read_excel(filename)
                 self.current_filename = filename.split("/")[-1]
-            else:
-                self.df = pd.read_csv(filename)
             self.update_graph_from_df()
 
     def update_graph_from_df(self):
@@ -1850,7 +1801,7 @@ class RenkDegistirici(QMainWindow):
                 self.ax.plot(x, y, '-', linewidth=2.0, label="XRD", color='blue')
                 if hasattr(self, 'peak_toggle') and self.peak_toggle.isChecked():
                     try:
-                        peaks, _ = find_peaks(y, height=50)
+                        peaks, _ = signal.find_peaks(y, height=50)
                         self.ax.plot(x.iloc[peaks] if hasattr(x, 'iloc') else x[peaks],
                                      (y.iloc[peaks] if hasattr(y, 'iloc') else y[peaks]),
                                      'ro', label='Detected Peaks')
@@ -1986,10 +1937,7 @@ class RenkDegistirici(QMainWindow):
     def load_comparison_file(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Dosya Seç (Karşılaştırma)", "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)")
         if filename:
-            if filename.endswith(('.xlsx', '.xls')):
-                compare_df = pd.read_excel(filename)
-            else:
-                compare_df = pd.read_csv(filename)
+            compare_df = loaders.read_table(filename)
             self.ax1.plot(compare_df['Time'], compare_df['Temperature'], '--', color='green', linewidth=2, label='Karşılaştırma Temp')
             self.ax2.plot(compare_df['Time'], compare_df['Displacement'], '--', color='purple', linewidth=2, label='Karşılaştırma Disp')
             self.canvas.draw()
@@ -2379,7 +2327,7 @@ class RenkDegistirici(QMainWindow):
             if not ok2:
                 return
             def fn(y):
-                return savgol_filter(y, window_length=win, polyorder=poly)
+                return signal.savgol_filter(y, window_length=win, polyorder=poly)
             target_idx = self._select_dataset_index()
             self._ensure_backup()
             if target_idx is None:
@@ -2400,15 +2348,7 @@ class RenkDegistirici(QMainWindow):
     # ---------- Arka plan çıkarma: Asymmetric Least Squares (ALS) ----------
     def _baseline_als(self, y, lam=1e5, p=0.01, niter=10):
         """Return baseline using Asymmetric Least Squares (Eilers & Boelens, 2005)."""
-        L = len(y)
-        D = sparse.diags([1, -2, 1], [0, -1, -2], shape=(L, L-2)).T
-        w = np.ones(L)
-        for _ in range(niter):
-            W = sparse.spdiags(w, 0, L, L)
-            Z = W + lam * (D.T @ D)
-            z = spsolve(Z, w * y)
-            w = p * (y > z) + (1 - p) * (y < z)
-        return z
+        return baseline.als(y, lam=lam, p=p, niter=niter)
 
     def preprocess_baseline_als(self):
         """Estimate baseline with ALS and subtract it. Also offer to show the baseline."""
@@ -2782,7 +2722,15 @@ class RenkDegistirici(QMainWindow):
 
 # Uygulamayı başlat
 if __name__ == "__main__":
+    # --profile-startup (or XRD_PROFILE_STARTUP=1) prints time-to-first-window to stderr
+    profiler = StartupProfiler.from_argv(_STARTUP_T0)
+    profiler.mark("içe aktarmalar")
     app = QApplication(sys.argv)
+    profiler.mark("QApplication")
     pencere = RenkDegistirici()
+    profiler.mark("pencere kuruldu")
     pencere.show()
+    if profiler.enabled:
+        # runs after the first pass of the event loop, i.e. once the window has been painted
+        QTimer.singleShot(0, lambda: (profiler.mark("ilk pencere görüntülendi"), profiler.report()))
     sys.exit(app.exec_())
@@ -1,14 +1,22 @@
 # --- Standard imports ---
+import os
 import sys
-import pandas as pd
+import time
+_STARTUP_T0 = time.perf_counter()
 import matplotlib.pyplot as plt
 import numpy as np
 import json
+from xrd_core.startup import StartupProfiler, lazy_import
+# pandas is only needed once data is loaded or exported
+pd = lazy_import("pandas")
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QMainWindow, QPushButton, QVBoxLayout, QColorDialog, QFontDialog, QInputDialog,
     QFileDialog, QTabWidget, QHBoxLayout, QTableWidget, QTableWidgetItem, QMessageBox, QSizePolicy, QCheckBox,
-    QLineEdit, QLabel, QDoubleSpinBox, QComboBox, QScrollArea, QDialog, QStatusBar
+    QLineEdit, QLabel, QDoubleSpinBox, QComboBox, QScrollArea, QDialog, QStatusBar, QListWidget,
+    QProgressDialog, QSlider, QTableView, QAbstractItemView, QHeaderView, QShortcut
 )
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor, QKeySequence
 
 # --- Manuel XRD veri girişi dialogu ---
 class ManualDataEntryDialog(QDialog):
@@ -169,13 +177,553 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.ticker as ticker
 # --- Navigation Toolbar import ---
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT
-# --- Peak detection import ---
-from scipy.signal import find_peaks, savgol_filter
-from scipy import sparse
-from scipy.sparse.linalg import spsolve
-# --- AI trend analysis imports ---
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
+# --- Shared analysis kernels (scipy-backed modules are executed on first use) ---
+(xrd_peaks, axes, microstructure, tracking, kalpha, refine, baseline, recipe, parallel, preview, history,
+ loaders, matching, export, stack, tables, sintering) = (
+    lazy_import(f"xrd_core.{name}") for name in (
+        "peaks", "axes", "microstructure", "tracking", "kalpha", "refine", "baseline", "recipe", "parallel",
+        "preview", "history", "loaders", "matching", "export", "stack", "tables", "sintering"))
+from xrd_core.dataset import Dataset
+from xrd_core.ranges import range_indices, range_view
+from xrd_core.annotations import PeakAnnotationLayer
+# (sklearn is imported inside interpret_trend_ai, its only user)
+
+
+# --- Canlı önizleme: arka planda tek adım hesaplayan iş parçacığı ---
+class PreviewWorker(QThread):
+    """Runs one preview stage off the GUI thread; emits (generation, result or exception)."""
+    done = pyqtSignal(int, int, object)
+
+    def __init__(self, gen, stage, x, y, step, meta, xlim, max_points):
+        super().__init__()
+        self.gen, self.stage = gen, stage
+        self.args = (x, y, step, meta, xlim, max_points)
+
+    def run(self):
+        try:
+            res = preview.preview_step(*self.args)
+        except Exception as e:
+            res = e
+        self.done.emit(self.gen, self.stage, res)
+
+
+class RefineWorker(QThread):
+    """Runs refine.refine_series off the GUI thread; progress is emitted in 1/1000 steps and
+    done carries the results, the exception, or None when cancelled."""
+    progress = pyqtSignal(int)
+    done = pyqtSignal(object)
+
+    def __init__(self, scans, kwargs):
+        super().__init__()
+        self.scans, self.kwargs = scans, kwargs
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _progress(self, fraction):
+        self.progress.emit(int(fraction * 1000))
+        return not self._cancelled
+
+    def run(self):
+        try:
+            res = refine.refine_series(self.scans, progress=self._progress, **self.kwargs)
+        except Exception as e:
+            res = e
+        self.done.emit(None if self._cancelled else res)
+
+
+class PreprocessPreviewDialog(QDialog):
+    """Slider panel for smoothing / baseline parameters with a debounced two-stage preview:
+    a decimated copy of the visible range first, then the full-resolution scan. The
+    background and the corrected curve are drawn as overlays; data change only on Apply."""
+
+    # (param, label, min, max, default, kind) — kind: odd / int / log / choice
+    PARAM_SPECS = {
+        "savgol": [("window", "Pencere", 3, 301, 11, "odd"), ("polyorder", "Polinom derecesi", 1, 7, 3, "int")],
+        "als": [("lam", "λ", 1e2, 1e9, 1e5, "log"), ("p", "p", 1e-3, 0.5, 0.01, "log"),
+                ("niter", "niter", 5, 50, 10, "int")],
+        "arpls": [("lam", "λ", 1e2, 1e9, 1e5, "log"), ("niter", "En fazla iterasyon", 5, 500, 50, "int")],
+        "airpls": [("lam", "λ", 1e2, 1e9, 1e5, "log"), ("niter", "En fazla iterasyon", 3, 100, 15, "int")],
+        "rolling": [("window", "Pencere", 5, 2001, 101, "odd"), ("method", "Yöntem", 0, 0, "min",
+                                                                ("min", "median", "opening"))],
+    }
+    LOG_STEPS = 100     # slider positions per decade
+    PREVIEW_POINTS = 2000
+    DEBOUNCE_MS = 150
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.win = parent
+        self.setWindowTitle("Canlı Önizleme")
+        self._gen = 0
+        self._wanted = False  # a preview of the current parameters is still wanted
+        self._worker = None
+        self._running = set()  # workers kept referenced until their thread has finished
+        self._artists = []
+        self._controls = {}
+
+        if getattr(parent, "xrd_datasets", None):
+            self.entries = list(parent.xrd_datasets)
+            names = [d.get("filename", f"Dataset {i}") for i, d in enumerate(self.entries)]
+        else:
+            self.entries, names = [None], ["Ana veri"]
+
+        vbox = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.target_combo = QComboBox()
+        self.target_combo.addItems(names)
+        self.op_combo = QComboBox()
+        for op in self.PARAM_SPECS:
+            self.op_combo.addItem(recipe.STEPS[op][1], op)
+        top.addWidget(QLabel("Veri:"))
+        top.addWidget(self.target_combo)
+        top.addWidget(QLabel("İşlem:"))
+        top.addWidget(self.op_combo)
+        vbox.addLayout(top)
+        self.param_box = QVBoxLayout()
+        vbox.addLayout(self.param_box)
+        self.status = QLabel("")
+        vbox.addWidget(self.status)
+        h = QHBoxLayout()
+        btn_apply = QPushButton("Uygula")
+        btn_close = QPushButton("Kapat")
+        h.addStretch()
+        h.addWidget(btn_apply)
+        h.addWidget(btn_close)
+        vbox.addLayout(h)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start_preview)
+        self.op_combo.currentIndexChanged.connect(self._build_controls)
+        self.target_combo.currentIndexChanged.connect(lambda _: self._schedule())
+        btn_apply.clicked.connect(self.apply)
+        btn_close.clicked.connect(self.close)
+        self._build_controls()
+        self.resize(520, 260)
+
+    # --- parameter controls ---
+    def _build_controls(self, *_):
+        while self.param_box.count():
+            row = self.param_box.takeAt(0).layout()
+            while row is not None and row.count():
+                w = row.takeAt(0).widget()
+                if w is not None:
+                    w.deleteLater()
+        self._controls = {}
+        for name, label, lo, hi, default, kind in self.PARAM_SPECS[self.op_combo.currentData()]:
+            row = QHBoxLayout()
+            row.addWidget(QLabel(label))
+            value_label = QLabel()
+            value_label.setMinimumWidth(70)
+            if isinstance(kind, tuple):
+                widget = QComboBox()
+                widget.addItems(kind)
+                widget.setCurrentText(default)
+                widget.currentIndexChanged.connect(self._on_change)
+            else:
+                widget = QSlider(Qt.Horizontal)
+                if kind == "log":
+                    widget.setRange(int(round(np.log10(lo) * self.LOG_STEPS)), int(round(np.log10(hi) * self.LOG_STEPS)))
+                    widget.setValue(int(round(np.log10(default) * self.LOG_STEPS)))
+                elif kind == "odd":
+                    widget.setRange(lo // 2, hi // 2)
+                    widget.setValue(default // 2)
+                else:
+                    widget.setRange(lo, hi)
+                    widget.setValue(default)
+                widget.valueChanged.connect(self._on_change)
+            row.addWidget(widget, 1)
+            row.addWidget(value_label)
+            self.param_box.addLayout(row)
+            self._controls[name] = (widget, kind, value_label)
+        self._on_change()
+
+    def params(self):
+        out = {}
+        for name, (widget, kind, value_label) in self._controls.items():
+            if isinstance(kind, tuple):
+                v = widget.currentText()
+                text = v
+            elif kind == "log":
+                v = float(10 ** (widget.value() / self.LOG_STEPS))
+                text = f"{v:.3g}"
+            elif kind == "odd":
+                v = 2 * widget.value() + 1
+                text = str(v)
+            else:
+                v = widget.value()
+                text = str(v)
+            value_label.setText(text)
+            out[name] = v
+        return out
+
+    def step(self):
+        return recipe.make_step(self.op_combo.currentData(), **self.params())
+
+    # --- preview ---
+    def _on_change(self, *_):
+        self.params()  # refresh value labels immediately
+        self._schedule()
+
+    def _schedule(self):
+        self._timer.start()
+
+    def _target(self):
+        d = self.entries[self.target_combo.currentIndex()]
+        df = self.win.df if d is None else d.df
+        meta = getattr(self.win, "main_meta", None) if d is None else d.meta
+        offset = 0.0 if d is None else d.offset
+        return d, df, meta, offset
+
+    def _start_preview(self):
+        self._gen += 1
+        self._wanted = True
+        if self._worker is None or not self._worker.isRunning():
+            self._launch(1)
+        # otherwise the running stage sees a stale generation when it finishes and relaunches
+
+    def _launch(self, stage):
+        _, df, meta, _ = self._target()
+        if df is None or df.empty:
+            return
+        x = df.iloc[:, 0].to_numpy(dtype=float)
+        y = df.iloc[:, 1].to_numpy(dtype=float)
+        if stage == 1:
+            xlim, max_points = self.win.ax.get_xlim(), self.PREVIEW_POINTS
+            self.status.setText("Önizleme hesaplanıyor...")
+        else:
+            xlim, max_points = None, None
+            self.status.setText("Tam çözünürlük hesaplanıyor...")
+        worker = PreviewWorker(self._gen, stage, x, y, self.step(), meta, xlim, max_points)
+        worker.done.connect(self._on_done)
+        # done is emitted from run(), so the thread may still be finishing when the next
+        # stage replaces self._worker; hold it until finished so it is never destroyed running
+        self._running.add(worker)
+        worker.finished.connect(lambda w=worker: self._running.discard(w))
+        self._worker = worker
+        worker.start()
+
+    def _on_done(self, gen, stage, res):
+        if gen != self._gen:
+            if self._wanted:
+                self._launch(1)
+            return
+        if isinstance(res, Exception):
+            self.status.setText(f"Hata: {res}")
+            return
+        self._draw(*res)
+        if stage == 1:
+            self._launch(2)
+        else:
+            self._wanted = False
+            self.status.setText("Önizleme hazır (tam çözünürlük).")
+
+    def _clear_overlays(self):
+        for a in self._artists:
+            try:
+                a.remove()
+            except Exception:
+                pass
+        self._artists = []
+
+    def _draw(self, x, bg, corrected):
+        _, _, _, offset = self._target()
+        self._clear_overlays()
+        ax = self.win.ax
+        if bg is not None:
+            self._artists += ax.plot(x, bg + offset, '--', color='gray', linewidth=1.2, label='_preview_bg')
+        self._artists += ax.plot(x, corrected + offset, '-', color='tab:red', linewidth=1.0, alpha=0.8,
+                                 label='_preview')
+        self.win.canvas.draw_idle()
+
+    # --- apply / close ---
+    def apply(self):
+        d, df, _, _ = self._target()
+        if df is None:
+            return
+        try:
+            self._timer.stop()
+            self._gen += 1
+            self._wanted = False
+            self._artists = []  # the redraw below clears the axes
+            self.win._add_preprocess_step(self.step(), [d])
+            self.status.setText("Uygulandı.")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Ön işleme uygulanamadı:\n{e}")
+
+    def closeEvent(self, event):
+        self._timer.stop()
+        self._gen += 1
+        self._wanted = False
+        for worker in list(self._running):
+            worker.wait()
+        self._clear_overlays()
+        self.win.canvas.draw_idle()
+        super().closeEvent(event)
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """Editable table over a (rows, columns) float array. Text is produced only for the
+    cells the view draws; edits are written straight into the array."""
+
+    def __init__(self, values, headers, parent=None):
+        super().__init__(parent)
+        self.values = np.array(values, dtype=float)  # own writable copy of the scan
+        self.headers = list(headers)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.values.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.values.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return tables.format_value(self.values[index.row(), index.column()], full=role == Qt.EditRole)
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return self.headers[section] if orientation == Qt.Horizontal else str(section + 1)
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        v = tables.parse_number(value)
+        if role != Qt.EditRole or not index.isValid() or v is None:
+            return False
+        self.values[index.row(), index.column()] = v
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    # --- bulk edits ---
+    def insert_rows(self, row, count=1):
+        """count empty (NaN) rows before row."""
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        self.values = np.insert(self.values, [row] * count, np.nan, axis=0)
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        if not len(rows):
+            return
+        self.beginResetModel()
+        self.values = np.delete(self.values, rows, axis=0)
+        self.endResetModel()
+
+    def write_block(self, row, col, block):
+        """Paste a 2D block with its top-left cell at (row, col); rows are appended as needed,
+        columns beyond the table are dropped."""
+        block = block[:, :self.values.shape[1] - col]
+        if not block.size:
+            return
+        missing = row + block.shape[0] - self.values.shape[0]
+        if missing > 0:
+            self.insert_rows(self.values.shape[0], missing)
+        self.values[row:row + block.shape[0], col:col + block.shape[1]] = block
+        self._changed(row, col, row + block.shape[0] - 1, col + block.shape[1] - 1)
+
+    def apply_operation(self, mask, op, operand):
+        """Fill (op "=") or + - * / every selected cell at once."""
+        bounds = tables.mask_bounds(mask)
+        if bounds is None:
+            return
+        tables.apply_operation(self.values, mask, op, operand)
+        self._changed(*bounds)
+
+    def _changed(self, top, left, bottom, right):
+        self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [Qt.DisplayRole, Qt.EditRole])
+
+
+class FrameTableModel(QAbstractTableModel):
+    """Editable view of a DataFrame. Edits only go into an EditLog (dirty cells, shown
+    highlighted) until the log is committed; cells are formatted only when drawn."""
+
+    DIRTY_COLOR = "#fff3b0"
+
+    def __init__(self, df, log, parent=None):
+        super().__init__(parent)
+        self.df = df
+        self.log = log
+        self._cols = {}  # column position -> numpy values, rebuilt after a commit
+
+    def _column(self, c):
+        col = self._cols.get(c)
+        if col is None:
+            col = self._cols[c] = self.df.iloc[:, c].to_numpy()
+        return col
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.df)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.df.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r, c = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            text = self.log.get(r, c)
+            return text if text is not None else tables.format_cell(self._column(c)[r])
+        if role == Qt.BackgroundRole and (r, c) in self.log.pending:
+            return QColor(self.DIRTY_COLOR)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return str(self.df.columns[section]) if orientation == Qt.Horizontal else str(section + 1)
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        self.log.set(index.row(), index.column(), value)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.BackgroundRole])
+        return True
+
+    def set_frame(self, df):
+        """Show another frame of the same shape (the rebuilt view after a raw-data edit)."""
+        self.df = df
+        self._cols.clear()
+
+    def refresh(self):
+        """Re-read the frame after a commit."""
+        self._cols.clear()
+        if self.rowCount() and self.columnCount():
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+
+class ArrayTableDialog(QDialog):
+    """Data table editor over an ArrayTableModel: paste / copy blocks, fill and arithmetic on
+    the selection, row insert/delete. on_apply(values) receives the edited array."""
+
+    def __init__(self, parent, title, values, on_apply, headers=("X", "Y")):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.on_apply = on_apply
+        self.model = ArrayTableModel(values, headers, self)
+        vbox = QVBoxLayout(self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # fixed row height: the view never measures rows it does not show
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(self.view.fontMetrics().height() + 6)
+        vbox.addWidget(self.view)
+        for keys, slot in ((QKeySequence.Paste, self.paste), (QKeySequence.Copy, self.copy),
+                           (QKeySequence.Delete, self.clear_selection)):
+            QShortcut(keys, self.view, slot, context=Qt.WidgetShortcut)
+
+        h = QHBoxLayout()
+        buttons = [("Satır Ekle", self.add_row), ("Seçili Üstüne Ekle", self.insert_row_above),
+                   ("Seçili Satır(ları) Sil", self.delete_selected_rows), ("Sütun Ekle", self.add_column_warn),
+                   ("Yapıştır", self.paste), ("Doldur...", self.fill_selection),
+                   ("Aritmetik...", self.arithmetic_on_selection), ("Uygula", self.apply), ("Kapat", self.close)]
+        h.addStretch()
+        for label, slot in buttons:
+            btn = QPushButton(label)
+            btn.clicked.connect(slot)
+            h.addWidget(btn)
+        vbox.addLayout(h)
+        self.resize(900, 600)
+
+    def selection_mask(self):
+        """Boolean (rows, columns) mask of the selected cells, built from the selection ranges."""
+        mask = np.zeros(self.model.values.shape, dtype=bool)
+        for rng in self.view.selectionModel().selection():
+            mask[rng.top():rng.bottom() + 1, rng.left():rng.right() + 1] = True
+        return mask
+
+    def _anchor(self, mask):
+        bounds = tables.mask_bounds(mask)
+        if bounds is not None:
+            return bounds[0], bounds[1]
+        cur = self.view.currentIndex()
+        return (cur.row(), cur.column()) if cur.isValid() else (0, 0)
+
+    def add_row(self):
+        self.model.insert_rows(self.model.rowCount())
+        self.view.scrollToBottom()
+
+    def insert_row_above(self):
+        rows = np.flatnonzero(self.selection_mask().any(axis=1))
+        if not rows.size:
+            self.add_row()
+            return
+        self.model.insert_rows(int(rows[0]))
+
+    def delete_selected_rows(self):
+        self.model.remove_rows(np.flatnonzero(self.selection_mask().any(axis=1)))
+
+    def add_column_warn(self):
+        QMessageBox.information(self, "Bilgi",
+                                "XRD veri tablosunda sadece 2 sütun (X ve Y) desteklenir.\n"
+                                "Sütun ekleme XRD modunda devre dışıdır.")
+
+    def paste(self):
+        block = tables.parse_block(QApplication.clipboard().text())
+        if not block.size:
+            return
+        mask = self.selection_mask()
+        if block.shape == (1, 1) and mask.sum() > 1:
+            # one value onto a multi-cell selection fills it
+            self.model.apply_operation(mask, "=", block[0, 0])
+            return
+        row, col = self._anchor(mask)
+        self.model.write_block(row, col, block)
+
+    def copy(self):
+        bounds = tables.mask_bounds(self.selection_mask())
+        if bounds is not None:
+            top, left, bottom, right = bounds
+            QApplication.clipboard().setText(tables.format_block(self.model.values[top:bottom + 1, left:right + 1]))
+
+    def clear_selection(self):
+        self.model.apply_operation(self.selection_mask(), "=", np.nan)
+
+    def fill_selection(self):
+        mask = self.selection_mask()
+        if not mask.any():
+            QMessageBox.warning(self, "Uyarı", "Önce hücre seçin.")
+            return
+        value, ok = QInputDialog.getDouble(self, "Doldur", "Seçili hücrelere yazılacak değer:", 0.0, -1e12, 1e12, 6)
+        if ok:
+            self.model.apply_operation(mask, "=", value)
+
+    def arithmetic_on_selection(self):
+        mask = self.selection_mask()
+        if not mask.any():
+            QMessageBox.warning(self, "Uyarı", "Önce hücre seçin.")
+            return
+        labels = [label for _, label in tables.OPERATIONS.values()]
+        label, ok = QInputDialog.getItem(self, "Aritmetik", "İşlem:", labels, 0, False)
+        if not ok:
+            return
+        op = list(tables.OPERATIONS)[labels.index(label)]
+        operand, ok = QInputDialog.getDouble(self, "Aritmetik", f"{label} değeri:", 1.0, -1e12, 1e12, 6)
+        if ok:
+            self.model.apply_operation(mask, op, operand)
+
+    def apply(self):
+        try:
+            self.on_apply(self.model.values.copy())
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Tablo uygulanamadı:\n{e}")
+            return
+        self.close()
 
 
 class RenkDegistirici(QMainWindow):
@@ -195,21 +743,16 @@ class RenkDegistirici(QMainWindow):
                 name = f"{base_name}-{counter}"
                 counter += 1
 
-            new_entry = {
-                "filename": name,
-                "df": dlg.result_df.copy(),
-                "offset": dlg.result_offset,
-                "color": getattr(dlg, "result_color", "#1f77b4"),
-                "orig_df": dlg.result_df.copy()
-            }
+            new_entry = Dataset.from_frame(name, dlg.result_df, offset=dlg.result_offset,
+                                           color=getattr(dlg, "result_color", "#1f77b4"))
             self.xrd_datasets.append(new_entry)
 
             # Kontrol paneline satır ekle
             if hasattr(self, "add_control_row"):
-                self.add_control_row(new_entry["filename"], new_entry["offset"], new_entry["color"])
+                self.add_control_row(new_entry.name, new_entry.offset, new_entry.color)
             # Yeniden çiz
             self.redraw_plot()
-            QMessageBox.information(self, "Eklendi", f"'{new_entry['filename']}' dataset'i eklendi.")
+            QMessageBox.information(self, "Eklendi", f"'{new_entry.name}' dataset'i eklendi.")
     def set_title_alignment(self):
         alignment, ok = QInputDialog.getItem(
             self,
@@ -263,6 +806,8 @@ class RenkDegistirici(QMainWindow):
             "     * λ ↑ ⇒ daha düz taban; tipik 1e5–1e7. p küçük (≈0.001–0.05) ⇒ tepe koruması artar.\n"
             "   - Arka Plan Çıkar (Rolling Min/Median): Pencere nokta sayısı verin, yöntem Min/Median.\n"
             "     * Amorf/fluoresans zemini takip etmek için geniş pencere kullanın.\n"
+            "   - Kα2 Çıkar (Rachinger): Kα1/Kα2 dubletlerini tekli tepeye indirger; dalga boyları\n"
+            "     tarama metadata'sından, yoksa seçilen anottan alınır.\n"
             "   - Arka Planı Göster/Gizle: Çıkarılan tabanı kesik gri eğri olarak aç/kapatır.\n"
             "   - Orijinale Dön: Tüm ön işlemleri geri alır.\n"
             "\n"
@@ -287,36 +832,9 @@ class RenkDegistirici(QMainWindow):
         x and y should be 1D arrays or Series.
         Returns a list of FWHM values (same order as peaks).
         """
-        fwhm_list = []
         x_vals = x.values if hasattr(x, "values") else np.array(x)
         y_vals = y.values if hasattr(y, "values") else np.array(y)
-        for peak_idx in peaks:
-            peak_x = x_vals[peak_idx]
-            peak_y = y_vals[peak_idx]
-            half_max = peak_y / 2.0
-            # Search to the left
-            left_idx = peak_idx
-            while left_idx > 0 and y_vals[left_idx] > half_max:
-                left_idx -= 1
-            # Interpolate x_left
-            if left_idx != peak_idx and y_vals[left_idx] != y_vals[left_idx+1]:
-                frac = (half_max - y_vals[left_idx]) / (y_vals[left_idx+1] - y_vals[left_idx])
-                x_left = x_vals[left_idx] + frac * (x_vals[left_idx+1] - x_vals[left_idx])
-            else:
-                x_left = x_vals[left_idx]
-            # Search to the right
-            right_idx = peak_idx
-            while right_idx < len(y_vals) - 1 and y_vals[right_idx] > half_max:
-                right_idx += 1
-            # Interpolate x_right
-            if right_idx != peak_idx and y_vals[right_idx] != y_vals[right_idx-1]:
-                frac = (half_max - y_vals[right_idx]) / (y_vals[right_idx-1] - y_vals[right_idx])
-                x_right = x_vals[right_idx] + frac * (x_vals[right_idx-1] - x_vals[right_idx])
-            else:
-                x_right = x_vals[right_idx]
-            fwhm = abs(x_right - x_left)
-            fwhm_list.append(fwhm)
-        return fwhm_list
+        return list(xrd_peaks.compute_fwhm(x_vals, y_vals, peaks))
 
     def export_peaks(self):
         try:
@@ -324,47 +842,18 @@ class RenkDegistirici(QMainWindow):
                 QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
                 return
 
-            x = self.df.iloc[:, 0]
-            y = self.df.iloc[:, 1]
-            peaks, _ = find_peaks(y, height=np.max(y) * 0.1)
+            rows = self._theta_slice(self.df)
+            x = self.df.iloc[rows, 0]
+            y = self.df.iloc[rows, 1]
+            peaks = self._detect_peaks(y.to_numpy(dtype=float))
 
             if len(peaks) == 0:
                 QMessageBox.information(self, "Bilgi", "Hiç tepe noktası bulunamadı.")
                 return
 
-            # Compute FWHM for each peak
-            fwhm_values = self.compute_fwhm(x, y, peaks)
-
-            peak_positions = x.iloc[peaks].reset_index(drop=True)
-            peak_heights = y.iloc[peaks].reset_index(drop=True)
-            # PDF matching
-            matches = []
-            for theta in peak_positions:
-                matched = []
-                for phase, ref_peaks in self.pdf_db.items():
-                    for ref in ref_peaks:
-                        if abs(theta - ref) <= 0.3:
-                            matched.append(phase)
-                            break
-                matches.append(", ".join(matched) if matched else "-")
-
-            peak_df = pd.DataFrame({
-                "2θ": peak_positions,
-                "Intensity": peak_heights,
-                "FWHM": fwhm_values,
-                "PDF Match": matches
-            })
-
-            # Add crystallinity classification based on FWHM thresholds
-            crystallinity = []
-            for f in fwhm_values:
-                if f < 0.2:
-                    crystallinity.append("Highly Crystalline")
-                elif f < 0.5:
-                    crystallinity.append("Moderately Crystalline")
-                else:
-                    crystallinity.append("Poorly Crystalline")
-            peak_df["Crystallinity"] = crystallinity
+            # 2θ, d, Q, FWHM, PDF matches (at equal d-spacing) and crystallinity class
+            peak_df = export.peak_table(x.to_numpy(dtype=float), y.to_numpy(dtype=float), peaks,
+                                        cards=self.pdf_db, wavelength=axes.wavelength_of(self._dataset_meta(None)))
 
             save_path, _ = QFileDialog.getSaveFileName(self, "Tepe Noktalarını Kaydet", "", "CSV Files (*.csv)")
             if save_path:
@@ -373,17 +862,560 @@ class RenkDegistirici(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Tepe noktaları dışa aktarılırken hata oluştu:\n{str(e)}")
 
+    def export_dataset_stack(self):
+        """Write every dataset as one wide table: 2θ followed by one intensity column per scan."""
+        try:
+            names, scans = self._analysis_scans()
+            if not scans:
+                QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+                return
+            st = stack.DatasetStack.from_scans(scans, names)
+            if not np.array_equal(st.x, scans[0][0]):
+                QMessageBox.information(self, "Bilgi", "Taramalar farklı 2θ ızgaralarında; ortak aralığa "
+                                        f"yeniden örneklendi ({st.x[0]:.3f}–{st.x[-1]:.3f}°, {len(st.x)} nokta).")
+            save_path, _ = QFileDialog.getSaveFileName(self, "Datasetleri Kaydet", "", "CSV Files (*.csv)")
+            if save_path:
+                st.to_frame().to_csv(save_path, index=False)
+                QMessageBox.information(self, "Başarılı", "Datasetler kaydedildi.")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Datasetler dışa aktarılamadı:\n{e}")
+
+    AXIS_UNITS = {"2θ (°)": "2theta", "d-aralığı (Å)": "d", "Q (Å⁻¹)": "q"}
+
+    def set_axis_unit(self):
+        """Plot the XRD datasets against 2θ, d or Q (each with its own wavelength)."""
+        try:
+            names = list(self.AXIS_UNITS)
+            idx = list(self.AXIS_UNITS.values()).index(self.axis_unit)
+            choice, ok = QInputDialog.getItem(self, "Eksen Birimi", "X ekseni:", names, idx, False)
+            if not ok:
+                return
+            self.axis_unit = self.AXIS_UNITS[choice]
+            if hasattr(self, "xlabel_input"):
+                self.xlabel_input.setText(axes.UNITS[self.axis_unit])
+            self.update_graph_from_df()
+            if hasattr(self, "ax"):
+                self._fit_view_to_range()
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Eksen birimi değiştirilemedi:\n{e}")
+
+    def set_dataset_wavelength(self):
+        """Set the anode (or a synchrotron wavelength) of datasets; used for d/Q axes and matching."""
+        try:
+            items = list(kalpha.ANODES) + ["Özel (sinkrotron)"]
+            choice, ok = QInputDialog.getItem(self, "Dalga Boyu", "Kaynak:", items, 0, False)
+            if not ok:
+                return
+            wavelength = None
+            if choice not in kalpha.ANODES:
+                wavelength, ok = QInputDialog.getDouble(self, "Dalga Boyu", "λ (Å):", 0.7293, 0.01, 5.0, 5)
+                if not ok:
+                    return
+            targets = self._preprocess_targets()
+            if targets is None:
+                return
+            for d in targets:
+                meta = self._scan_meta(d)
+                for k in ("anode", "ka1", "ka2", "wavelength"):
+                    meta.pop(k, None)
+                if wavelength is None:
+                    meta["anode"] = choice
+                else:
+                    meta["wavelength"] = wavelength
+            # metadata is part of the recipe keys (Kα2 stripping uses the anode lines)
+            self._refresh_datasets([d for d in targets if self._recipe_of(d)])
+            self.update_graph_from_df()
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Dalga boyu ayarlanamadı:\n{e}")
+
+    NORMALIZATION_MODES = {"Yok (ham yoğunluk)": None,
+                           "Maksimum = 1": "max",
+                           "Alan = 1 (2θ aralığı)": "area",
+                           "İç standart yansıması": "internal"}
+
+    def set_normalization(self):
+        """Normalize every XRD dataset for display: to max, to area over a 2θ range, or to an
+        internal-standard reflection. Offsets from the control panel are added afterwards."""
+        try:
+            if not self.xrd_datasets:
+                QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+                return
+            names = list(self.NORMALIZATION_MODES)
+            current = (self.normalization or {}).get("mode")
+            idx = next((i for i, n in enumerate(names) if self.NORMALIZATION_MODES[n] == current), 0)
+            choice, ok = QInputDialog.getItem(self, "Normalizasyon", "Yöntem:", names, idx, False)
+            if not ok:
+                return
+            mode = self.NORMALIZATION_MODES[choice]
+            norm = None
+            if mode == "max":
+                norm = {"mode": "max"}
+            elif mode == "area":
+                x_all = np.concatenate([d.x for d in self.xrd_datasets])
+                lo, ok = QInputDialog.getDouble(self, "Alan Normalizasyonu", "2θ başlangıç (°):",
+                                                float(np.nanmin(x_all)), -360.0, 360.0, 3)
+                if not ok:
+                    return
+                hi, ok = QInputDialog.getDouble(self, "Alan Normalizasyonu", "2θ bitiş (°):",
+                                                float(np.nanmax(x_all)), -360.0, 360.0, 3)
+                if not ok:
+                    return
+                norm = {"mode": "area", "xrange": [lo, hi]}
+            elif mode == "internal":
+                ref, ok = QInputDialog.getDouble(self, "İç Standart", "Yansımanın 2θ konumu (°):",
+                                                 28.44, 0.0, 180.0, 3)
+                if not ok:
+                    return
+                win, ok = QInputDialog.getDouble(self, "İç Standart", "Arama penceresi ± (°):",
+                                                 0.3, 0.01, 5.0, 2)
+                if not ok:
+                    return
+                norm = {"mode": "internal", "ref": ref, "ref_window": win}
+            previous, self.normalization = self.normalization, norm
+            try:
+                self._normalized_values(strict=True)
+            except Exception:
+                self.normalization = previous
+                raise
+            # normalized curves live on a different scale than the previous view
+            self.redraw_plot(autoscale_y=norm != previous)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Normalizasyon uygulanamadı:\n{e}")
+
+    def _normalized_values(self, strict=False):
+        """Intensity arrays of xrd_datasets as drawn. Scans on one 2θ grid are normalized in
+        one stacked call; the result is kept until a dataset frame is replaced or the settings
+        change. A group that cannot be normalized (e.g. range outside the scan) stays raw
+        unless strict."""
+        norm = self.normalization
+        if not norm:
+            return [d.y for d in self.xrd_datasets]
+        # dataset arrays are replaced, never modified, so identity tells whether data changed
+        key = [d.y for d in self.xrd_datasets]
+        cached = self._norm_cache
+        if (cached is not None and cached[0] == norm and len(cached[1]) == len(key)
+                and all(a is b for a, b in zip(cached[1], key))):
+            return cached[2]
+        xs = [d.x for d in self.xrd_datasets]
+        ys = list(key)
+        params = {k: v for k, v in norm.items() if k != "mode"}
+        for idx in stack.group_by_grid(xs):
+            st = stack.DatasetStack(xs[idx[0]], np.vstack([ys[i] for i in idx]))
+            try:
+                st = st.normalize(norm["mode"], **params)
+            except ValueError:
+                if strict:
+                    raise
+                continue
+            for i, y in zip(idx, st.Y):
+                ys[i] = y
+        self._norm_cache = (dict(norm), key, ys)
+        return ys
+
+    PEAK_MODES = {"Gürültü Uyarlamalı (MAD)": "adaptive",
+                  "Çok Ölçekli (2. türev)": "multiscale",
+                  "Eşik (%10 maksimum)": "threshold"}
+
+    def set_peak_detection(self):
+        """Choose the peak detector and its signal-to-noise threshold."""
+        names = list(self.PEAK_MODES)
+        current = [k for k, v in self.PEAK_MODES.items() if v == getattr(self, "peak_detect_mode", "adaptive")]
+        idx = names.index(current[0]) if current else 0
+        choice, ok = QInputDialog.getItem(self, "Tepe Algılama", "Yöntem:", names, idx, False)
+        if not ok:
+            return
+        mode = self.PEAK_MODES[choice]
+        if mode != "threshold":
+            snr, ok2 = QInputDialog.getDouble(self, "Tepe Algılama", "S/N eşiği (gürültü σ katı):",
+                                              getattr(self, "peak_snr", 5.0), 1.0, 100.0, 1)
+            if not ok2:
+                return
+            self.peak_snr = snr
+        self.peak_detect_mode = mode
+        if hasattr(self, 'peak_toggle') and self.peak_toggle.isChecked():
+            self.update_graph_from_df()
+
+    def set_peak_label_limit(self):
+        """Maximum number of peak labels drawn for the visible 2θ range."""
+        n, ok = QInputDialog.getInt(self, "Tepe Etiketleri", "En fazla etiket sayısı:",
+                                    getattr(self, "peak_label_limit", 25), 1, 500, 1)
+        if not ok:
+            return
+        self.peak_label_limit = n
+        if getattr(self, "peak_labels", None) is not None:
+            self.peak_labels.set_max_labels(n)
+
+    def _detect_peaks(self, y):
+        """Peak indices for one intensity array with the current detector settings."""
+        return self._detect_peaks_stack([y])[0]
+
+    def _detect_peaks_stack(self, ys):
+        """Peak indices for a list (or 2D stack) of intensity arrays in one call."""
+        return [p for p, _ in self._peak_results(ys)]
+
+    def _peak_results(self, ys):
+        """(indices, strength) per intensity array with the current detector settings."""
+        if isinstance(ys, list) and len(ys) > 1 and len({len(y) for y in ys}) == 1:
+            ys = np.vstack(ys)  # equal lengths: one vectorized call over axis=1
+        return xrd_peaks.detect_peaks_stack(ys, mode=getattr(self, "peak_detect_mode", "adaptive"),
+                                            snr=getattr(self, "peak_snr", 5.0))
+
+    def _drop_peak_labels(self):
+        """Detach the peak label layer before its axes is cleared."""
+        if getattr(self, "peak_labels", None) is not None:
+            self.peak_labels.remove()
+            self.peak_labels = None
+
+    def _draw_peak_labels(self, curves):
+        """Peak markers for every (x, y, color) curve and one shared, capped label layer."""
+        xs, ys, strengths = [], [], []
+        results = self._peak_results([np.asarray(y, dtype=float) for _, y, _ in curves])
+        for (x, y, color), (peaks, strength) in zip(curves, results):
+            x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+            self.ax.plot(x[peaks], y[peaks], 'o', color=color, markersize=4, label='_peaks')
+            xs.append(x[peaks])
+            ys.append(y[peaks])
+            strengths.append(np.asarray(strength, dtype=float))
+        if not xs:
+            return
+        self.peak_labels = PeakAnnotationLayer(self.ax, max_labels=getattr(self, "peak_label_limit", 25))
+        self.peak_labels.set_peaks(np.concatenate(xs), np.concatenate(ys), np.concatenate(strengths))
+
+    def _analysis_scans(self):
+        """Return (names, [(x, y), ...]) for every loaded dataset, or the main df."""
+        if hasattr(self, "xrd_datasets") and self.xrd_datasets:
+            names = [d.get("filename", f"Dataset {i+1}") for i, d in enumerate(self.xrd_datasets)]
+            scans = [self._theta_view(d.x, d.y) for d in self.xrd_datasets]
+            return names, scans
+        if hasattr(self, "df") and self.df is not None:
+            return [getattr(self, "main_filename", "Main")], [self._theta_view(self.df.iloc[:, 0].to_numpy(dtype=float),
+                                                                               self.df.iloc[:, 1].to_numpy(dtype=float))]
+        return [], []
+
+    def load_instrument_standard(self):
+        """Fit the instrumental (Caglioti) profile from a line-profile standard (LaB6, Si...)."""
+        import os
+        names, scans = self._analysis_scans()
+        items = ["Dosyadan yükle..."] + names
+        choice, ok = QInputDialog.getItem(self, "Enstrüman Standardı", "Standart veri:", items, 0, False)
+        if not ok:
+            return
+        try:
+            if choice == items[0]:
+                file_path, _ = QFileDialog.getOpenFileName(self, "Standart XRD Dosyası", "", "Text Files (*.txt)")
+                if not file_path:
+                    return
+                x, y = loaders.read_xy(file_path)
+                std_name = os.path.basename(file_path)
+            else:
+                x, y = scans[items.index(choice) - 1]
+                std_name = choice
+            peaks = self._detect_peaks(y)
+            # same reference level as analyze_series, so the correction subtracts like from like
+            fwhm = xrd_peaks.compute_fwhm(x, y, peaks, reference="prominence")
+            self.instrument_profile = microstructure.fit_instrument_profile(x[peaks], fwhm)
+            self.instrument_standard_name = std_name
+            U, V, W = self.instrument_profile
+            QMessageBox.information(self, "Enstrüman Profili",
+                                    f"Standart: {std_name}\nTepe sayısı: {len(peaks)}\n"
+                                    f"U = {U:.4g}\nV = {V:.4g}\nW = {W:.4g}")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Enstrüman standardı işlenemedi:\n{e}")
+
+    def analyze_microstructure(self):
+        """Scherrer size per peak and Williamson–Hall size/strain per scan for all datasets."""
+        names, scans = self._analysis_scans()
+        if not scans:
+            QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+            return
+        profile = getattr(self, "instrument_profile", None)
+        if profile is None:
+            reply = QMessageBox.question(self, "Enstrüman Profili Yok",
+                                         "Enstrüman standardı yüklenmedi. Düzeltme yapılmadan devam edilsin mi?",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        wavelength, ok1 = QInputDialog.getDouble(self, "Dalga Boyu", "λ (Å):", microstructure.CU_KA1, 0.1, 5.0, 5)
+        if not ok1:
+            return
+        k, ok2 = QInputDialog.getDouble(self, "Scherrer Sabiti", "K:", microstructure.SCHERRER_K, 0.5, 2.0, 3)
+        if not ok2:
+            return
+        shape, ok3 = QInputDialog.getItem(self, "Profil Şekli", "Genişleme düzeltmesi:", ["Gaussian", "Lorentzian"], 0, False)
+        if not ok3:
+            return
+        try:
+            peaks = self._detect_peaks_stack([y for _, y in scans])
+            peak_table, wh_table = microstructure.analyze_series(
+                scans, names=names, profile=profile, peaks=peaks, wavelength=wavelength, k=k, shape=shape.lower())
+            self.microstructure_results = (peak_table, wh_table)
+            lines = []
+            for _, row in wh_table.head(20).iterrows():
+                lines.append(f"{row['Dataset']}: D = {row['W-H Size (nm)']:.1f} nm, "
+                             f"ε = {row['W-H Strain']:.2e} (n={row['N Peaks']})")
+            if len(wh_table) > 20:
+                lines.append(f"... (+{len(wh_table) - 20} dataset)")
+            QMessageBox.information(self, "Mikroyapı Analizi", "\n".join(lines))
+            save_path, _ = QFileDialog.getSaveFileName(self, "Mikroyapı Sonuçlarını Kaydet", "", "CSV Files (*.csv)")
+            if save_path:
+                base = save_path[:-4] if save_path.lower().endswith(".csv") else save_path
+                peak_table.to_csv(base + ".csv", index=False)
+                wh_table.to_csv(base + "_wh.csv", index=False)
+                QMessageBox.information(self, "Başarılı", "Tepe tablosu ve Williamson–Hall özeti kaydedildi.")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Mikroyapı analizi başarısız:\n{e}")
+
+    def track_peak_series(self):
+        """Follow reflections through the loaded scan series (dataset order = series order)."""
+        names, scans = self._analysis_scans()
+        if len(scans) < 2:
+            QMessageBox.warning(self, "Uyarı", "Tepe takibi için en az iki XRD verisi yükleyin.")
+            return
+        max_shift, ok1 = QInputDialog.getDouble(self, "Tepe Takibi", "Taramalar arası en büyük kayma (°2θ):", 0.2, 0.001, 5.0, 3)
+        if not ok1:
+            return
+        max_gap, ok2 = QInputDialog.getInt(self, "Tepe Takibi", "Kaybolmaya izin verilen tarama sayısı:", 2, 0, 100, 1)
+        if not ok2:
+            return
+        min_length, ok3 = QInputDialog.getInt(self, "Tepe Takibi", "En kısa iz (tarama):", 3, 1, len(scans), 1)
+        if not ok3:
+            return
+        try:
+            peaks = self._detect_peaks_stack([y for _, y in scans])
+            table = tracking.track_series(tracking.collect_peaks(scans, peaks), labels=names,
+                                          max_shift=max_shift, max_gap=max_gap, min_length=min_length)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Tepe takibi başarısız:\n{e}")
+            return
+        if table.empty:
+            QMessageBox.information(self, "Bilgi", "Takip edilebilen tepe bulunamadı.")
+            return
+        self.peak_tracks = table
+        self._show_track_plot(table, len(scans))
+
+    def _show_track_plot(self, table, n_scans):
+        """Trajectory window: position, intensity and FWHM of every track vs. scan."""
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Tepe Takibi")
+        vbox = QVBoxLayout(dlg)
+        fig, axes = plt.subplots(3, 1, sharex=True, figsize=(7, 8))
+        canvas = FigureCanvas(fig)
+        vbox.addWidget(NavigationToolbar2QT(canvas, dlg))
+        vbox.addWidget(canvas)
+        colors = plt.cm.tab10.colors
+        for tid, grp in table.groupby("Track", sort=True):
+            c = colors[tid % len(colors)]
+            lbl = f"#{tid} ({grp['2θ'].iloc[0]:.2f}°)"
+            axes[0].plot(grp["Scan"], grp["2θ"], '.-', color=c, markersize=3, linewidth=1, label=lbl)
+            axes[1].plot(grp["Scan"], grp["Intensity"], '.-', color=c, markersize=3, linewidth=1)
+            axes[2].plot(grp["Scan"], grp["FWHM"], '.-', color=c, markersize=3, linewidth=1)
+        axes[0].set_ylabel("2θ (°)")
+        axes[1].set_ylabel("Intensity")
+        axes[2].set_ylabel("FWHM (°)")
+        axes[2].set_xlabel("Tarama")
+        axes[2].set_xlim(-0.5, n_scans - 0.5)
+        if table["Track"].nunique() <= 20:
+            axes[0].legend(fontsize=7, loc="best")
+        fig.tight_layout()
+
+        h = QHBoxLayout()
+        btn_save = QPushButton("CSV Kaydet")
+        btn_close = QPushButton("Kapat")
+        h.addStretch()
+        h.addWidget(btn_save)
+        h.addWidget(btn_close)
+        vbox.addLayout(h)
+
+        def save_csv():
+            path, _ = QFileDialog.getSaveFileName(dlg, "Tepe İzlerini Kaydet", "", "CSV Files (*.csv)")
+            if path:
+                table.to_csv(path, index=False)
+
+        btn_save.clicked.connect(save_csv)
+        btn_close.clicked.connect(dlg.close)
+        dlg.finished.connect(lambda _: plt.close(fig))
+        dlg.resize(800, 900)
+        dlg.exec_()
+
+    def refine_whole_pattern(self):
+        """Pawley / Le Bail lattice refinement of one dataset or the whole series."""
+        names, scans = self._analysis_scans()
+        if not scans:
+            QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+            return
+        targets = [0]
+        if hasattr(self, "xrd_datasets") and self.xrd_datasets:
+            target_idx = self._select_dataset_index()
+            if target_idx is None:
+                return
+            targets = list(range(len(scans))) if target_idx == -1 else [target_idx]
+        systems = list(refine.CRYSTAL_SYSTEMS)
+        system, ok = QInputDialog.getItem(self, "İnceltme", "Kristal sistemi:", systems, 0, False)
+        if not ok:
+            return
+        sg, ok = QInputDialog.getText(self, "İnceltme", "Uzay grubu veya merkezleme (örn. Fm-3m, I, P):", text="P")
+        if not ok:
+            return
+        centering = sg.strip()[:1].upper() if sg.strip() else "P"
+        if centering not in refine.CENTERINGS:
+            centering = "P"
+        free = refine.CRYSTAL_SYSTEMS[system]
+        text, ok = QInputDialog.getText(self, "İnceltme", f"Başlangıç hücresi ({', '.join(free)}):")
+        if not ok:
+            return
+        try:
+            cell = [float(v) for v in text.replace(";", ",").split(",") if v.strip()]
+            if len(cell) != len(free):
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Hatalı Giriş", f"{len(free)} sayı girin: {', '.join(free)}")
+            return
+        method, ok = QInputDialog.getItem(self, "İnceltme", "Yöntem:", ["Pawley", "Le Bail"], 0, False)
+        if not ok:
+            return
+        first = self.xrd_datasets[targets[0]] if getattr(self, "xrd_datasets", None) else None
+        ka1, _, _ = kalpha.wavelengths_from_meta(first.get("meta") if first is not None else getattr(self, "main_meta", None))
+        wavelength, ok = QInputDialog.getDouble(self, "İnceltme", "λ (Å):", ka1, 0.1, 5.0, 6)
+        if not ok:
+            return
+        kwargs = dict(cell=cell, system=system, centering=centering, wavelength=wavelength,
+                      method="pawley" if method == "Pawley" else "lebail")
+        # a single scan cannot report progress, so show a busy bar for it
+        dlg = QProgressDialog("İnceltme çalışıyor...", "İptal", 0, 1000 if len(targets) > 1 else 0, self)
+        dlg.setWindowTitle("İnceltme")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(0)
+        dlg.setAutoClose(False)
+        dlg.setAutoReset(False)
+        worker = RefineWorker([scans[i] for i in targets], kwargs)
+        worker.progress.connect(dlg.setValue)
+        worker.done.connect(lambda res: self._refine_done(res, dlg, names, targets))
+        # a cancelled run finishes its current scan in the background; keep the thread
+        # referenced until then so it is never destroyed while running
+        dlg.canceled.connect(worker.cancel)
+        dlg.canceled.connect(dlg.close)
+        self._refine_workers.add(worker)
+        worker.finished.connect(lambda w=worker: self._refine_workers.discard(w))
+        worker.start()
+        dlg.show()
+
+    def _refine_done(self, results, dlg, names, targets):
+        """Show or save the refinement results once the worker has finished."""
+        cancelled = dlg.wasCanceled()
+        dlg.close()  # closing a QProgressDialog also reports it as cancelled
+        if results is None or cancelled:
+            return
+        if isinstance(results, Exception):
+            QMessageBox.critical(self, "Hata", f"İnceltme başarısız:\n{results}")
+            return
+        self.refinement_results = {names[i]: r for i, r in zip(targets, results)}
+        if len(results) == 1:
+            if "error" in results[0]:
+                QMessageBox.critical(self, "Hata", f"İnceltme başarısız:\n{results[0]['error']}")
+                return
+            self._show_refinement(names[targets[0]], results[0])
+            return
+        rows = []
+        for i, r in zip(targets, results):
+            if "error" in r:
+                rows.append({"Dataset": names[i], "Hata": r["error"]})
+                continue
+            a, b, c, al, be, ga = r["cell"]
+            rows.append({"Dataset": names[i], "a": a, "b": b, "c": c, "α": al, "β": be, "γ": ga,
+                         "V": r["volume"], "Zero": r["zero"], "Rwp": r["rwp"], "Rp": r["rp"]})
+        table = pd.DataFrame(rows)
+        QMessageBox.information(self, "İnceltme", table.head(20).to_string(index=False, float_format=lambda v: f"{v:.5g}"))
+        save_path, _ = QFileDialog.getSaveFileName(self, "Hücre Parametrelerini Kaydet", "", "CSV Files (*.csv)")
+        if save_path:
+            table.to_csv(save_path, index=False)
+
+    def _show_refinement(self, name, r):
+        """Observed / calculated / difference plot with reflection ticks."""
+        dlg = QDialog(self)
+        dlg.setWindowTitle(f"İnceltme — {name}")
+        vbox = QVBoxLayout(dlg)
+        a, b, c, al, be, ga = r["cell"]
+        vbox.addWidget(QLabel(f"a={a:.5f}  b={b:.5f}  c={c:.5f}  α={al:.3f}  β={be:.3f}  γ={ga:.3f}  "
+                              f"V={r['volume']:.3f} Å³  zero={r['zero']:.4f}°  Rwp={100 * r['rwp']:.2f}%  Rp={100 * r['rp']:.2f}%"))
+        fig, ax = plt.subplots(figsize=(8, 5))
+        canvas = FigureCanvas(fig)
+        vbox.addWidget(NavigationToolbar2QT(canvas, dlg))
+        vbox.addWidget(canvas)
+        x, yo, yc = r["x"], r["y_obs"], r["y_calc"]
+        diff = yo - yc
+        ax.plot(x, yo, '.', color='black', markersize=2, label='Gözlenen')
+        ax.plot(x, yc, '-', color='red', linewidth=1, label='Hesaplanan')
+        base = yo.min() - 0.05 * np.ptp(yo)
+        ax.plot(x, diff + base - diff.max(), '-', color='blue', linewidth=0.8, label='Fark')
+        ax.plot(r["two_theta"], np.full(r["two_theta"].size, base + 0.02 * np.ptp(yo)), '|', color='green',
+                markersize=8, label='hkl')
+        ax.set_xlabel("2θ (°)")
+        ax.set_ylabel("Intensity (a.u.)")
+        ax.legend(fontsize=8)
+        fig.tight_layout()
+        btn_close = QPushButton("Kapat")
+        btn_close.clicked.connect(dlg.close)
+        vbox.addWidget(btn_close)
+        dlg.finished.connect(lambda _: plt.close(fig))
+        dlg.resize(900, 650)
+        dlg.exec_()
+
     def apply_theta_filter(self):
+        """Restrict plotting, peak detection and export to a 2θ window. The window is a
+        per-scan index slice (searchsorted), so nothing is copied or removed and empty
+        fields (or reset_theta_filter) bring back the full range."""
         try:
-            tmin = float(self.theta_min.text())
-            tmax = float(self.theta_max.text())
-            if hasattr(self, 'df') and self.df is not None:
-                self.df = self.df[(self.df.iloc[:, 0] >= tmin) & (self.df.iloc[:, 0] <= tmax)].reset_index(drop=True)
-                self.update_graph_from_df()
+            lo_text, hi_text = self.theta_min.text().strip(), self.theta_max.text().strip()
+            if not lo_text and not hi_text:
+                self.theta_range = None
+            else:
+                tmin = float(lo_text) if lo_text else -np.inf
+                tmax = float(hi_text) if hi_text else np.inf
+                self.theta_range = (min(tmin, tmax), max(tmin, tmax))
+            self.update_graph_from_df()
+            if self.theta_range is not None and hasattr(self, "ax"):
+                self._fit_view_to_range()
         except ValueError:
             QMessageBox.warning(self, "Hatalı Giriş", "Lütfen geçerli bir 2θ aralığı girin.")
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"2θ filtrelemesi sırasında hata:\n{str(e)}")
+
+    def reset_theta_filter(self):
+        self.theta_min.clear()
+        self.theta_max.clear()
+        self.apply_theta_filter()
+        if hasattr(self, "ax"):
+            self._fit_view_to_range()
+
+    def _fit_view_to_range(self):
+        self.ax.relim()
+        self.ax.autoscale(enable=True)
+        self.canvas.draw()
+
+    def _theta_view(self, x, y):
+        """x, y (numpy arrays) restricted to the 2θ analysis window, as views."""
+        return range_view(np.asarray(x), np.asarray(y), self.theta_range)
+
+    def _plot_xy(self, d, y):
+        """Plot arrays of a dataset (None = main frame): x in the current axis unit, both
+        restricted to the 2θ window. Converted axes are cached per x array (per frame for
+        the main data) and wavelength."""
+        if d is None:
+            owner, x = self.df, self.df.iloc[:, 0].to_numpy(dtype=float)
+        else:
+            owner = x = d.x
+        rows = slice(*range_indices(x, self.theta_range))
+        xu = self._axis_cache.get(owner, x, self.axis_unit, axes.wavelength_of(self._dataset_meta(d)))
+        return xu[rows], np.asarray(y)[rows]
+
+    def _dataset_meta(self, d):
+        return d.meta if d is not None else getattr(self, "main_meta", None)
+
+    def _theta_slice(self, df):
+        """Rows of df inside the 2θ analysis window as a positional slice."""
+        i0, i1 = range_indices(df.iloc[:, 0].to_numpy(), self.theta_range)
+        return slice(i0, i1)
+
     def save_theme(self):
         import json
         from PyQt5.QtWidgets import QFileDialog, QMessageBox
@@ -527,12 +1559,17 @@ class RenkDegistirici(QMainWindow):
         file_menu.addAction("Ayarları Yükle", self.load_xrd_settings)
         file_menu.addAction("Projeyi Kaydet", self.save_project)
         file_menu.addAction("Projeyi Aç", self.load_project)
+        file_menu.addAction("Tüm Datasetleri Dışa Aktar (CSV)", self.export_dataset_stack)
         file_menu.addSeparator()
         file_menu.addAction("Çıkış", self.close)
         # View menu
         view_menu = self.menu_bar.addMenu("Görünüm")
         view_menu.addAction("Tepe Noktalarını Göster", self.show_peaks)
         view_menu.addAction("Veri Tablosu (Tüm XRD)", self.open_xrd_data_table_entry)
+        view_menu.addAction("Tepe Etiketi Sayısı", self.set_peak_label_limit)
+        view_menu.addAction("Normalizasyon (Tüm XRD)...", self.set_normalization)
+        view_menu.addAction("Eksen Birimi (2θ / d / Q)...", self.set_axis_unit)
+        view_menu.addAction("Dalga Boyu (Dataset)...", self.set_dataset_wavelength)
         # Grafik menu (from Seebeck)
         grafik_menu = self.menu_bar.addMenu("Grafik")
         grafik_menu.addAction("Başlık Ekle", self.add_title)
@@ -614,23 +1651,74 @@ class RenkDegistirici(QMainWindow):
 
         # Ön İşleme menüsü: smoothing ve arka plan çıkarma
         preprocess_menu = self.menu_bar.addMenu("Ön İşleme")
+        preprocess_menu.addAction("Sıçrama (Spike) Gider", self.preprocess_despike)
         preprocess_menu.addAction("Yumuşat (Savitzky–Golay)", self.preprocess_savgol)
         preprocess_menu.addAction("Arka Plan Çıkar (ALS)", self.preprocess_baseline_als)
+        preprocess_menu.addAction("Arka Plan Çıkar (arPLS)", self.preprocess_baseline_arpls)
+        preprocess_menu.addAction("Arka Plan Çıkar (airPLS)", self.preprocess_baseline_airpls)
         preprocess_menu.addAction("Arka Plan Çıkar (Rolling Min)", self.preprocess_baseline_rolling)
+        preprocess_menu.addAction("Kα2 Çıkar (Rachinger)", self.preprocess_strip_ka2)
         preprocess_menu.addAction("Arka Planı Göster/Gizle", self.toggle_background_curve)
         preprocess_menu.addSeparator()
+        preprocess_menu.addAction("Canlı Önizleme Paneli...", self.open_preprocess_preview)
+        preprocess_menu.addAction("Ön İşleme Tarifi...", self.edit_preprocess_recipe)
         preprocess_menu.addAction("Orijinale Dön", self.preprocess_reset)
+
+        # Düzen menüsü: geri al / yinele
+        edit_menu = self.menu_bar.addMenu("Düzen")
+        self.undo_action = edit_menu.addAction("Geri Al", self.undo_edit)
+        self.undo_action.setShortcut("Ctrl+Z")
+        self.redo_action = edit_menu.addAction("Yinele", self.redo_edit)
+        self.redo_action.setShortcut("Ctrl+Y")
+        edit_menu.addSeparator()
+        edit_menu.addAction("Geçmiş Bellek Sınırı", self.set_history_budget)
+
+        # Analiz menüsü: kristalit boyutu / mikro gerinim
+        analysis_menu = self.menu_bar.addMenu("Analiz")
+        analysis_menu.addAction("Tepe Algılama Ayarları", self.set_peak_detection)
+        analysis_menu.addSeparator()
+        analysis_menu.addAction("Enstrüman Standardı Yükle", self.load_instrument_standard)
+        analysis_menu.addAction("Mikroyapı Analizi (Scherrer / W–H)", self.analyze_microstructure)
+        analysis_menu.addAction("Tepe Takibi (In-situ Seri)", self.track_peak_series)
+        analysis_menu.addAction("Tüm Desen İnceltme (Pawley / Le Bail)", self.refine_whole_pattern)
+        analysis_menu.addSeparator()
+        analysis_menu.addAction("Sinterleme Verisi Yükle", self.dosya_yukle)
+        analysis_menu.addAction("Sinterleme Kinetiği", self.analyze_sintering_kinetics)
+        analysis_menu.addAction("Sinterleme Kinetiği (Toplu)", self.analyze_sintering_batch)
+        analysis_menu.addAction("Olay Noktalarını İşaretle", self.highlight_data_point)
         # --- Startup: initialize without prompting for style or file ---
         # Prepare core state and UI pieces; user can choose theme or load files later from menus
         self.xrd_datasets = []
         self.df = None
         self.control_rows = []
+        # Peak detection: "adaptive" (noise/MAD based), "multiscale" or "threshold" (10% of max)
+        self.peak_detect_mode = "adaptive"
+        self.peak_snr = 5.0
+        self.peak_label_limit = 25
+        self.peak_labels = None
+        # Pawley / Le Bail runs in progress (background threads)
+        self._refine_workers = set()
+        # Display normalization of xrd_datasets (None = raw intensities) and its cached result
+        self.normalization = None
+        self._norm_cache = None
+        # 2θ analysis window (None = whole scan); applied as index slices, data is never cut
+        self.theta_range = None
+        # x axis unit of the XRD plots ("2theta", "d", "q"); converted axes are cached per frame
+        self.axis_unit = "2theta"
+        self._axis_cache = axes.AxisCache()
+        # Long sintering logs are drawn from min/max pyramids at the resolution of the current zoom
+        self._decimated = {}        # line -> (pyramid, (time column, value column) or None)
+        self._pyramid_cache = {}    # (time column, value column) -> (frame, pyramid)
+        self._time_index_cache = None  # (frame, sorted time index) for event lookups
+        self.event_markers = []     # one marker line per axis for highlighted events
+        # Preprocessing recipes are evaluated from the raw data; intermediates are memoized here
+        self.main_recipe = []
+        self._recipe_cache = recipe.RecipeCache()
+        # Undo/redo of data edits and recipe changes (compact deltas, spilled to disk over budget)
+        self.history = history.History()
+        self._update_history_actions()
         # Load PDF database if available
-        try:
-            with open("pdf_cards.json", "r") as f:
-                self.pdf_db = json.load(f)
-        except FileNotFoundError:
-            self.pdf_db = {}
+        self.pdf_db = matching.load_cards("pdf_cards.json")
 
         # Basic inputs (defaults); user can change via UI later
         self.add_xrd_button = QPushButton("Veri Ekle")
@@ -735,14 +1823,11 @@ class RenkDegistirici(QMainWindow):
 
         # If we have registered datasets, draw them all; otherwise fall back to self.df
         if hasattr(self, "xrd_datasets") and self.xrd_datasets:
-            for d in self.xrd_datasets:
-                df = d["df"]
-                x = df.iloc[:, 0].values
-                y = df.iloc[:, 1].values + d.get("offset", 0.0)
-                self.ax.plot(x, y, label=d.get("filename", "XRD"), color=d.get("color", "#1f77b4"))
+            for d, y in zip(self.xrd_datasets, self._normalized_values()):
+                x, y = self._plot_xy(d, y)
+                self.ax.plot(x, y + d.offset, label=d.name, color=d.color)
         elif hasattr(self, "df") and self.df is not None:
-            x = self.df.iloc[:, 0].values
-            y = self.df.iloc[:, 1].values
+            x, y = self._plot_xy(None, self.df.iloc[:, 1].values)
             self.ax.plot(x, y, label=getattr(self, "main_filename", "XRD"), color="#1f77b4")
         # else: start with an empty axes; user can add datasets later from the UI
 
@@ -779,6 +1864,8 @@ class RenkDegistirici(QMainWindow):
         self.theta_max.setFixedWidth(60)
         self.theta_filter_btn = QPushButton("Apply 2θ Filter")
         self.theta_filter_btn.clicked.connect(self.apply_theta_filter)
+        self.theta_reset_btn = QPushButton("Full 2θ")
+        self.theta_reset_btn.clicked.connect(self.reset_theta_filter)
 
         # Peak toggle
         self.peak_toggle = QCheckBox("Show Peaks")
@@ -827,6 +1914,7 @@ class RenkDegistirici(QMainWindow):
         control_layout.addWidget(self.theta_min)
         control_layout.addWidget(self.theta_max)
         control_layout.addWidget(self.theta_filter_btn)
+        control_layout.addWidget(self.theta_reset_btn)
         control_layout.addSpacing(10)
         control_layout.addWidget(self.peak_toggle)
         control_layout.addSpacing(10)
@@ -880,9 +1968,7 @@ class RenkDegistirici(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "Yeni XRD Dosyası", "", "Text Files (*.txt)")
         if file_path:
             try:
-                df = pd.read_csv(file_path, sep="\t", header=None)
-                x = df.iloc[:, 0].values
-                y = df.iloc[:, 1].values
+                x, y = loaders.read_xy(file_path)
                 # Offset input
                 offset, _ = QInputDialog.getDouble(self, "Y Ofset Gir", f"{os.path.basename(file_path)} için ofset:", 0.0, -10000, 10000, 2)
                 color = QColorDialog.getColor().name()
@@ -891,12 +1977,8 @@ class RenkDegistirici(QMainWindow):
                 self.ax.legend()
                 self.canvas.draw()
                 # Store dataset info
-                self.xrd_datasets.append({
-                    "filename": os.path.basename(file_path),
-                    "df": df,
-                    "offset": offset,
-                    "color": color
-                })
+                self.xrd_datasets.append(Dataset(os.path.basename(file_path), x, y,
+                                                 offset=offset, color=color))
                 # Add control row for this dataset
                 self.add_control_row(os.path.basename(file_path), offset, color)
             except Exception as e:
@@ -950,7 +2032,9 @@ class RenkDegistirici(QMainWindow):
             "update_btn": update_btn
         })
 
-    def redraw_plot(self):
+    def redraw_plot(self, autoscale_y=False):
+        """Redraw every XRD dataset, keeping labels and the view. autoscale_y=True fits the
+        y range to the new curves (e.g. after the intensity scale changed)."""
         # Safety guard: if axes/canvas are not yet created (e.g., called before plot_graph), do nothing.
         if not hasattr(self, "ax") or not hasattr(self, "canvas"):
             return
@@ -960,13 +2044,14 @@ class RenkDegistirici(QMainWindow):
         current_title  = self.ax.get_title()  if hasattr(self, "ax") else "XRD Pattern"
         current_xlim = self.ax.get_xlim() if hasattr(self, "ax") else None
         current_ylim = self.ax.get_ylim() if hasattr(self, "ax") else None
+        self._drop_peak_labels()
         self.ax.clear()
         # Plot all datasets in self.xrd_datasets
-        for d in self.xrd_datasets:
-            df = d["df"]
-            x = df.iloc[:, 0].values
-            y = df.iloc[:, 1].values + d["offset"]
-            self.ax.plot(x, y, label=d["filename"], color=d["color"])
+        curves = []
+        for d, y in zip(self.xrd_datasets, self._normalized_values()):
+            x, y = self._plot_xy(d, y)
+            line, = self.ax.plot(x, y + d.offset, label=d.name, color=d.color)
+            curves.append((x, y + d.offset, line.get_color()))
         # Use inputs if present (kept in sync with axes), otherwise preserve previous values
         xlabel = self.xlabel_input.text() if hasattr(self, "xlabel_input") else current_xlabel
         ylabel = self.ylabel_input.text() if hasattr(self, "ylabel_input") else current_ylabel
@@ -977,8 +2062,16 @@ class RenkDegistirici(QMainWindow):
         # Restore axis limits if possible
         if current_xlim is not None:
             self.ax.set_xlim(current_xlim)
-        if current_ylim is not None:
+        if autoscale_y:
+            self.ax.relim()
+            self.ax.autoscale_view(scalex=False)
+        elif current_ylim is not None:
             self.ax.set_ylim(current_ylim)
+        if hasattr(self, 'peak_toggle') and self.peak_toggle.isChecked():
+            try:
+                self._draw_peak_labels(curves)
+            except Exception as e:
+                QMessageBox.warning(self, "Uyarı", f"Tepe algılama başarısız:\n{e}")
         # Filter legend so only valid labels are shown
         handles, labels = self.ax.get_legend_handles_labels()
         handles = [h for h, l in zip(handles, labels) if l and not l.startswith("_")]
@@ -1019,6 +2112,7 @@ class RenkDegistirici(QMainWindow):
     # --- Helper: Clear current plot (XRD-style) ---
     def clear_plot(self):
         # Safely clear current plot(s) without rebuilding any tabs/panels
+        self._drop_peak_labels()
         if hasattr(self, 'ax') and self.ax is not None:
             self.ax.clear()
         if hasattr(self, 'ax1') and self.ax1 is not None:
@@ -1404,6 +2498,7 @@ class RenkDegistirici(QMainWindow):
                     "offset": d.get("offset", 0.0)
                 })
         cfg["datasets"] = datasets
+        cfg["normalization"] = self.normalization
         # write
         try:
             with open(fname, "w") as f:
@@ -1481,6 +2576,8 @@ class RenkDegistirici(QMainWindow):
             self.legend_custom_order = cfg.get("legend_custom_order", None)
             # datasets: apply color/offset by filename match (if any)
             ds_cfg = {d["filename"]: d for d in cfg.get("datasets", []) if d.get("filename")}
+            if "normalization" in cfg:
+                self.normalization = cfg["normalization"]
             if hasattr(self, "xrd_datasets"):
                 for d in self.xrd_datasets:
                     fn = d.get("filename")
@@ -1515,98 +2612,29 @@ class RenkDegistirici(QMainWindow):
             QMessageBox.warning(self, "Uyarı", "Önce en az bir XRD verisi yükleyin.")
             return
 
-        dlg = QDialog(self)
-        dlg.setWindowTitle("XRD Veri Tablosu (Basit)")
-        vbox = QVBoxLayout(dlg)
-        table = QTableWidget()
-        table.setRowCount(len(self.df))
-        table.setColumnCount(2)
-        table.setHorizontalHeaderLabels(["X", "Y"])
-        for i in range(len(self.df)):
-            table.setItem(i, 0, QTableWidgetItem(str(self.df.iloc[i, 0])))
-            table.setItem(i, 1, QTableWidgetItem(str(self.df.iloc[i, 1])))
-        vbox.addWidget(table)
-
-        h = QHBoxLayout()
-        btn_add_row = QPushButton("Satır Ekle")
-        btn_insert_row = QPushButton("Seçili Üstüne Ekle")
-        btn_del_rows = QPushButton("Seçili Satır(ları) Sil")
-        btn_add_col = QPushButton("Sütun Ekle")
-        btn_apply = QPushButton("Uygula")
-        btn_close = QPushButton("Kapat")
-        h.addStretch()
-        h.addWidget(btn_add_row)
-        h.addWidget(btn_insert_row)
-        h.addWidget(btn_del_rows)
-        h.addWidget(btn_add_col)
-        h.addWidget(btn_apply)
-        h.addWidget(btn_close)
-        vbox.addLayout(h)
-
-        def apply_changes():
-            n = table.rowCount()
-            xs, ys = [], []
-            for r in range(n):
-                xv = table.item(r, 0).text() if table.item(r, 0) else "0"
-                yv = table.item(r, 1).text() if table.item(r, 1) else "0"
-                try:
-                    xs.append(float(xv))
-                except Exception:
-                    xs.append(np.nan)
-                try:
-                    ys.append(float(yv))
-                except Exception:
-                    ys.append(np.nan)
-            new_df = pd.DataFrame({0: xs, 1: ys})
+        def apply_changes(values):
+            new_df = pd.DataFrame({0: values[:, 0], 1: values[:, 1]})
+            targets = [self.xrd_datasets[0]] if getattr(self, "xrd_datasets", None) else [None]
+            begun = self._history_begin(targets)
             # Güncellenen veriyi hem self.df'ye hem de varsa xrd_datasets'e yaz
             self.df = new_df
             if hasattr(self, "xrd_datasets") and self.xrd_datasets:
                 # Varsayılan: ilk dataset düzenleniyor (fallback editör)
-                self.xrd_datasets[0]["df"] = new_df.copy()
-                if "orig_df" in self.xrd_datasets[0]:
-                    self.xrd_datasets[0]["orig_df"] = new_df.copy()
+                d0 = self.xrd_datasets[0]
+                # edited values become the new raw data
+                d0.set_values(values[:, 1], values[:, 0])
+                d0.set_raw(d0.x, d0.y)
+                d0.recipe = []
+                self._history_commit("Veri tablosu düzenlendi", begun)
                 # Tüm datasetler modundaysak yeniden çiz
                 self.redraw_plot()
             else:
+                self._history_commit("Veri tablosu düzenlendi", begun)
                 # Tek dataset akışı
                 self.update_graph_from_df()
-            dlg.close()
 
-        def add_row():
-            r = table.rowCount()
-            table.insertRow(r)
-            table.setItem(r, 0, QTableWidgetItem(""))
-            table.setItem(r, 1, QTableWidgetItem(""))
-
-        def insert_row_above():
-            sel = table.selectionModel().selectedRows()
-            if not sel:
-                add_row()
-                return
-            # insert above the first selected row
-            r0 = min(idx.row() for idx in sel)
-            table.insertRow(r0)
-            table.setItem(r0, 0, QTableWidgetItem(""))
-            table.setItem(r0, 1, QTableWidgetItem(""))
-
-        def delete_selected_rows():
-            sel = sorted({idx.row() for idx in table.selectionModel().selectedRows()}, reverse=True)
-            for r in sel:
-                table.removeRow(r)
-
-        def add_column_warn():
-            QMessageBox.information(self, "Bilgi",
-                                    "XRD veri tablosunda sadece 2 sütun (X ve Y) desteklenir.\n"
-                                    "Sütun ekleme XRD modunda devre dışıdır.")
-
-        btn_apply.clicked.connect(apply_changes)
-        btn_close.clicked.connect(dlg.close)
-        btn_add_row.clicked.connect(add_row)
-        btn_insert_row.clicked.connect(insert_row_above)
-        btn_del_rows.clicked.connect(delete_selected_rows)
-        btn_add_col.clicked.connect(add_column_warn)
-        dlg.resize(800, 600)
-        dlg.exec_()
+        values = self.df.iloc[:, :2].to_numpy(dtype=float)
+        ArrayTableDialog(self, "XRD Veri Tablosu (Basit)", values, apply_changes).exec_()
 
     def open_xrd_data_table(self):
         """
@@ -1628,100 +2656,27 @@ class RenkDegistirici(QMainWindow):
             target_idx = names.index(name)
 
         d = self.xrd_datasets[target_idx]
-        df = d["df"]
 
-        # Dialog ve tablo
-        dlg = QDialog(self)
-        dlg.setWindowTitle(f"XRD Veri Tablosu — {d.get('filename','Dataset')}")
-        vbox = QVBoxLayout(dlg)
-        table = QTableWidget()
-        table.setRowCount(len(df))
-        table.setColumnCount(2)
-        table.setHorizontalHeaderLabels(["X", "Y"])
-        for i in range(len(df)):
-            table.setItem(i, 0, QTableWidgetItem(str(df.iloc[i, 0])))
-            table.setItem(i, 1, QTableWidgetItem(str(df.iloc[i, 1])))
-        vbox.addWidget(table)
-
-        # Butonlar
-        h = QHBoxLayout()
-        btn_add_row = QPushButton("Satır Ekle")
-        btn_insert_row = QPushButton("Seçili Üstüne Ekle")
-        btn_del_rows = QPushButton("Seçili Satır(ları) Sil")
-        btn_add_col = QPushButton("Sütun Ekle")
-        btn_apply = QPushButton("Uygula")
-        btn_close = QPushButton("Kapat")
-        h.addStretch()
-        h.addWidget(btn_add_row)
-        h.addWidget(btn_insert_row)
-        h.addWidget(btn_del_rows)
-        h.addWidget(btn_add_col)
-        h.addWidget(btn_apply)
-        h.addWidget(btn_close)
-        vbox.addLayout(h)
-
-        def apply_changes():
-            n = table.rowCount()
-            xs, ys = [], []
-            for r in range(n):
-                xv = table.item(r, 0).text() if table.item(r, 0) else "0"
-                yv = table.item(r, 1).text() if table.item(r, 1) else "0"
-                try:
-                    xs.append(float(xv))
-                except Exception:
-                    xs.append(np.nan)
-                try:
-                    ys.append(float(yv))
-                except Exception:
-                    ys.append(np.nan)
-            new_df = pd.DataFrame({0: xs, 1: ys})
+        def apply_changes(values):
+            begun = self._history_begin([self.xrd_datasets[target_idx]])
             # Seçilen dataset'i güncelle
-            self.xrd_datasets[target_idx]["df"] = new_df.copy()
-            if "orig_df" in self.xrd_datasets[target_idx]:
-                self.xrd_datasets[target_idx]["orig_df"] = new_df.copy()
+            # edited values become the new raw data
+            d.set_values(values[:, 1], values[:, 0])
+            d.set_raw(d.x, d.y)
+            d.recipe = []
             # Eğer seçilen dataset ana df ile aynıysa self.df'yi de güncelle
             try:
                 main_name = getattr(self, "main_filename", None)
                 if main_name and d.get("filename") == main_name:
-                    self.df = new_df.copy()
+                    self.df = d.df.copy()
             except Exception:
                 pass
+            self._history_commit(f"{d.get('filename', 'Dataset')} düzenlendi", begun)
             self.redraw_plot()
-            dlg.close()
-
-        def add_row():
-            r = table.rowCount()
-            table.insertRow(r)
-            table.setItem(r, 0, QTableWidgetItem(""))
-            table.setItem(r, 1, QTableWidgetItem(""))
 
-        def insert_row_above():
-            sel = table.selectionModel().selectedRows()
-            if not sel:
-                add_row()
-                return
-            r0 = min(idx.row() for idx in sel)
-            table.insertRow(r0)
-            table.setItem(r0, 0, QTableWidgetItem(""))
-            table.setItem(r0, 1, QTableWidgetItem(""))
-
-        def delete_selected_rows():
-            sel = sorted({idx.row() for idx in table.selectionModel().selectedRows()}, reverse=True)
-            for r in sel:
-                table.removeRow(r)
-
-        def add_column_warn():
-            QMessageBox.information(self, "Bilgi",
-                                    "XRD veri tablosunda sadece 2 sütun (X ve Y) desteklenir.\n"
-                                    "Sütun ekleme XRD modunda devre dışıdır.")
-
-        btn_apply.clicked.connect(apply_changes)
-        btn_close.clicked.connect(dlg.close)
-        btn_add_row.clicked.connect(add_row)
-        btn_insert_row.clicked.connect(insert_row_above)
-        btn_del_rows.clicked.connect(delete_selected_rows)
-        btn_add_col.clicked.connect(add_column_warn)
-        dlg.resize(900, 600)
+        # the model works on one (n, 2) copy of the arrays; cells are formatted only when shown
+        dlg = ArrayTableDialog(self, f"XRD Veri Tablosu — {d.get('filename','Dataset')}",
+                               np.column_stack([d.x, d.y]), apply_changes)
         dlg.exec_()
 
     def on_pick(self, event):
@@ -1808,13 +2763,78 @@ class RenkDegistirici(QMainWindow):
     def dosya_yukle(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Dosya Seç", "", "Excel Files (*.xlsx *.xls);;Text Files (*.txt *.csv)")
         if filename:
+            try:
+                df = self._read_log(filename)
+            except Exception as e:
+                QMessageBox.critical(self, "Hata", f"Dosya okunamadı:\n{e}")
+                return
+            if df is None:  # cancelled
+                return
+            self.df = df
             if filename.endswith(('.xlsx', '.xls')):
-                self.df = pd.read_excel(filename)
                 self.current_filename = filename.split("/")[-1]
-            else:
-                self.df = pd.read_csv(filename)
             self.update_graph_from_df()
 
+    def _read_log(self, filename):
+        """Log file read in row chunks behind a cancellable progress dialog; None if cancelled."""
+        dlg = QProgressDialog("Veri okunuyor...", "İptal", 0, 1000, self)
+        dlg.setWindowTitle("Dosya Yükle")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(500)
+
+        def progress(fraction):
+            dlg.setValue(int(fraction * 1000))
+            QApplication.processEvents()
+            return not dlg.wasCanceled()
+
+        try:
+            return loaders.read_table_chunked(filename, progress=progress)
+        finally:
+            dlg.close()
+
+    def _column_pyramid(self, tcol, ycol):
+        """Min/max pyramid of self.df[ycol] over self.df[tcol], reused while the frame is the same."""
+        hit = self._pyramid_cache.get((tcol, ycol))
+        if hit is not None and hit[0] is self.df and len(hit[1]) == len(self.df):
+            return hit[1]
+        pyr = sintering.MinMaxPyramid(self.df[tcol].to_numpy(dtype=float), self.df[ycol].to_numpy(dtype=float))
+        # summaries of a replaced frame are dropped with it
+        self._pyramid_cache = {k: v for k, v in self._pyramid_cache.items() if v[0] is self.df}
+        self._pyramid_cache[(tcol, ycol)] = (self.df, pyr)
+        return pyr
+
+    def _plot_decimated(self, ax, t, y, *args, columns=None, **kwargs):
+        """ax.plot for long time series: the line holds only the pyramid level that fits the
+        current zoom and is re-sampled whenever the x range changes. With columns=(tcol, ycol)
+        t and y are taken from self.df."""
+        pyr = self._column_pyramid(*columns) if columns else sintering.MinMaxPyramid(t, y)
+        self._prune_decimated()
+        line, = ax.plot(*pyr.view(max_points=self._decimate_points(ax)), *args, **kwargs)
+        self._decimated[line] = (pyr, columns)
+        cid = getattr(ax, "_decimate_cid", None)
+        if cid not in ax.callbacks.callbacks.get("xlim_changed", {}):
+            # Axes.clear() replaces the callback registry, so reconnect when needed
+            ax._decimate_cid = ax.callbacks.connect("xlim_changed", self._update_decimated_lines)
+        return line
+
+    @staticmethod
+    def _decimate_points(ax):
+        # about two vertices per horizontal pixel
+        return max(1000, int(2 * ax.bbox.width))
+
+    def _prune_decimated(self):
+        for line in [l for l in self._decimated if l.axes is None or l not in l.axes.get_lines()]:
+            del self._decimated[line]
+
+    def _update_decimated_lines(self, ax):
+        """xlim_changed callback: re-sample the decimated lines of ax and of axes sharing its x axis."""
+        self._prune_decimated()
+        t0, t1 = sorted(ax.get_xlim())
+        n = self._decimate_points(ax)
+        for line, (pyr, _) in self._decimated.items():
+            if line.axes is ax or line.axes.get_shared_x_axes().joined(ax, line.axes):
+                line.set_data(*pyr.view(t0, t1, n))
+
     def update_graph_from_df(self):
         # For XRD, clear ax1 if no xrd_datasets or user hit clear
         # If using xrd_datasets, redraw all
@@ -1822,36 +2842,38 @@ class RenkDegistirici(QMainWindow):
             self.redraw_plot()
             return
         # Fallback: original behavior for single dataset
+        self._drop_peak_labels()
         self.ax.clear()
         try:
             if all(col in self.df.columns for col in ['Time', 'Temperature', 'Displacement']):
-                self.temp_line, = self.ax.plot(self.df['Time'], self.df['Temperature'], '-', color='blue', linewidth=3.5, label='Temperature')
+                self.temp_line = self._plot_decimated(self.ax, None, None, '-', columns=('Time', 'Temperature'),
+                                                      color='blue', linewidth=3.5, label='Temperature')
                 self.ax.set_xlabel('Sintering Time (seconds)', fontsize=14, fontweight='bold', color='black')
                 self.ax.set_ylabel('Temperature (°C)', fontsize=14, fontweight='bold', color='blue')
             else:
-                x = self.df.iloc[:, 0]
-                y = self.df.iloc[:, 1]
+                x, y = self._plot_xy(None, self.df.iloc[:, 1].values)
                 self.ax.plot(x, y, '-', linewidth=2.0, label="XRD", color='blue')
                 if hasattr(self, 'peak_toggle') and self.peak_toggle.isChecked():
                     try:
-                        peaks, _ = find_peaks(y, height=50)
-                        self.ax.plot(x.iloc[peaks] if hasattr(x, 'iloc') else x[peaks],
-                                     (y.iloc[peaks] if hasattr(y, 'iloc') else y[peaks]),
-                                     'ro', label='Detected Peaks')
-                        for peak in peaks:
-                            xpos = x.iloc[peak] if hasattr(x, 'iloc') else x[peak]
-                            ypos = y.iloc[peak] if hasattr(y, 'iloc') else y[peak]
-                            self.ax.annotate(f"{xpos:.2f}", (xpos, ypos), textcoords="offset points", xytext=(0,5), ha='center', fontsize=8, color='black')
+                        y_arr = np.asarray(y, dtype=float)
+                        x_arr = np.asarray(x, dtype=float)
+                        results = xrd_peaks.detect_peaks_stack([y_arr], mode=getattr(self, "peak_detect_mode", "adaptive"),
+                                                     snr=getattr(self, "peak_snr", 5.0))
+                        peaks, strength = results[0]
+                        self.ax.plot(x_arr[peaks], y_arr[peaks], 'ro', label='Detected Peaks')
+                        # One pooled, capped label layer instead of one annotate per peak
+                        self.peak_labels = PeakAnnotationLayer(self.ax, max_labels=getattr(self, "peak_label_limit", 25))
+                        self.peak_labels.set_peaks(x_arr[peaks], y_arr[peaks], strength)
                     except Exception as e:
-                        print("Peak detection error:", e)
-                self.ax.set_xlabel(self.df.columns[0], fontsize=14, fontweight='bold')
+                        QMessageBox.warning(self, "Uyarı", f"Tepe algılama başarısız:\n{e}")
+                xlabel = self.df.columns[0] if self.axis_unit == "2theta" else axes.UNITS[self.axis_unit]
+                self.ax.set_xlabel(xlabel, fontsize=14, fontweight='bold')
                 self.ax.set_ylabel("Intensity", fontsize=14, fontweight='bold')
             self.ax.tick_params(axis='both', labelsize=12, width=2)
             self.ax.grid(False)
             self.ax.legend()
             self.canvas.draw()
         except Exception as e:
-            from PyQt5.QtWidgets import QMessageBox
             QMessageBox.critical(self, "Hata", f"Grafik çizimi sırasında hata oluştu:\n{str(e)}")
 
     def set_y2_tick_format(self):
@@ -1866,15 +2888,13 @@ class RenkDegistirici(QMainWindow):
         self.editor_window = QWidget()
         self.editor_window.setWindowTitle("Verileri Düzenle")
         layout = QVBoxLayout()
-        self.table = QTableWidget()
-        self.table.setRowCount(len(self.df))
-        self.table.setColumnCount(len(self.df.columns))
-        self.table.setHorizontalHeaderLabels(self.df.columns)
-
-        for i in range(len(self.df)):
-            for j in range(len(self.df.columns)):
-                item = QTableWidgetItem(str(self.df.iloc[i, j]))
-                self.table.setItem(i, j, item)
+        # edits are collected as dirty cells and written back column by column on apply
+        self.table_edits = tables.EditLog()
+        self.table_edits.listeners.append(self._refresh_edited_artists)
+        self.table = QTableView()
+        self.table.setModel(FrameTableModel(self.df, self.table_edits, self.table))
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.table.fontMetrics().height() + 6)
 
         layout.addWidget(self.table)
 
@@ -1888,20 +2908,84 @@ class RenkDegistirici(QMainWindow):
 
 
     def apply_table_changes(self):
-        for i in range(self.table.rowCount()):
-            for j in range(self.table.columnCount()):
-                item = self.table.item(i, j)
-                if item is not None:
-                    value = item.text()
-                    try:
-                        self.df.iat[i, j] = float(value)
-                    except ValueError:
-                        self.df.iat[i, j] = value  # Allow non-numeric if applicable
-
-        self.update_graph_from_df()
-        self.canvas.draw()
+        """Write the edited cells back to self.df: one typed conversion and one assignment per edited column."""
+        model = self.table.model()
+        if not len(self.table_edits):
+            self.editor_window.close()
+            return
+        if model.df is not self.df:
+            QMessageBox.warning(self, "Uyarı", "Veri tablo açıldıktan sonra değişti; düzenleyiciyi yeniden açın.")
+            return
+        # a recipe-managed frame is a view that the next refresh rebuilds from the raw frame
+        # (and that undo does not record): the edit has to go into the raw frame
+        managed = getattr(self, "_orig_df", None) is not None and self.df is getattr(self, "_main_view", None)
+        if managed and self.main_recipe:
+            answer = QMessageBox.question(self, "Ön İşleme Etkin",
+                                          "Tablo ön işlenmiş veriyi gösteriyor. Düzenlemeler ham veriye yazılacak "
+                                          "ve ön işleme yeniden uygulanacak. Devam edilsin mi?",
+                                          QMessageBox.Yes | QMessageBox.No)
+            if answer != QMessageBox.Yes:
+                return
+        target = self._orig_df if managed else self.df
+        begun = self._history_begin([None])
+        try:
+            entry = self.table_edits.commit(target)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Değişiklikler uygulanamadı:\n{e}")
+            return
+        self._history_commit("Veri tablosu düzenlendi", begun)
+        if managed and entry["count"]:
+            self._refresh_datasets([None])
+            self.update_graph_from_df()
+            model.set_frame(self.df)
+        model.refresh()
+        if entry["rejected"]:
+            QMessageBox.warning(self, "Uyarı",
+                                f"{entry['rejected']} hücre sütun tipine uymadığı için uygulanmadı (sarı hücreler).")
+            return
         self.editor_window.close()
 
+    def _refresh_edited_artists(self, entry):
+        """Edit-log listener: update only the lines drawn from edited columns; a full redraw
+        is needed only when the plot is not made of known column-bound lines."""
+        changed = set(entry["columns"])
+        if not changed:
+            return
+        if "Time" in changed:
+            self._time_index_cache = None
+        if len(self.df.columns) and self.df.columns[0] in changed:
+            # converted d / Q axes are cached per frame object, which was edited in place
+            self._axis_cache.discard(self.df)
+        if getattr(self, "xrd_datasets", None):
+            self.update_graph_from_df()
+            return
+        bound = []
+        for name, xcol, ycol in (("temp_line", "Time", "Temperature"), ("disp_line", "Time", "Displacement")):
+            line = getattr(self, name, None)
+            if (line is not None and line.axes is not None and line in line.axes.get_lines()
+                    and xcol in self.df.columns and ycol in self.df.columns):
+                bound.append((line, xcol, ycol))
+        if not bound:
+            self.update_graph_from_df()
+            return
+        touched = set()
+        for line, xcol, ycol in bound:
+            if changed & {xcol, ycol}:
+                if line in self._decimated:
+                    # edits were made in place: rebuild the summaries of this column pair
+                    self._pyramid_cache.pop((xcol, ycol), None)
+                    pyr = self._column_pyramid(xcol, ycol)
+                    self._decimated[line] = (pyr, (xcol, ycol))
+                    line.set_data(*pyr.view(*sorted(line.axes.get_xlim()), self._decimate_points(line.axes)))
+                else:
+                    line.set_data(self.df[xcol].to_numpy(), self.df[ycol].to_numpy())
+                touched.add(line.axes)
+        for ax in touched:
+            ax.relim()
+            ax.autoscale_view()
+        if touched:
+            self.canvas.draw_idle()
+
 
     def save_data_to_file(self):
         filename, _ = QFileDialog.getSaveFileName(self, "Veriyi Kaydet", "", "Excel Files (*.xlsx);;CSV Files (*.csv)")
@@ -1948,15 +3032,19 @@ class RenkDegistirici(QMainWindow):
     # --- Additional methods for RenkDegistirici ---
     def add_row_to_table(self):
         # Add a new row with zeros for all columns
-        self.df.loc[len(self.df)] = [0] * len(self.df.columns)
+        begun = self._history_begin([None])
+        self.df = pd.concat([self.df, pd.DataFrame([[0] * len(self.df.columns)], columns=self.df.columns)],
+                            ignore_index=True)
+        self._history_commit("Satır eklendi", begun)
         self.open_data_editor()
 
     def delete_selected_row(self):
         # Remove the selected row from the table and dataframe
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected >= 0:
-            self.df.drop(self.df.index[selected], inplace=True)
-            self.df.reset_index(drop=True, inplace=True)
+            begun = self._history_begin([None])
+            self.df = self.df.drop(self.df.index[selected]).reset_index(drop=True)
+            self._history_commit("Satır silindi", begun)
             self.open_data_editor()
 
     def filter_data_by_time(self):
@@ -1964,32 +3052,108 @@ class RenkDegistirici(QMainWindow):
         max_time, ok2 = QInputDialog.getDouble(self, "Üst Zaman Sınırı", "Maximum Time:", decimals=2)
         if ok1 and ok2:
             filtered_df = self.df[(self.df['Time'] >= min_time) & (self.df['Time'] <= max_time)].copy()
+            begun = self._history_begin([None])
             self.df = filtered_df.reset_index(drop=True)
+            self._history_commit("Zaman filtresi", begun)
             self.update_graph_from_df()
 
     def load_comparison_file(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Dosya Seç (Karşılaştırma)", "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)")
         if filename:
-            if filename.endswith(('.xlsx', '.xls')):
-                compare_df = pd.read_excel(filename)
-            else:
-                compare_df = pd.read_csv(filename)
-            self.ax1.plot(compare_df['Time'], compare_df['Temperature'], '--', color='green', linewidth=2, label='Karşılaştırma Temp')
-            self.ax2.plot(compare_df['Time'], compare_df['Displacement'], '--', color='purple', linewidth=2, label='Karşılaştırma Disp')
+            compare_df = self._read_log(filename)
+            if compare_df is None:
+                return
+            t = compare_df['Time'].to_numpy(dtype=float)
+            self._plot_decimated(self.ax1, t, compare_df['Temperature'].to_numpy(dtype=float), '--', color='green',
+                                 linewidth=2, label='Karşılaştırma Temp')
+            self._plot_decimated(self.ax2, t, compare_df['Displacement'].to_numpy(dtype=float), '--', color='purple',
+                                 linewidth=2, label='Karşılaştırma Disp')
             self.canvas.draw()
             self.update_legend()
 
+    def _time_index(self):
+        """Sorted index of self.df['Time'], reused while the frame is the same."""
+        hit = self._time_index_cache
+        if hit is not None and hit[0] is self.df and len(hit[1]) == len(self.df):
+            return hit[1]
+        index = sintering.TimeIndex(self.df["Time"].to_numpy(dtype=float))
+        self._time_index_cache = (self.df, index)
+        return index
+
+    def _ask_event_times(self):
+        """(times, labels) typed as a list or read from an event file; None if cancelled."""
+        source, ok = QInputDialog.getItem(self, "Olay Noktaları", "Zamanların kaynağı:",
+                                          ["Elle gir (liste)", "Olay dosyasından (CSV/Excel)"], 0, False)
+        if not ok:
+            return None
+        if source.startswith("Elle"):
+            text, ok = QInputDialog.getText(self, "Olay Noktaları", "Zaman değerleri (virgül veya boşlukla ayrılmış):")
+            if not ok or not text.strip():
+                return None
+            times = tables.parse_block(text).ravel()
+            return times[~np.isnan(times)], None
+        path, _ = QFileDialog.getOpenFileName(self, "Olay Dosyası Seç", "", "CSV/Excel Files (*.csv *.txt *.xlsx *.xls)")
+        if not path:
+            return None
+        try:
+            return loaders.read_events(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Olay dosyası okunamadı:\n{e}")
+            return None
+
     def highlight_data_point(self):
-        value, ok = QInputDialog.getDouble(self, "Vurgulanacak Zaman", "Time Değeri:", decimals=2)
-        if ok:
-            nearest_index = (self.df['Time'] - value).abs().idxmin()
-            x = self.df.loc[nearest_index, 'Time']
-            y_temp = self.df.loc[nearest_index, 'Temperature']
-            y_disp = self.df.loc[nearest_index, 'Displacement']
-            self.ax1.plot(x, y_temp, 'o', color='blue', markersize=10, label='Vurgulu Temp')
-            self.ax2.plot(x, y_disp, 'o', color='red', markersize=10, label='Vurgulu Disp')
-            self.canvas.draw()
-            self.update_legend()
+        """Mark Temperature / Displacement at many times at once (a typed list or an event file).
+        Values are interpolated through the sorted time index and all markers of an axis are
+        one artist, so thousands of events cost one line each."""
+        if not self._has_sintering_columns(self.df):
+            QMessageBox.warning(self, "Uyarı", "Önce Time / Temperature / Displacement sütunlu bir sinterleme verisi yükleyin.")
+            return
+        picked = self._ask_event_times()
+        if picked is None:
+            return
+        times, labels = picked
+        if not times.size:
+            QMessageBox.warning(self, "Uyarı", "Geçerli zaman değeri bulunamadı.")
+            return
+        events = self._time_index().lookup(times, {c: self.df[c].to_numpy(dtype=float)
+                                                   for c in ("Temperature", "Displacement")})
+        table = pd.DataFrame(events, copy=False)
+        if labels is not None:
+            table.insert(0, "Olay", labels)
+        self.event_points = table
+
+        for line in self.event_markers:
+            if line.axes is not None:
+                line.remove()
+        self.event_markers = []
+        temp_ax = self.temp_line.axes if getattr(self, "temp_line", None) is not None and self.temp_line.axes else self.ax
+        line, = temp_ax.plot(events["Time"], events["Temperature"], 'o', linestyle='none', color='blue',
+                             markersize=8, label='Olaylar (Temp)')
+        self.event_markers.append(line)
+        disp_line = getattr(self, "disp_line", None)
+        if disp_line is not None and disp_line.axes is not None and disp_line.axes.figure is self.figure:
+            line, = disp_line.axes.plot(events["Time"], events["Displacement"], 'o', linestyle='none', color='red',
+                                        markersize=8, label='Olaylar (Disp)')
+            self.event_markers.append(line)
+        self.canvas.draw_idle()
+        self.update_legend()
+
+        missing = int(np.isnan(events["Temperature"]).sum())
+        lines = [(f"{row['Olay']}: " if row.get("Olay") else "") + f"t = {row['Time']:.2f} s, "
+                 f"{row['Temperature']:.1f} °C, deplasman {row['Displacement']:.4g}" for _, row in table.head(20).iterrows()]
+        if len(table) > 20:
+            lines.append(f"... (+{len(table) - 20} olay)")
+        if missing:
+            lines.append(f"{missing} zaman kayıt aralığının dışında (işaretlenmedi).")
+        QMessageBox.information(self, "Olay Noktaları", "\n".join(lines))
+        save_path, _ = QFileDialog.getSaveFileName(self, "Olay Tablosunu Kaydet", "", "CSV Files (*.csv)")
+        if not save_path:
+            return
+        try:
+            table.to_csv(save_path, index=False)
+            QMessageBox.information(self, "Başarılı", "Olay tablosu kaydedildi.")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Kaydedilemedi:\n{e}")
 
     def add_trend_line(self):
         degree, ok = QInputDialog.getInt(self, "Trend Çizgisi Derecesi", "Polinom Derecesi:", 1, 1, 5)
@@ -1998,10 +3162,194 @@ class RenkDegistirici(QMainWindow):
             temp_vals = self.df['Temperature'].values
             coeffs = np.polyfit(time_vals, temp_vals, degree)
             trend = np.poly1d(coeffs)
-            self.ax1.plot(time_vals, trend(time_vals), '-', linewidth=2, label=f'Trend Temp (deg={degree})')
+            # fitted on every row; a smooth polynomial needs no more than a couple of thousand vertices
+            t_plot = np.linspace(np.nanmin(time_vals), np.nanmax(time_vals), min(len(time_vals), 2000))
+            self.ax1.plot(t_plot, trend(t_plot), '-', linewidth=2, label=f'Trend Temp (deg={degree})')
             self.canvas.draw()
             self.update_legend()
 
+    # --- Sintering kinetics (shrinkage rate, density, onset) ---
+    KINETICS_CURVES = {
+        "Büzülme hızı (%/dk)": ("rate", 100.0 * 60.0),
+        "Büzülme (%)": ("shrinkage", 100.0),
+        "Göreli yoğunluk (%)": ("density", 100.0),
+    }
+
+    def _has_sintering_columns(self, df):
+        return df is not None and all(c in df.columns for c in ("Time", "Temperature", "Displacement"))
+
+    def _ask_kinetics_params(self):
+        """QInputDialog chain for the kinetics parameters; None if cancelled."""
+        length0, ok = QInputDialog.getDouble(self, "Sinterleme Kinetiği", "Numunenin ilk boyu L0 (deplasman birimiyle):",
+                                             10.0, 1e-6, 1e6, 4)
+        if not ok:
+            return None
+        window, ok = QInputDialog.getInt(self, "Sinterleme Kinetiği", "Türev penceresi (nokta, tek):", 101, 5, 100001, 2)
+        if not ok:
+            return None
+        onset, ok = QInputDialog.getDouble(self, "Sinterleme Kinetiği", "Başlangıç eşiği (en yüksek hızın %'si):",
+                                           5.0, 0.1, 99.0, 1)
+        if not ok:
+            return None
+        direction, ok = QInputDialog.getItem(self, "Sinterleme Kinetiği", "Büzülmede deplasman:",
+                                             ["Artıyor (piston ilerlemesi)", "Azalıyor"], 0, False)
+        if not ok:
+            return None
+        green, ok = QInputDialog.getDouble(self, "Sinterleme Kinetiği",
+                                           "Ham (yeşil) göreli yoğunluk (%) — 0: yoğunluk hesaplanmaz:", 0.0, 0.0, 100.0, 1)
+        if not ok:
+            return None
+        params = {"length0": length0, "window": window | 1, "onset_fraction": onset / 100.0,
+                  "increasing": direction.startswith("Art"), "green_density": green / 100.0 or None}
+        if params["green_density"]:
+            mode, ok = QInputDialog.getItem(self, "Sinterleme Kinetiği", "Büzülme türü:",
+                                            ["Eksenel (kalıp içi)", "İzotropik"], 0, False)
+            if not ok:
+                return None
+            params["mode"] = "axial" if mode.startswith("Eks") else "isotropic"
+        return params
+
+    def analyze_sintering_kinetics(self):
+        """Shrinkage rate, relative density and onset / peak-rate temperatures of the loaded log;
+        the chosen curve is drawn on a secondary axis."""
+        if not self._has_sintering_columns(self.df):
+            QMessageBox.warning(self, "Uyarı", "Önce Time / Temperature / Displacement sütunlu bir sinterleme verisi yükleyin.")
+            return
+        params = self._ask_kinetics_params()
+        if params is None:
+            return
+        curves = [c for c, (key, _) in self.KINETICS_CURVES.items() if key != "density" or params["green_density"]]
+        curve, ok = QInputDialog.getItem(self, "Sinterleme Kinetiği", "İkincil eksende çizilecek eğri:", curves, 0, False)
+        if not ok:
+            return
+        t = self.df["Time"].to_numpy(dtype=float)
+        temp = self.df["Temperature"].to_numpy(dtype=float)
+        try:
+            res = sintering.kinetics(t, temp, self.df["Displacement"].to_numpy(dtype=float), **params)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Kinetik analizi başarısız:\n{e}")
+            return
+        self.kinetics_results = res
+        key, scale = self.KINETICS_CURVES[curve]
+        ax = self.ax
+        old = getattr(self, "kinetics_ax", None)
+        if old is not None and old.figure is self.figure and old in self.figure.axes:
+            old.remove()
+        self.kinetics_ax = ax.twinx()
+        if getattr(self, "ax2", None) is not None and self.ax2.figure is self.figure and self.ax2 in self.figure.axes:
+            # the displacement axis already uses the right spine
+            self.kinetics_ax.spines["right"].set_position(("axes", 1.12))
+        self._plot_decimated(self.kinetics_ax, t, res[key] * scale, '-', color='green', linewidth=1.5, label=curve)
+        self.kinetics_ax.set_ylabel(curve, color='green')
+        for when, style, label in ((res["onset_time"], '--', f"Başlangıç {res['onset_T']:.0f} °C"),
+                                   (res["peak_rate_time"], ':', f"En yüksek hız {res['peak_rate_T']:.0f} °C")):
+            ax.axvline(when, color='green', linestyle=style, linewidth=1.2, label=label)
+        self.canvas.draw_idle()
+        self.update_legend()
+        self._report_kinetics([getattr(self, "current_filename", "Sinterleme")], [res],
+                              curves=(t, temp, res, params["green_density"]))
+
+    def analyze_sintering_batch(self):
+        """Kinetics of many sintering logs at once (short equal-length runs are computed as one stack):
+        summary table, overlay of the chosen curve vs temperature, CSV export."""
+        files, _ = QFileDialog.getOpenFileNames(self, "Sinterleme Logları Seç", "", "Excel/CSV Files (*.xlsx *.xls *.csv *.txt)")
+        if not files:
+            return
+        runs, names = [], []
+        for path in files:
+            try:
+                df = self._read_log(path)
+            except Exception as e:
+                QMessageBox.critical(self, "Hata", f"{os.path.basename(path)} okunamadı:\n{e}")
+                return
+            if df is None:
+                return
+            if not self._has_sintering_columns(df):
+                QMessageBox.warning(self, "Uyarı", f"{os.path.basename(path)}: Time / Temperature / Displacement sütunları yok, atlandı.")
+                continue
+            runs.append(tuple(df[c].to_numpy(dtype=float) for c in ("Time", "Temperature", "Displacement")))
+            names.append(os.path.basename(path))
+        if not runs:
+            return
+        params = self._ask_kinetics_params()
+        if params is None:
+            return
+        try:
+            results = sintering.kinetics_batch(runs, **params)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Kinetik analizi başarısız:\n{e}")
+            return
+        self.kinetics_batch_results = (names, results)
+        self._show_kinetics_overlay(names, runs, results, params["green_density"])
+
+    def _report_kinetics(self, names, results, curves=None):
+        """Summary message and CSV export (summary table; full curves too for a single run)."""
+        table = sintering.summary_table(names, results)
+        lines = []
+        for _, row in table.head(20).iterrows():
+            lines.append(f"{row['Run']}: başlangıç {row['Başlangıç Sıcaklığı (°C)']:.0f} °C, en yüksek hız "
+                         f"{row['En Yüksek Hız (%/dk)']:.3g} %/dk @ {row['En Yüksek Hız Sıcaklığı (°C)']:.0f} °C, "
+                         f"büzülme {row['Son Büzülme (%)']:.2f} %")
+        if len(table) > 20:
+            lines.append(f"... (+{len(table) - 20} koşu)")
+        QMessageBox.information(self, "Sinterleme Kinetiği", "\n".join(lines))
+        save_path, _ = QFileDialog.getSaveFileName(self, "Kinetik Özetini Kaydet", "", "CSV Files (*.csv)")
+        if not save_path:
+            return
+        try:
+            base = save_path[:-4] if save_path.lower().endswith(".csv") else save_path
+            table.to_csv(base + ".csv", index=False)
+            if curves is not None:
+                t, temp, res, green = curves
+                out = pd.DataFrame({"Time": t, "Temperature": temp, "Büzülme (%)": res["shrinkage"] * 100.0,
+                                    "Büzülme hızı (%/dk)": res["rate"] * 6000.0}, copy=False)
+                if green:
+                    out["Göreli yoğunluk (%)"] = res["density"] * 100.0
+                out.to_csv(base + "_curves.csv", index=False)
+            QMessageBox.information(self, "Başarılı", "Kinetik özeti kaydedildi.")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Kaydedilemedi:\n{e}")
+
+    def _show_kinetics_overlay(self, names, runs, results, green_density):
+        """Window with shrinkage rate (and density) vs temperature of every run, drawn from min/max pyramids."""
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Sinterleme Kinetiği (Toplu)")
+        vbox = QVBoxLayout(dlg)
+        fig, axs = plt.subplots(2 if green_density else 1, 1, sharex=True, figsize=(7, 7 if green_density else 4.5),
+                                squeeze=False)
+        axs = axs[:, 0]
+        canvas = FigureCanvas(fig)
+        vbox.addWidget(NavigationToolbar2QT(canvas, dlg))
+        vbox.addWidget(canvas)
+        colors = plt.cm.tab10.colors
+        for i, (name, (t, temp, _), res) in enumerate(zip(names, runs, results)):
+            c = colors[i % len(colors)]
+            rows = sintering.MinMaxPyramid(np.arange(len(t), dtype=float), res["rate"]).view_rows(max_points=4000)
+            axs[0].plot(temp[rows], res["rate"][rows] * 6000.0, '-', color=c, linewidth=1, label=name)
+            axs[0].axvline(res["onset_T"], color=c, linestyle='--', linewidth=0.8)
+            if green_density:
+                axs[1].plot(temp[rows], res["density"][rows] * 100.0, '-', color=c, linewidth=1)
+        axs[0].set_ylabel("Büzülme hızı (%/dk)")
+        if green_density:
+            axs[1].set_ylabel("Göreli yoğunluk (%)")
+        axs[-1].set_xlabel("Temperature (°C)")
+        if len(names) <= 20:
+            axs[0].legend(fontsize=7, loc="best")
+        fig.tight_layout()
+
+        h = QHBoxLayout()
+        btn_save = QPushButton("Özeti Kaydet")
+        btn_close = QPushButton("Kapat")
+        h.addStretch()
+        h.addWidget(btn_save)
+        h.addWidget(btn_close)
+        vbox.addLayout(h)
+        btn_save.clicked.connect(lambda: self._report_kinetics(names, results))
+        btn_close.clicked.connect(dlg.close)
+        dlg.finished.connect(lambda _: plt.close(fig))
+        dlg.resize(800, 800 if green_density else 550)
+        dlg.exec_()
+
     def clear_overlays(self):
         self.update_graph_from_df()
 
@@ -2286,15 +3634,14 @@ class RenkDegistirici(QMainWindow):
 
     # ---------- Ön işleme: yardımcılar ----------
     def _ensure_backup(self):
-        """Keep a copy of original data to allow reset."""
-        if not hasattr(self, "_orig_df") or self._orig_df is None:
-            if hasattr(self, "df") and self.df is not None:
+        """Keep a copy of the raw data; preprocessing recipes are evaluated from it."""
+        if getattr(self, "df", None) is not None:
+            # a main frame that was not produced by the recipe (new file, filter, edit) is the new raw data
+            if getattr(self, "_orig_df", None) is None or self.df is not getattr(self, "_main_view", None):
                 self._orig_df = self.df.copy()
-        # for multi-datasets
-        if hasattr(self, "xrd_datasets") and self.xrd_datasets:
-            for d in self.xrd_datasets:
-                if "orig_df" not in d or d["orig_df"] is None:
-                    d["orig_df"] = d["df"].copy()
+                self._main_view = self.df
+                self.main_recipe = []
+        # Dataset entries always keep their raw arrays (shared with the display until a recipe runs)
 
     def _select_dataset_index(self):
         """Return -1 for 'all datasets', or an index into self.xrd_datasets; None if cancelled."""
@@ -2306,22 +3653,270 @@ class RenkDegistirici(QMainWindow):
             return None
         return -1 if choice == "Tüm Datasetler" else items.index(choice) - 1
 
-    def _apply_to_all(self, transform_fn):
-        """Apply a y -> transform(y) to active data.
-        If multiple datasets are loaded, apply to all; otherwise apply to main df."""
-        self._ensure_backup()
+    # ---------- Ön işleme tarifi (yıkıcı olmayan) ----------
+    def _preprocess_targets(self):
+        """Datasets a new step applies to ([None] = main data); None if cancelled."""
         if hasattr(self, "xrd_datasets") and self.xrd_datasets:
-            for d in self.xrd_datasets:
-                df = d["df"]
-                y = df.iloc[:, 1].to_numpy()
-                newy = transform_fn(y)
-                d["df"].iloc[:, 1] = newy
+            idx = self._select_dataset_index()
+            if idx is None:
+                return None
+            return list(self.xrd_datasets) if idx == -1 else [self.xrd_datasets[idx]]
+        if getattr(self, "df", None) is None:
+            QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+            return None
+        return [None]
+
+    def _recipe_of(self, d):
+        """Step list of a dataset entry (None = main data)."""
+        if d is None:
+            return self.main_recipe
+        return d.recipe
+
+    def _raw_df(self, d):
+        if d is None:
+            return self._orig_df if getattr(self, "_orig_df", None) is not None else self.df
+        return d.raw_df
+
+    def _raw_arrays(self, d):
+        """(x, y, meta) the recipe of a dataset (None = main data) starts from."""
+        if d is None:
+            raw = self._raw_df(None)
+            return (raw.iloc[:, 0].to_numpy(dtype=float), raw.iloc[:, 1].to_numpy(dtype=float),
+                    getattr(self, "main_meta", None))
+        return d.raw_x, d.raw_y, d.meta
+
+    def _evaluate_recipe(self, d, upto=None):
+        """(x, y) of a dataset after the first `upto` recipe steps (all by default)."""
+        x, y, meta = self._raw_arrays(d)
+        return x, recipe.evaluate(x, y, self._recipe_of(d), meta, self._recipe_cache, upto)
+
+    def _refresh_dataset(self, d):
+        """Rebuild the displayed data of a dataset (None = main data) from raw data + recipe."""
+        _, y = self._evaluate_recipe(d)
+        self._set_processed(d, y)
+
+    def _set_processed(self, d, y):
+        if d is not None:
+            d.set_values(y, d.raw_x)
+            return
+        df = self._raw_df(d).copy()
+        df.iloc[:, 1] = y
+        self.df = self._main_view = df
+
+    def _refresh_datasets(self, targets):
+        """_refresh_dataset for many datasets. Steps that are not cached yet run in a
+        process pool (shared-memory arrays) with a progress dialog when there are enough scans."""
+        pending = []
+        for d in targets:
+            x, y, meta = self._raw_arrays(d)
+            steps = list(self._recipe_of(d))
+            keys = recipe.chain_keys(x, y, steps, meta)
+            done, out = recipe.cached_prefix(keys, self._recipe_cache)
+            if done == len(steps):
+                self._set_processed(d, y if out is None else out)
+            else:
+                # keys of every remaining step, so the whole chain is memoised
+                pending.append((d, keys[done:], x, y if out is None else out, steps[done:], meta))
+        pending = self._refresh_stacked(pending)
+        if len(pending) < parallel.MIN_PARALLEL:
+            for d, *_ in pending:
+                self._refresh_dataset(d)
+            return
+        dlg = QProgressDialog("Ön işleme uygulanıyor...", None, 0, len(pending), self)
+        dlg.setWindowTitle("Ön İşleme")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(300)
+
+        def progress(done, total):
+            dlg.setValue(done)
+            QApplication.processEvents()
+
+        try:
+            results = parallel.run_recipes([(x, y0, rest, meta) for _, _, x, y0, rest, meta in pending],
+                                           progress=progress, intermediates=True)
+        finally:
+            dlg.close()
+        for (d, keys, *_), outs in zip(pending, results):
+            for key, y_step in zip(keys, outs):
+                self._recipe_cache.put(key, y_step)
+            self._set_processed(d, outs[-1])
+
+    def _refresh_stacked(self, pending):
+        """Run pending recipe tails that are identical and on one 2θ grid as a single 2D call
+        (DatasetStack.apply); every built-in step takes a stack, so "apply to all" on a series
+        from one scan program runs here. Returns the jobs that still have to be done (other
+        grids, other recipes, or registered steps that only take one scan)."""
+        left, groups = [], {}
+        for item in pending:
+            rest, meta = item[4], item[5]
+            if all(st["op"] in recipe.STACKABLE_STEPS for st in rest):
+                sig = (json.dumps(rest, sort_keys=True), json.dumps(meta or {}, sort_keys=True, default=str))
+                groups.setdefault(sig, []).append(item)
+            else:
+                left.append(item)
+        for members in groups.values():
+            for idx in stack.group_by_grid([m[2] for m in members]):
+                if len(idx) == 1:
+                    left.append(members[idx[0]])
+                    continue
+                grp = [members[i] for i in idx]
+                _, _, x, _, rest, meta = grp[0]
+                st = stack.DatasetStack(x, np.vstack([m[3] for m in grp]))
+                for i, st in enumerate(st.apply(rest, meta)):
+                    for (_, keys, *_), y_step in zip(grp, st.Y):
+                        self._recipe_cache.put(keys[i], y_step)
+                for (d, *_), y_new in zip(grp, st.Y):
+                    self._set_processed(d, y_new)
+        return left
+
+    def _add_preprocess_step(self, step, targets, before_ops=()):
+        """Append a step to the recipe of every target (or insert it before the first
+        step whose op is in before_ops) and redraw."""
+        self._ensure_backup()
+        begun = self._history_begin(targets)
+        for d in targets:
+            steps = self._recipe_of(d)
+            pos = next((i for i, st in enumerate(steps) if st["op"] in before_ops), len(steps))
+            steps.insert(pos, recipe.make_step(step["op"], **step["params"]))
+        self._refresh_datasets(targets)
+        self._history_commit(recipe.step_label(step), begun)
+        if targets == [None]:
+            if step["op"] in recipe.BACKGROUND_STEPS:
+                x, before = self._evaluate_recipe(None, upto=-1)
+                self._draw_background(x, before - self.df.iloc[:, 1].to_numpy(dtype=float))
+            self.update_graph_from_df()
+        else:
             self.redraw_plot()
+
+    # ---------- Geri al / yinele ----------
+    def _history_state(self, d):
+        """history.State of a dataset entry (None = main data): raw table (one array per
+        column, dtypes kept) + recipe; None if there is no data."""
+        if d is None:
+            if getattr(self, "df", None) is None:
+                return None
+            managed = self.df is getattr(self, "_main_view", None)
+            raw = self._raw_df(None) if managed else self.df
+            steps = self.main_recipe if managed else []
         else:
-            y = self.df.iloc[:, 1].to_numpy()
-            newy = transform_fn(y)
-            self.df.iloc[:, 1] = newy
+            return history.State(list(d.columns), [d.raw_x, d.raw_y], [dict(st) for st in d.recipe],
+                                 ["float64", "float64"])
+        # copies: the frame may be edited in place before the "after" state is taken
+        values = [np.array(raw.iloc[:, j].to_numpy()) for j in range(raw.shape[1])]
+        return history.State(list(raw.columns), values, [dict(st) for st in steps],
+                             [str(t) for t in raw.dtypes])
+
+    @staticmethod
+    def _frame_from_state(state):
+        """DataFrame of a history.State with the recorded column dtypes."""
+        cols = {}
+        for j, (values, dtype) in enumerate(zip(state.values, state.dtypes)):
+            try:
+                cols[j] = pd.Series(values, dtype=dtype, copy=False)
+            except (TypeError, ValueError):
+                cols[j] = pd.Series(values, copy=False)
+        frame = pd.DataFrame(cols, copy=False)
+        frame.columns = state.columns
+        return frame
+
+    def _history_key(self, d):
+        return -1 if d is None else next(i for i, e in enumerate(self.xrd_datasets) if e is d)
+
+    def _history_begin(self, targets):
+        """Capture the state of targets before a change; pass the result to _history_commit."""
+        return [(d, self._history_state(d)) for d in targets]
+
+    def _history_commit(self, label, begun):
+        changes = {}
+        for d, before in begun:
+            after = self._history_state(d)
+            if before is not None and after is not None:
+                changes[self._history_key(d)] = history.make_delta(before, after)
+        if self.history.push(label, changes):
+            self._update_history_actions()
+
+    def _update_history_actions(self):
+        if not hasattr(self, "undo_action"):
+            return
+        u, r = self.history.undo_label(), self.history.redo_label()
+        self.undo_action.setText(f"Geri Al: {u}" if u else "Geri Al")
+        self.undo_action.setEnabled(u is not None)
+        self.redo_action.setText(f"Yinele: {r}" if r else "Yinele")
+        self.redo_action.setEnabled(r is not None)
+
+    def _history_apply(self, changes, undo):
+        """Bring every target to the other side of a recorded change; False if the data no longer match."""
+        resolved = []
+        # the main frame is the recipe's raw frame only while the shown frame is its view
+        main_managed = getattr(self, "df", None) is not None and self.df is getattr(self, "_main_view", None)
+        for key, delta in changes.items():
+            if key == -1:
+                d = None
+            elif 0 <= key < len(getattr(self, "xrd_datasets", [])):
+                d = self.xrd_datasets[key]
+            else:
+                return False
+            state = self._history_state(d)
+            if state is None or history.fingerprint(state) != delta["fp"][1 if undo else 0]:
+                return False
+            resolved.append((d, history.apply_delta(state, delta, undo)))
+        for d, state in resolved:
+            if d is None:
+                if main_managed:
+                    self._orig_df = self._frame_from_state(state)
+                    self.main_recipe = state.recipe
+                else:
+                    # a plain frame (file, filter, edit): restore it as shown, keep "Orijinale Dön" as is
+                    self.df = self._frame_from_state(state)
+            else:
+                d.columns = tuple(state.columns[:2])
+                d.set_raw(state.values[0], state.values[1])
+                d.recipe = state.recipe
+        self._refresh_datasets([d for d, _ in resolved if d is not None or main_managed])
+        if any(d is None for d, _ in resolved):
             self.update_graph_from_df()
+        else:
+            self.redraw_plot()
+        return True
+
+    def _history_step(self, undo):
+        entry = self.history.undo() if undo else self.history.redo()
+        if entry is None:
+            return
+        label, changes = entry
+        try:
+            ok = self._history_apply(changes, undo)
+        except Exception as e:
+            ok = False
+            QMessageBox.critical(self, "Hata", f"{'Geri alma' if undo else 'Yineleme'} başarısız:\n{e}")
+        if not ok:
+            # data were replaced outside the history (new file, dataset removed...): start over
+            self.history.clear()
+            QMessageBox.warning(self, "Uyarı", "Geçmiş artık mevcut veriyle eşleşmiyor; geçmiş temizlendi.")
+        self._update_history_actions()
+
+    def undo_edit(self):
+        """Undo the last data edit or preprocessing change."""
+        self._history_step(True)
+
+    def redo_edit(self):
+        self._history_step(False)
+
+    def set_history_budget(self):
+        """RAM budget of the undo history; older entries are written to disk beyond it."""
+        mb, ok = QInputDialog.getInt(self, "Geçmiş Bellek Sınırı",
+                                     f"Bellek sınırı (MB) — şu an {self.history.memory_bytes() / 2**20:.1f} MB:",
+                                     int(self.history.budget_bytes / 2**20), 1, 4096, 16)
+        if ok:
+            self.history.budget_bytes = mb * 2**20
+            self.history._enforce_budget()
+
+    def closeEvent(self, event):
+        for worker in list(self._refine_workers):
+            worker.cancel()
+            worker.wait()
+        self.history.close()
+        super().closeEvent(event)
 
     def _draw_background(self, x, bg):
         """Draw (or update) a dashed background curve for single-dataset mode."""
@@ -2350,6 +3945,37 @@ class RenkDegistirici(QMainWindow):
             self._bg_line.set_visible(self._bg_visible)
             self.canvas.draw()
 
+    # ---------- Sıçrama (spike / kozmik ışın) giderme ----------
+    def preprocess_despike(self):
+        """Replace detector zingers (robust local z-score) by interpolation; runs before smoothing."""
+        try:
+            threshold, ok = QInputDialog.getDouble(self, "Sıçrama Giderme", "Eşik (robust z-skoru):", 6.0, 2.0, 50.0, 1)
+            if not ok:
+                return
+            window, ok = QInputDialog.getInt(self, "Sıçrama Giderme", "Medyan penceresi (nokta):", 7, 3, 51, 2)
+            if not ok:
+                return
+            max_width, ok = QInputDialog.getInt(self, "Sıçrama Giderme", "En geniş sıçrama (nokta):\n"
+                                                "(FWHM'si bu kadar nokta veya daha dar olan gerçek tepeler de silinir)",
+                                                3, 1, 10, 1)
+            if not ok:
+                return
+            targets = self._preprocess_targets()
+            if targets is None:
+                return
+            step = recipe.make_step("despike", window=window | 1, threshold=threshold, max_width=max_width)
+            self._add_preprocess_step(step, targets, before_ops=("savgol",))
+            lines = []
+            for d in targets:
+                pos = next(i for i, st in enumerate(self._recipe_of(d)) if st == step)
+                _, before = self._evaluate_recipe(d, upto=pos)
+                _, after = self._evaluate_recipe(d, upto=pos + 1)
+                name = "Ana veri" if d is None else d.get("filename", "Dataset")
+                lines.append(f"{name}: {np.count_nonzero(before != after)} nokta")
+            QMessageBox.information(self, "Sıçrama Giderme", "Değiştirilen noktalar:\n" + "\n".join(lines))
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Sıçrama giderme başarısız:\n{e}")
+
     # ---------- Yumuşatma ----------
     def preprocess_savgol(self):
         """Savitzky–Golay smoothing on current data."""
@@ -2362,139 +3988,280 @@ class RenkDegistirici(QMainWindow):
             poly, ok2 = QInputDialog.getInt(self, "Savitzky–Golay", "Polinom derecesi:", 3, 1, 7, 1)
             if not ok2:
                 return
-            def fn(y):
-                return savgol_filter(y, window_length=win, polyorder=poly)
-            target_idx = self._select_dataset_index()
-            self._ensure_backup()
-            if target_idx is None:
-                # no multi-dataset, apply to main df
-                self._apply_to_all(fn)
-            elif target_idx == -1:
-                # all datasets
-                self._apply_to_all(fn)
-            else:
-                # single dataset
-                d = self.xrd_datasets[target_idx]
-                y_arr = d["df"].iloc[:, 1].to_numpy()
-                d["df"].iloc[:, 1] = fn(y_arr)
-                self.redraw_plot()
+            targets = self._preprocess_targets()
+            if targets is None:
+                return
+            self._add_preprocess_step(recipe.make_step("savgol", window=win, polyorder=poly), targets)
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Yumuşatma uygulanamadı:\n{e}")
 
-    # ---------- Arka plan çıkarma: Asymmetric Least Squares (ALS) ----------
+    # ---------- Arka plan çıkarma: cezalı en küçük kareler (ALS / arPLS / airPLS) ----------
+    BASELINE_METHODS = {"als": "ALS", "arpls": "arPLS", "airpls": "airPLS"}
+
     def _baseline_als(self, y, lam=1e5, p=0.01, niter=10):
         """Return baseline using Asymmetric Least Squares (Eilers & Boelens, 2005)."""
-        L = len(y)
-        D = sparse.diags([1, -2, 1], [0, -1, -2], shape=(L, L-2)).T
-        w = np.ones(L)
-        for _ in range(niter):
-            W = sparse.spdiags(w, 0, L, L)
-            Z = W + lam * (D.T @ D)
-            z = spsolve(Z, w * y)
-            w = p * (y > z) + (1 - p) * (y < z)
-        return z
+        return baseline.als(y, lam=lam, p=p, niter=niter)
+
+    def _ask_baseline_params(self, method):
+        """Ask the parameters of a penalised baseline method; None if cancelled."""
+        lam, ok = QInputDialog.getDouble(self, f"{self.BASELINE_METHODS[method]} Parametresi λ",
+                                         "λ (örn: 1e5):", 1e5, 1e2, 1e9, 0)
+        if not ok:
+            return None
+        params = {"lam": lam}
+        if method == "als":
+            p, ok = QInputDialog.getDouble(self, "Asimetri p", "p (0-1, küçük değer tepe korur):", 0.01, 0.001, 0.5, 3)
+            if not ok:
+                return None
+            params["p"] = p
+            niter, ok = QInputDialog.getInt(self, "Iterasyon", "niter:", 10, 5, 50, 1)
+        elif method == "arpls":
+            niter, ok = QInputDialog.getInt(self, "Iterasyon", "En fazla iterasyon:", 50, 5, 500, 5)
+        else:
+            niter, ok = QInputDialog.getInt(self, "Iterasyon", "En fazla iterasyon:", 15, 3, 100, 1)
+        if not ok:
+            return None
+        params["niter"] = niter
+        return params
 
     def preprocess_baseline_als(self):
         """Estimate baseline with ALS and subtract it. Also offer to show the baseline."""
+        self._preprocess_baseline_pls("als")
+
+    def preprocess_baseline_arpls(self):
+        """Estimate baseline with arPLS and subtract it."""
+        self._preprocess_baseline_pls("arpls")
+
+    def preprocess_baseline_airpls(self):
+        """Estimate baseline with airPLS and subtract it."""
+        self._preprocess_baseline_pls("airpls")
+
+    def _preprocess_baseline_pls(self, method):
+        name = self.BASELINE_METHODS[method]
         try:
-            lam, ok1 = QInputDialog.getDouble(self, "ALS Parametresi λ", "λ (örn: 1e5):", 1e5, 1e2, 1e9, 0)
-            if not ok1:
-                return
-            p, ok2 = QInputDialog.getDouble(self, "Asimetri p", "p (0-1, küçük değer tepe korur):", 0.01, 0.001, 0.5, 3)
-            if not ok2:
-                return
-            niter, ok3 = QInputDialog.getInt(self, "Iterasyon", "niter:", 10, 5, 50, 1)
-            if not ok3:
+            params = self._ask_baseline_params(method)
+            if params is None:
                 return
 
-            if hasattr(self, "xrd_datasets") and self.xrd_datasets:
-                def fn(y):
-                    bg = self._baseline_als(y, lam=lam, p=p, niter=niter)
-                    return y - bg
-                target_idx = self._select_dataset_index()
-                self._ensure_backup()
-                if target_idx is None or target_idx == -1:
-                    self._apply_to_all(fn)
-                else:
-                    d = self.xrd_datasets[target_idx]
-                    y_arr = d["df"].iloc[:, 1].to_numpy()
-                    bg = self._baseline_als(y_arr, lam=lam, p=p, niter=niter)
-                    d["df"].iloc[:, 1] = y_arr - bg
-                    self.redraw_plot()
-            else:
-                x = self.df.iloc[:, 0].to_numpy()
-                y = self.df.iloc[:, 1].to_numpy()
-                bg = self._baseline_als(y, lam=lam, p=p, niter=niter)
-                self._draw_background(x, bg)
-                self.df.iloc[:, 1] = y - bg
-                self.update_graph_from_df()
+            targets = self._preprocess_targets()
+            if targets is None:
+                return
+            self._add_preprocess_step(recipe.make_step(method, **params), targets)
         except Exception as e:
-            QMessageBox.critical(self, "Hata", f"ALS arka plan çıkarma başarısız:\n{e}")
+            QMessageBox.critical(self, "Hata", f"{name} arka plan çıkarma başarısız:\n{e}")
 
     # ---------- Arka plan çıkarma: Rolling minimum/median ----------
     def preprocess_baseline_rolling(self):
-        """Baseline by rolling minimum (morphological)."""
+        """Baseline by rolling minimum, median or opening (morphological)."""
         try:
-            win, ok = QInputDialog.getInt(self, "Rolling Min/Median", "Pencere (noktalar):", 101, 5, 2001, 2)
+            win, ok = QInputDialog.getInt(self, "Rolling Min/Median", "Pencere (noktalar):", 101, 5, 20001, 2)
             if not ok:
                 return
-            method, ok2 = QInputDialog.getItem(self, "Yöntem", "Seç:", ["Min", "Median"], 0, False)
+            methods = {"Min": "min", "Median": "median", "Açma / Top-hat": "opening"}
+            label, ok2 = QInputDialog.getItem(self, "Yöntem", "Seç:", list(methods), 0, False)
             if not ok2:
                 return
-            half = max(1, win // 2)
-            def rolling_baseline(y):
-                n = len(y)
-                bg = np.empty(n)
-                for i in range(n):
-                    a = max(0, i - half)
-                    b = min(n, i + half + 1)
-                    if method == "Min":
-                        bg[i] = np.min(y[a:b])
-                    else:
-                        bg[i] = np.median(y[a:b])
-                return bg
-            if hasattr(self, "xrd_datasets") and self.xrd_datasets:
-                def fn(y):
-                    bg = rolling_baseline(y)
-                    return y - bg
-                target_idx = self._select_dataset_index()
-                self._ensure_backup()
-                if target_idx is None or target_idx == -1:
-                    self._apply_to_all(fn)
-                else:
-                    d = self.xrd_datasets[target_idx]
-                    y_arr = d["df"].iloc[:, 1].to_numpy()
-                    bg = rolling_baseline(y_arr)
-                    d["df"].iloc[:, 1] = y_arr - bg
-                    self.redraw_plot()
-            else:
-                x = self.df.iloc[:, 0].to_numpy()
-                y = self.df.iloc[:, 1].to_numpy()
-                bg = rolling_baseline(y)
-                self._draw_background(x, bg)
-                self.df.iloc[:, 1] = y - bg
-                self.update_graph_from_df()
+            targets = self._preprocess_targets()
+            if targets is None:
+                return
+            self._add_preprocess_step(recipe.make_step("rolling", window=win, method=methods[label]), targets)
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Rolling arka plan çıkarma başarısız:\n{e}")
 
+    # ---------- Kα2 çıkarma (Rachinger) ----------
+    def _scan_meta(self, d, anode=None):
+        """Metadata dict of a dataset entry; fills in the anode if it is missing."""
+        meta = d.setdefault("meta", {}) if d is not None else getattr(self, "main_meta", None)
+        if meta is None:
+            meta = self.main_meta = {}
+        if anode and not any(k in meta for k in ("anode", "ka1")):
+            meta["anode"] = anode
+        return meta
+
+    def preprocess_strip_ka2(self):
+        """Strip the Kα2 component; wavelengths and ratio come from each scan's metadata."""
+        try:
+            targets = self._preprocess_targets()
+            if targets is None:
+                return
+            metas = [d.get("meta") if d is not None else getattr(self, "main_meta", None) for d in targets]
+            params = {}
+            if any(not m or not any(k in m for k in ("anode", "ka1")) for m in metas):
+                anodes = list(kalpha.ANODES)
+                anode, ok = QInputDialog.getItem(self, "Anot", "Metadata olmayan taramalar için anot:", anodes, 0, False)
+                if not ok:
+                    return
+                # kept in the step too, so the recipe gives the same result on other scans without metadata
+                params["anode"] = anode
+                for d in targets:
+                    self._scan_meta(d, anode)
+            self._add_preprocess_step(recipe.make_step("strip_ka2", **params), targets)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Kα2 çıkarma başarısız:\n{e}")
+
     def preprocess_reset(self):
-        """Revert to original data (and clear background curve)."""
+        """Revert to original data: clear all recipes (and the background curve)."""
         if hasattr(self, "_bg_line") and self._bg_line is not None:
             try:
                 self._bg_line.remove()
             except Exception:
                 pass
             self._bg_line = None
+        targets = list(self.xrd_datasets) if getattr(self, "xrd_datasets", None) else [None]
+        begun = self._history_begin(targets)
+        self.main_recipe = []
         if hasattr(self, "_orig_df") and self._orig_df is not None:
-            self.df = self._orig_df.copy()
+            self.df = self._main_view = self._orig_df.copy()
         if hasattr(self, "xrd_datasets") and self.xrd_datasets:
             for d in self.xrd_datasets:
-                if "orig_df" in d and d["orig_df"] is not None:
-                    d["df"] = d["orig_df"].copy()
+                d.recipe = []
+                d.reset()
+        self._history_commit("Orijinale Dön", begun)
+        if hasattr(self, "xrd_datasets") and self.xrd_datasets:
             self.redraw_plot()
         else:
             self.update_graph_from_df()
 
+    def open_preprocess_preview(self):
+        """Non-modal slider panel with live preview of smoothing / baseline parameters."""
+        if not getattr(self, "xrd_datasets", None) and getattr(self, "df", None) is None:
+            QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+            return
+        if getattr(self, "_preview_dlg", None) is not None:
+            self._preview_dlg.close()
+        self._preview_dlg = PreprocessPreviewDialog(self)
+        self._preview_dlg.show()
+
+    def edit_preprocess_recipe(self):
+        """Show, edit, reorder, save/load and reapply the preprocessing recipe of a dataset."""
+        if hasattr(self, "xrd_datasets") and self.xrd_datasets:
+            entries = list(self.xrd_datasets)
+            names = [d.get("filename", f"Dataset {i}") for i, d in enumerate(entries)]
+        elif getattr(self, "df", None) is not None:
+            entries, names = [None], ["Ana veri"]
+        else:
+            QMessageBox.warning(self, "Uyarı", "Önce bir XRD verisi yükleyin.")
+            return
+        self._ensure_backup()
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Ön İşleme Tarifi")
+        vbox = QVBoxLayout(dlg)
+        combo = QComboBox()
+        combo.addItems(names)
+        vbox.addWidget(combo)
+        steps_list = QListWidget()
+        vbox.addWidget(steps_list)
+
+        def current():
+            return entries[combo.currentIndex()]
+
+        def fill(row=None):
+            steps_list.clear()
+            steps_list.addItems([f"{i + 1}. {recipe.step_label(st)}" for i, st in enumerate(self._recipe_of(current()))])
+            if row is not None and 0 <= row < steps_list.count():
+                steps_list.setCurrentRow(row)
+
+        def changed(targets, row, begun, label):
+            self._refresh_datasets(targets)
+            self._history_commit(label, begun)
+            if targets == [None]:
+                self.update_graph_from_df()
+            else:
+                self.redraw_plot()
+            fill(row)
+
+        def move(delta):
+            steps = self._recipe_of(current())
+            i = steps_list.currentRow()
+            j = i + delta
+            if i < 0 or not 0 <= j < len(steps):
+                return
+            begun = self._history_begin([current()])
+            steps[i], steps[j] = steps[j], steps[i]
+            changed([current()], j, begun, "Tarif adımı taşındı")
+
+        def remove():
+            i = steps_list.currentRow()
+            if i >= 0:
+                begun = self._history_begin([current()])
+                del self._recipe_of(current())[i]
+                changed([current()], min(i, steps_list.count() - 2), begun, "Tarif adımı silindi")
+
+        def edit():
+            i = steps_list.currentRow()
+            if i < 0:
+                return
+            steps = self._recipe_of(current())
+            text, ok = QInputDialog.getText(dlg, "Parametreler", f"{recipe.step_label(steps[i])}\nJSON:",
+                                            QLineEdit.Normal, json.dumps(steps[i]["params"]))
+            if not ok:
+                return
+            try:
+                new_step = recipe.make_step(steps[i]["op"], **json.loads(text))
+                begun = self._history_begin([current()])
+                steps[i] = new_step
+                changed([current()], i, begun, recipe.step_label(new_step))
+            except Exception as e:
+                QMessageBox.critical(dlg, "Hata", f"Parametreler uygulanamadı:\n{e}")
+
+        def apply_to_others():
+            if len(entries) < 2:
+                return
+            src = current()
+            others = [d for d in entries if d is not src]
+            steps = self._recipe_of(src)
+            try:
+                begun = self._history_begin(others)
+                for d in others:
+                    d["recipe"] = [recipe.make_step(st["op"], **st["params"]) for st in steps]
+                changed(others, steps_list.currentRow(), begun, "Tarif diğer datasetlere uygulandı")
+            except Exception as e:
+                QMessageBox.critical(dlg, "Hata", f"Tarif uygulanamadı:\n{e}")
+
+        def save_recipe():
+            fname, _ = QFileDialog.getSaveFileName(dlg, "Tarifi Kaydet", "", "Recipe (*.json)")
+            if not fname:
+                return
+            try:
+                with open(fname, "w", encoding="utf-8") as f:
+                    json.dump(self._recipe_of(current()), f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                QMessageBox.critical(dlg, "Hata", f"Tarif kaydedilemedi:\n{e}")
+
+        def load_recipe():
+            fname, _ = QFileDialog.getOpenFileName(dlg, "Tarif Yükle", "", "Recipe (*.json)")
+            if not fname:
+                return
+            try:
+                with open(fname, "r", encoding="utf-8") as f:
+                    steps = recipe.validate_recipe(json.load(f))
+                d = current()
+                begun = self._history_begin([d])
+                if d is None:
+                    self.main_recipe = steps
+                else:
+                    d["recipe"] = steps
+                changed([d], None, begun, "Tarif yüklendi")
+            except Exception as e:
+                QMessageBox.critical(dlg, "Hata", f"Tarif yüklenemedi:\n{e}")
+
+        buttons = [("Yukarı", lambda: move(-1)), ("Aşağı", lambda: move(1)),
+                   ("Parametreleri Düzenle", edit), ("Sil", remove),
+                   ("Diğer Datasetlere Uygula", apply_to_others),
+                   ("Kaydet", save_recipe), ("Yükle", load_recipe), ("Kapat", dlg.accept)]
+        h = QHBoxLayout()
+        for text, slot in buttons:
+            btn = QPushButton(text)
+            btn.clicked.connect(slot)
+            h.addWidget(btn)
+        vbox.addLayout(h)
+        combo.currentIndexChanged.connect(lambda _: fill())
+        steps_list.itemDoubleClicked.connect(lambda _: edit())
+        fill()
+        dlg.resize(700, 350)
+        dlg.exec_()
+
     def interpret_trend_ai(self):
         import numpy as np
         from sklearn.linear_model import LinearRegression
@@ -2645,17 +4412,22 @@ class RenkDegistirici(QMainWindow):
         state["grid"] = getattr(self, "_xrd_grid_state", False)
         state["legend_location"] = getattr(self, "legend_location", "best")
         state["legend_custom_order"] = getattr(self, "legend_custom_order", None)
+        state["theta_range"] = list(self.theta_range) if self.theta_range is not None else None
+        state["axis_unit"] = self.axis_unit
         # Datasets with full data (so we can resume without original files)
         datasets = []
         if hasattr(self, "xrd_datasets") and self.xrd_datasets:
             for d in self.xrd_datasets:
-                df = d["df"]
+                # raw data + recipe; the processed curve is rebuilt on load
+                x, y = (d.raw_x, d.raw_y) if d.recipe else (d.x, d.y)
                 datasets.append({
-                    "filename": d.get("filename"),
-                    "color": d.get("color"),
-                    "offset": d.get("offset", 0.0),
-                    "x": df.iloc[:, 0].to_list(),
-                    "y": df.iloc[:, 1].to_list()
+                    "filename": d.name,
+                    "color": d.color,
+                    "offset": d.offset,
+                    "x": x.tolist(),
+                    "y": y.tolist(),
+                    "meta": d.meta,
+                    "recipe": d.recipe
                 })
         else:
             # Single df fallback
@@ -2686,19 +4458,14 @@ class RenkDegistirici(QMainWindow):
         # Build datasets from saved data
         self.xrd_datasets = []
         for d in state.get("datasets", []):
-            x = pd.Series(d.get("x", []))
-            y = pd.Series(d.get("y", []))
-            df = pd.DataFrame({"x": x, "y": y})
-            # Ensure two unnamed columns for consistency with the rest of the code
-            df = df[["x", "y"]]
-            df.columns = [0, 1]
-            self.xrd_datasets.append({
-                "filename": d.get("filename", "Dataset"),
-                "df": df,
-                "offset": d.get("offset", 0.0),
-                "color": d.get("color", "#1f77b4"),
-                "orig_df": df.copy(),
-            })
+            self.xrd_datasets.append(Dataset(
+                d.get("filename", "Dataset"), d.get("x", []), d.get("y", []),
+                offset=d.get("offset", 0.0), color=d.get("color", "#1f77b4"),
+                meta=d.get("meta", {}), recipe=recipe.validate_recipe(d.get("recipe", [])),
+            ))
+        self._refresh_datasets([d for d in self.xrd_datasets if d.recipe])
+        self.theta_range = tuple(state["theta_range"]) if state.get("theta_range") else None
+        self.axis_unit = state.get("axis_unit", "2theta") if state.get("axis_unit") in axes.UNITS else "2theta"
         # Apply axes, grid, and fonts
         if hasattr(self, "ax") and self.ax is not None:
             if "xlabel" in state:
@@ -2754,9 +4521,17 @@ class RenkDegistirici(QMainWindow):
 
 # Uygulamayı başlat
 if __name__ == "__main__":
+    # --profile-startup (or XRD_PROFILE_STARTUP=1) prints time-to-first-window to stderr
+    profiler = StartupProfiler.from_argv(_STARTUP_T0)
+    profiler.mark("içe aktarmalar")
     app = QApplication(sys.argv)
+    profiler.mark("QApplication")
     pencere = RenkDegistirici()
+    profiler.mark("pencere kuruldu")
     pencere.show()
+    if profiler.enabled:
+        # runs after the first pass of the event loop, i.e. once the window has been painted
+        QTimer.singleShot(0, lambda: (profiler.mark("ilk pencere görüntülendi"), profiler.report()))
     sys.exit(app.exec_())
 
     def save_project(self):
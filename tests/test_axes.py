@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from xrd_core.axes import AxisCache, convert_two_theta, to_two_theta, two_theta_to, wavelength_of
+
+CU = 1.540562
+
+
+def test_unit_conversions_round_trip():
+    x = np.linspace(10.0, 120.0, 50)
+    d = two_theta_to(x, "d", CU)
+    q = two_theta_to(x, "q", CU)
+    np.testing.assert_allclose(q, 2.0 * np.pi / d)
+    # Si (111): d = 3.1356 Å at 2θ = 28.44° with Cu Kα1
+    assert abs(two_theta_to(28.443, "d", CU) - 3.1356) < 1e-3
+    np.testing.assert_allclose(to_two_theta(d, "d", CU), x)
+    np.testing.assert_allclose(to_two_theta(q, "q", CU), x)
+    # d-spacings shorter than λ/2 are unreachable
+    assert np.isnan(to_two_theta(0.5, "d", CU))
+    mo = convert_two_theta(x[:5], CU, 0.7093)
+    np.testing.assert_allclose(two_theta_to(mo, "d", 0.7093), d[:5])
+
+
+def test_wavelength_from_metadata():
+    assert wavelength_of({"wavelength": 0.6199}) == 0.6199
+    assert abs(wavelength_of({"anode": "Mo"}) - 0.7093) < 1e-4
+    assert abs(wavelength_of(None) - CU) < 1e-6
+
+
+def test_axis_cache_converts_once_per_owner_and_wavelength():
+    frame = pd.DataFrame({"2θ": np.linspace(10.0, 80.0, 100)})
+    x = frame["2θ"].to_numpy()
+    cache = AxisCache()
+    first = cache.get(frame, x, "d", CU)
+    assert cache.get(frame, x, "d", CU) is first
+    assert cache.get(frame, x, "d", 0.7093) is not first
+    assert cache.get(frame, x, "2theta", CU) is not first
+    other = frame.copy()
+    assert cache.get(other, x, "d", CU) is not first
+    cache.discard(frame)
+    assert cache.get(frame, x, "d", CU) is not first
+    small = AxisCache(max_entries=2)
+    for lam in (1.0, 1.1, 1.2):
+        small.get(frame, x, "q", lam)
+    assert len(small) == 2
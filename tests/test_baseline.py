@@ -0,0 +1,51 @@
+import numpy as np
+from scipy.ndimage import median_filter
+
+from xrd_core.baseline import airpls, als, arpls, baseline_stack, penalty_bands, rolling_baseline, rolling_median
+
+
+def _dense_penalty(n, lam):
+    D = np.diff(np.eye(n), n=2, axis=0)
+    return lam * D.T @ D
+
+
+def test_penalty_bands_match_dense_operator():
+    for n in (3, 4, 7, 50):
+        ab = penalty_bands(n, 2.5)
+        dense = np.diag(ab[2]) + np.diag(ab[1, 1:], 1) + np.diag(ab[1, 1:], -1) \
+            + np.diag(ab[0, 2:], 2) + np.diag(ab[0, 2:], -2)
+        np.testing.assert_allclose(dense, _dense_penalty(n, 2.5))
+
+
+def test_als_matches_dense_solve():
+    rng = np.random.default_rng(1)
+    y = rng.normal(0.0, 1.0, 300).cumsum()
+    lam, p, niter = 1e3, 0.05, 5
+    w = np.ones(y.size)
+    A = _dense_penalty(y.size, lam)
+    for _ in range(niter):
+        z = np.linalg.solve(np.diag(w) + A, w * y)
+        w = p * (y > z) + (1 - p) * (y < z)
+    np.testing.assert_allclose(als(y, lam=lam, p=p, niter=niter), z, rtol=1e-8, atol=1e-8)
+
+
+def test_reweighted_baselines_follow_background_under_peaks():
+    x = np.linspace(20.0, 80.0, 3000)
+    background = 100.0 + 2.0 * x + 20.0 * np.sin(x / 15.0)
+    peaks = sum(a * np.exp(-0.5 * ((x - c) / 0.15) ** 2) for c, a in [(30, 800), (45, 500), (62, 300)])
+    y = background + peaks
+    for fn in (als, arpls, airpls):
+        z = fn(y, lam=1e6)
+        assert np.median(np.abs(z - background)) < 5.0, fn.__name__
+    Y = np.vstack([y, 2.0 * y])
+    np.testing.assert_allclose(baseline_stack(Y, "arpls", lam=1e6)[1], arpls(2.0 * y, lam=1e6))
+
+
+def test_rolling_median_stack_matches_rows():
+    rng = np.random.default_rng(0)
+    Y = rng.normal(100.0, 10.0, (4, 5000))
+    out = rolling_median(Y, 201)
+    expected = np.vstack([median_filter(y, 201, mode="nearest") for y in Y])
+    assert out.shape == Y.shape
+    np.testing.assert_array_equal(out, expected)
+    np.testing.assert_array_equal(rolling_baseline(Y, 201, "median")[2], rolling_median(Y[2], 201))
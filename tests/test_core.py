@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from xrd_core import export, loaders, matching
+
+
+@pytest.mark.parametrize("sep", ["\t", ",", ";", " ", "   "])
+def test_read_xy_sniffs_separator_and_header(tmp_path, sep):
+    path = tmp_path / "scan.xy"
+    lines = ["Sample: test", "2Theta  Intensity"] + [f"{10 + 0.5 * i:.2f}{sep}{100 + i}" for i in range(6)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    x, y = loaders.read_xy(str(path))
+    np.testing.assert_allclose(x, 10.0 + 0.5 * np.arange(6))
+    np.testing.assert_allclose(y, 100.0 + np.arange(6))
+    assert x.flags.c_contiguous and y.dtype == float
+
+
+def test_read_xy_rejects_files_without_numbers(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("no data here\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        loaders.read_xy(str(path))
+
+
+def test_matching_at_equal_d_spacing():
+    cards = {"Si": [28.44, 47.30], "Al2O3": [35.15]}
+    assert matching.match_peaks([28.5, 35.0, 60.0], cards) == ["Si", "Al2O3", "-"]
+    # the Si (111) reflection measured with Mo Kα1
+    mo = 2.0 * np.degrees(np.arcsin(0.7093 / (2.0 * 3.1356)))
+    assert matching.match_peaks([mo], cards, wavelength=0.7093) == ["Si"]
+
+
+def test_peak_table_columns_and_classes():
+    x = np.linspace(20.0, 60.0, 4001)
+    y = 1000.0 * np.exp(-0.5 * ((x - 28.44) / 0.05) ** 2) + 500.0 * np.exp(-0.5 * ((x - 47.3) / 0.3) ** 2)
+    peaks = [int(np.argmin(np.abs(x - 28.44))), int(np.argmin(np.abs(x - 47.3)))]
+    table = export.peak_table(x, y, peaks, cards={"Si": [28.44, 47.30]})
+    assert list(table.columns) == ["2θ", "d (Å)", "Q (Å⁻¹)", "Intensity", "FWHM", "PDF Match", "Crystallinity"]
+    assert list(table["Crystallinity"]) == ["Highly Crystalline", "Poorly Crystalline"]
+    assert list(table["PDF Match"]) == ["Si", "Si"]
+
+
+def test_core_import_loads_no_gui_toolkit():
+    code = ("import sys, xrd_core; from xrd_core import loaders, recipe, peaks, export; "
+            "print(any(m.split('.')[0] in ('PyQt5', 'matplotlib') for m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=str(__import__("pathlib").Path(__file__).resolve().parents[1]))
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,34 @@
+import numpy as np
+
+from xrd_core.dataset import Dataset
+
+
+def _entry():
+    return Dataset("scan", np.linspace(20.0, 80.0, 5), np.arange(5.0))
+
+
+def test_setdefault_stores_and_returns_default():
+    d = _entry()
+    d.meta = None
+    meta = d.setdefault("meta", {"anode": "Cu"})
+    assert meta == {"anode": "Cu"}
+    assert d["meta"] is meta
+    meta["ka2_ratio"] = 0.5
+    assert d.setdefault("meta", {}) == {"anode": "Cu", "ka2_ratio": 0.5}
+
+    label = d.setdefault("label", "A")
+    assert label == "A" and d["label"] == "A" and "label" in d
+    assert d.setdefault("label", "B") == "A"
+    # an existing slot is returned unchanged
+    assert d.setdefault("filename", "other") == "scan"
+
+
+def test_dict_keys_map_to_arrays():
+    d = _entry()
+    assert d["df"].shape == (5, 2)
+    raw = d["df"].copy()
+    raw.iloc[:, 1] = 1.0
+    d["orig_df"] = raw
+    assert np.array_equal(d.raw_y, np.ones(5))
+    assert np.array_equal(d.y, np.arange(5.0))
+    assert d.get("missing", 3) == 3
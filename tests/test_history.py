@@ -0,0 +1,28 @@
+import numpy as np
+
+from xrd_core import history
+
+
+def _state(n, text, recipe=()):
+    return history.State(["t", "phase", "n"], [np.arange(n, dtype=float), np.array(text, dtype=object),
+                                               np.arange(n, dtype=np.int64)], list(recipe),
+                         ["float64", "object", "int64"])
+
+
+def test_text_and_integer_columns_round_trip_through_spill(tmp_path):
+    before = _state(4, ["a", "b", "c", "d"])
+    edited = _state(4, ["a", "x", "c", "d"])
+    filtered = history.State(before.columns, [c[1:3] for c in edited.values], [], before.dtypes)
+    h = history.History(budget_bytes=0, spill_dir=str(tmp_path))
+    h.push("edit", {-1: history.make_delta(before, edited)})
+    h.push("filter", {-1: history.make_delta(edited, filtered)})
+    h.push("noop", {-1: history.make_delta(filtered, filtered)})
+    assert len(h) == 2 and any(tmp_path.iterdir())
+
+    _, changes = h.undo()
+    restored = history.apply_delta(filtered, changes[-1], undo=True)
+    assert history.fingerprint(restored) == history.fingerprint(edited)
+    _, changes = h.undo()
+    restored = history.apply_delta(restored, changes[-1], undo=True)
+    assert list(restored.values[1]) == ["a", "b", "c", "d"]
+    assert restored.values[2].dtype == np.int64 and restored.dtypes == before.dtypes
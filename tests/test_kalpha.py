@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from xrd_core.kalpha import ANODES, ka1_position, strip_ka2
+
+KA1, KA2 = ANODES["Cu"]["ka1"], ANODES["Cu"]["ka2"]
+
+
+def _ka2_position(two_theta):
+    s = (KA2 / KA1) * np.sin(np.radians(two_theta / 2.0))
+    return 2.0 * np.degrees(np.arcsin(s))
+
+
+def test_strips_synthetic_doublet():
+    x = np.linspace(20.0, 100.0, 16001)
+    sigma = 0.03
+    ka1_only = np.zeros_like(x)
+    doublet = np.zeros_like(x)
+    for c, a in [(28.44, 1000.0), (47.30, 600.0), (88.03, 300.0)]:
+        line = a * np.exp(-0.5 * ((x - c) / sigma) ** 2)
+        ka1_only += line
+        doublet += line + 0.5 * a * np.exp(-0.5 * ((x - _ka2_position(c)) / sigma) ** 2)
+    stripped = strip_ka2(x, doublet, KA1, KA2, ratio=0.5)
+    assert np.max(np.abs(stripped - ka1_only)) < 0.01 * 1000.0
+    # the same correction row by row on a stack
+    stack = strip_ka2(x, np.vstack([doublet, 2.0 * doublet]), KA1, KA2, ratio=0.5)
+    assert np.allclose(stack[0], stripped)
+    assert np.allclose(stack[1], 2.0 * stripped)
+
+
+def test_ka1_position_inverts_ka2_shift():
+    assert np.isclose(ka1_position(_ka2_position(47.3), KA1, KA2), 47.3)
+
+
+@pytest.mark.parametrize("ratio", [0.0, -0.5, 1.0, 1.5])
+def test_rejects_non_convergent_ratio(ratio):
+    x = np.linspace(20.0, 80.0, 100)
+    with pytest.raises(ValueError):
+        strip_ka2(x, np.ones_like(x), ratio=ratio)
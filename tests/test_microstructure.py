@@ -0,0 +1,26 @@
+import numpy as np
+
+from xrd_core.microstructure import analyze_series
+
+
+def _scan(n, shift, width, seed):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(20.0, 80.0, n)
+    y = 100.0 + rng.normal(0.0, 1.0, n)
+    for c, a in [(28.4, 1000.0), (47.3, 600.0), (56.1, 400.0)]:
+        y += a * np.exp(-0.5 * ((x - c - shift) / width) ** 2)
+    return x, y
+
+
+def test_series_matches_single_scan_analysis():
+    scans = [_scan(3000 + 250 * i, 0.05 * i, 0.06 + 0.02 * i, i) for i in range(4)]
+    profile = (0.0, 0.0, 0.01 ** 2)
+    peak_table, wh_table = analyze_series(scans, profile=profile)
+    for i, scan in enumerate(scans):
+        single, single_wh = analyze_series([scan], names=[f"Dataset {i + 1}"], profile=profile)
+        rows = peak_table[peak_table["Dataset"] == f"Dataset {i + 1}"].reset_index(drop=True)
+        assert len(rows) == len(single)
+        for col in ("2θ", "Intensity", "FWHM", "β (°)", "Scherrer Size (nm)"):
+            assert np.allclose(rows[col].to_numpy(float), single[col].to_numpy(float), equal_nan=True)
+        for col in ("W-H Size (nm)", "W-H Strain"):
+            assert np.allclose(wh_table[col].to_numpy(float)[i], single_wh[col].to_numpy(float)[0], equal_nan=True)
@@ -0,0 +1,14 @@
+import numpy as np
+
+from xrd_core import parallel, recipe
+
+
+def test_run_recipes_returns_every_step():
+    rng = np.random.default_rng(0)
+    steps = [recipe.make_step("savgol", window=11, polyorder=3), recipe.make_step("als", lam=1e5, p=0.01)]
+    jobs = [(np.linspace(10.0, 80.0, 2000 + i), rng.normal(100.0, 5.0, 2000 + i), steps, {}) for i in range(4)]
+    pooled = parallel.run_recipes(jobs, processes=2, intermediates=True)
+    for (x, y, _, meta), outs in zip(jobs, pooled):
+        assert len(outs) == len(steps)
+        np.testing.assert_allclose(outs[0], recipe.apply_steps(x, y, steps[:1], meta))
+        np.testing.assert_allclose(outs[-1], recipe.apply_steps(x, y, steps, meta))
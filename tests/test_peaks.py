@@ -0,0 +1,54 @@
+import numpy as np
+
+from xrd_core.peaks import compute_fwhm, compute_fwhm_stack, detect_peaks, detect_peaks_stack, find_relative_peaks
+
+
+def test_fwhm_ignores_constant_background():
+    x = np.linspace(20.0, 80.0, 6001)
+    sigma = 0.05
+    y = 200.0 + 1000.0 * np.exp(-0.5 * ((x - 45.0) / sigma) ** 2)
+    peak = int(np.argmax(y))
+    fwhm = compute_fwhm(x, y, [peak], reference="prominence")
+    assert np.isclose(fwhm[0], 2.0 * np.sqrt(2.0 * np.log(2.0)) * sigma, rtol=0.02)
+
+
+def test_fwhm_default_is_half_absolute_height():
+    # the export crystallinity limits were set on this definition
+    x = np.linspace(20.0, 80.0, 6001)
+    sigma = 0.05
+    y = 200.0 + 1000.0 * np.exp(-0.5 * ((x - 45.0) / sigma) ** 2)
+    peak = int(np.argmax(y))
+    # half of 1200 counts is 400 above the background
+    expected = 2.0 * sigma * np.sqrt(2.0 * np.log(1000.0 / 400.0))
+    assert np.isclose(compute_fwhm(x, y, [peak])[0], expected, rtol=0.02)
+
+
+def test_stacked_threshold_and_widths_match_per_scan():
+    rng = np.random.default_rng(5)
+    xs, ys = [], []
+    for i in range(6):
+        x = np.linspace(20.0, 80.0, 2000 + 101 * i)
+        y = 50.0 + 900.0 * np.exp(-0.5 * ((x - 35.0 - i) / 0.1) ** 2) + rng.normal(0.0, 2.0, x.size)
+        xs.append(x)
+        ys.append(y)
+    found = detect_peaks_stack(ys, mode="threshold")
+    peaks = [p for p, _ in found]
+    for p, y in zip(peaks, ys):
+        assert np.array_equal(p, find_relative_peaks(y))
+    for reference in ("height", "prominence"):
+        stacked = compute_fwhm_stack(xs, ys, peaks, reference)
+        for w, x, y, p in zip(stacked, xs, ys, peaks):
+            assert np.allclose(w, compute_fwhm(x, y, p, reference))
+
+
+def test_stack_matches_per_scan_detection():
+    rng = np.random.default_rng(3)
+    x = np.linspace(20.0, 80.0, 4000)
+    lam = 100.0 + 1500.0 * np.exp(-0.5 * ((x - 40.0) / 0.05) ** 2)
+    Y = rng.poisson(lam, (12, x.size)).astype(float)
+    Y[:, :3] += 800.0  # a rising edge at every row start must not leak into the row before
+    Y[4] = 100.0
+    for (p, prom), y in zip(detect_peaks_stack(Y), Y):
+        q, ref = detect_peaks(y)
+        assert np.array_equal(p, q)
+        assert np.allclose(prom, ref)
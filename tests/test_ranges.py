@@ -0,0 +1,25 @@
+import numpy as np
+
+from xrd_core.ranges import range_indices, range_view
+
+
+def test_range_view_is_a_slice_of_the_full_scan():
+    x = np.linspace(10.0, 80.0, 701)
+    y = np.arange(x.size, dtype=float)
+    xv, yv = range_view(x, y, (20.0, 30.0))
+    assert np.shares_memory(xv, x) and np.shares_memory(yv, y)
+    np.testing.assert_array_equal(xv, x[(x >= 20.0) & (x <= 30.0)])
+    np.testing.assert_array_equal(yv, y[(x >= 20.0) & (x <= 30.0)])
+    # reversed bounds, no range and a window outside the scan
+    assert range_indices(x, (30.0, 20.0)) == range_indices(x, (20.0, 30.0))
+    assert range_indices(x, None) == (0, x.size)
+    i0, i1 = range_indices(x, (90.0, 100.0))
+    assert i1 - i0 == 0
+
+
+def test_descending_and_unsorted_grids():
+    x = np.linspace(80.0, 10.0, 701)
+    i0, i1 = range_indices(x, (20.0, 30.0))
+    np.testing.assert_array_equal(x[i0:i1], x[(x >= 20.0) & (x <= 30.0)])
+    xu = np.array([5.0, 1.0, 3.0, 2.0, 9.0])
+    assert range_indices(xu, (1.5, 3.5)) == (2, 4)
@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+import pytest
+
+from xrd_core import recipe
+
+
+def _scan(seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(20.0, 80.0, 1500)
+    return x, 100.0 + 500.0 * np.exp(-0.5 * ((x - 40.0) / 0.2) ** 2) + rng.normal(0.0, 5.0, x.size)
+
+
+def _counting(monkeypatch):
+    """Wrap every registered step so the calls per op are counted."""
+    calls = {}
+    for op, (fn, label) in list(recipe.STEPS.items()):
+        def counted(x, y, meta, _fn=fn, _op=op, **params):
+            calls[_op] = calls.get(_op, 0) + 1
+            return _fn(x, y, meta, **params)
+        monkeypatch.setitem(recipe.STEPS, op, (counted, label))
+    return calls
+
+
+def test_evaluate_leaves_raw_data_and_matches_direct_application():
+    x, y = _scan()
+    raw = y.copy()
+    steps = [recipe.make_step("savgol", window=11, polyorder=3), recipe.make_step("rolling", window=101)]
+    out = recipe.evaluate(x, y, steps, cache=recipe.RecipeCache())
+    np.testing.assert_array_equal(y, raw)
+    np.testing.assert_allclose(out, recipe.apply_steps(x, y, steps))
+    assert not out.flags.writeable
+
+
+def test_editing_a_later_step_reuses_the_cached_prefix(monkeypatch):
+    calls = _counting(monkeypatch)
+    x, y = _scan()
+    cache = recipe.RecipeCache()
+    steps = [recipe.make_step("despike"), recipe.make_step("savgol", window=11, polyorder=3),
+             recipe.make_step("als", lam=1e5, p=0.01)]
+    recipe.evaluate(x, y, steps, cache=cache)
+    assert calls == {"despike": 1, "savgol": 1, "als": 1}
+    steps[2] = recipe.make_step("als", lam=1e6, p=0.01)
+    recipe.evaluate(x, y, steps, cache=cache)
+    assert calls == {"despike": 1, "savgol": 1, "als": 2}
+    # the same recipe on another scan starts from scratch
+    recipe.evaluate(*_scan(1), steps, cache=cache)
+    assert calls == {"despike": 2, "savgol": 2, "als": 3}
+
+
+def test_recipe_round_trips_through_json():
+    steps = [recipe.make_step("savgol", window=np.int64(9), polyorder=2), recipe.make_step("strip_ka2", anode="Cu")]
+    loaded = recipe.validate_recipe(json.loads(json.dumps(steps)))
+    assert loaded == steps
+    with pytest.raises(ValueError):
+        recipe.validate_recipe([{"op": "nope", "params": {}}])
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = recipe.RecipeCache(max_bytes=3 * 8000)
+    for i in range(5):
+        cache.put(str(i), np.zeros(1000))
+    assert len(cache) == 3 and cache.get("0") is None and cache.get("4") is not None
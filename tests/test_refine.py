@@ -0,0 +1,37 @@
+import numpy as np
+
+from xrd_core import refine
+
+
+def _orthorhombic_scan():
+    rng = np.random.default_rng(1)
+    cell, zero = (8.1, 9.3, 10.7), 0.02
+    x = np.arange(10.0, 60.0, 0.01)
+    hkl, mult = refine.generate_hkl(refine.expand_cell("orthorhombic", cell), 1.540562, 62.0)
+    model = refine._Model(x, np.ones_like(x), "orthorhombic", hkl, 1.540562, 6, 8.0)
+    P = model.design(np.array([*cell, zero, 0.004, -0.002, 0.003, 0.4]))
+    y = P @ (rng.uniform(50, 2000, len(hkl)) * mult) + 200.0 + 0.5 * (x - 10.0)
+    return x, rng.poisson(y).astype(float), cell, zero
+
+
+def test_lebail_recovers_overlapped_orthorhombic_cell():
+    x, y, cell, zero = _orthorhombic_scan()
+    for method in ("pawley", "lebail"):
+        res = refine.refine_pattern(x, y, (8.08, 9.32, 10.68), system="orthorhombic", method=method,
+                                    profile=(0.0, 0.0, 0.005))
+        np.testing.assert_allclose(res["cell"][:3], cell, atol=2e-3)
+        assert abs(res["zero"] - zero) < 5e-3
+        assert res["rwp"] < 0.05
+
+
+def test_series_reports_progress_and_stops_when_cancelled():
+    x, y, _, _ = _orthorhombic_scan()
+    scans = [(x, y)] * 3
+    kwargs = dict(cell=(8.08, 9.32, 10.68), system="orthorhombic", profile=(0.0, 0.0, 0.005))
+    seen = []
+    assert refine.refine_series(scans, processes=1, progress=lambda f: seen.append(f) or len(seen) < 2,
+                                **kwargs) is None
+    assert len(seen) == 2
+    seen.clear()
+    results = refine.refine_series(scans[:2], processes=1, progress=seen.append, **kwargs)
+    assert seen == [0.5, 1.0] and len(results) == 2
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from xrd_core import loaders, sintering
+from xrd_core.sintering import MinMaxPyramid
+
+
+def _log(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 0.1
+    y = np.cumsum(rng.normal(0.0, 1.0, n))
+    y[[n // 100, n * 3 // 4]] += [500.0, -800.0]  # single-row spikes
+    return t, y
+
+
+@pytest.mark.parametrize("t0,t1", [(None, None), (100.0, 15_000.0), (123.45, 124.0), (5000.0, 19_000.0)])
+def test_pyramid_view_keeps_min_and_max_of_the_raw_slice(t0, t1):
+    t, y = _log()
+    pyr = MinMaxPyramid(t, y, base=16, fanout=4, min_buckets=64)
+    assert pyr.levels
+    vt, vy = pyr.view(t0, t1, max_points=2000)
+    i0, i1 = pyr.range_rows(t0, t1)
+    assert vt.size <= 2000 + 2
+    assert np.all(np.diff(vt) > 0)
+    raw = y[i0:i1]
+    assert vy.min() == raw.min() and vy.max() == raw.max()
+    # every point drawn is a real sample
+    rows = np.searchsorted(t, vt)
+    np.testing.assert_array_equal(y[rows], vy)
+    assert vt[0] == t[i0] and vt[-1] == t[i1 - 1]
+
+
+def test_pyramid_sorts_unordered_time_and_short_logs_stay_raw():
+    t, y = _log(5000)
+    order = np.random.default_rng(1).permutation(t.size)
+    pyr = MinMaxPyramid(t[order], y[order])
+    assert not pyr.levels
+    vt, vy = pyr.view()
+    np.testing.assert_array_equal(vt, t)
+    np.testing.assert_array_equal(vy, y)
+    with pytest.raises(ValueError):
+        MinMaxPyramid(t, y[:-1])
+
+
+def test_read_table_chunked_matches_read_csv_and_can_be_cancelled(tmp_path):
+    t, y = _log(2500)
+    path = tmp_path / "log.csv"
+    pd.DataFrame({"Time": t, "Temperature": y, "Displacement": -y}).to_csv(path, index=False)
+    seen = []
+    df = loaders.read_table_chunked(str(path), chunksize=1000, progress=seen.append)
+    pd.testing.assert_frame_equal(df, pd.read_csv(path))
+    assert len(seen) == 3 and seen[-1] == 1.0 and seen == sorted(seen)
+    assert loaders.read_table_chunked(str(path), chunksize=1000, progress=lambda f: False) is None
+
+
+def _sigmoid_run(tc=3000.0, width=200.0, amp=0.12, length0=10.0, n=6001):
+    t = np.linspace(0.0, 6000.0, n)
+    temp = 25.0 + 0.25 * t
+    disp = length0 * amp / (1.0 + np.exp(-(t - tc) / width))
+    return t, temp, disp
+
+
+def test_kinetics_onset_and_peak_rate_of_a_sigmoid():
+    tc, width, amp, frac = 3000.0, 200.0, 0.12, 0.05
+    t, temp, disp = _sigmoid_run(tc, width, amp)
+    res = sintering.kinetics(t, temp, disp, 10.0, window=31, onset_fraction=frac, green_density=0.6)
+    # rate = amp/w * s(1-s) with s the logistic; it reaches frac of its peak where s(1-s) = frac/4
+    s_on = (1.0 - np.sqrt(1.0 - frac)) / 2.0
+    t_on = tc + width * np.log(s_on / (1.0 - s_on))
+    assert abs(res["onset_time"] - t_on) <= 1.0
+    assert abs(res["onset_T"] - (25.0 + 0.25 * t_on)) <= 0.25
+    assert abs(res["peak_rate_time"] - tc) <= 1.0
+    np.testing.assert_allclose(res["peak_rate"], amp / (4.0 * width), rtol=1e-3)
+    s0 = amp / (1.0 + np.exp(tc / width))
+    np.testing.assert_allclose(res["final_shrinkage"], amp / (1.0 + np.exp(-3000.0 / width)) - s0)
+    np.testing.assert_allclose(res["final_density"], 0.6 / (1.0 - res["final_shrinkage"]))
+    assert res["shrinkage"][0] == 0.0
+    rho = sintering.relative_density(0.1, 0.6, "isotropic")
+    np.testing.assert_allclose(rho, 0.6 / 0.9 ** 3)
+
+
+def test_kinetics_batch_stacks_equal_runs_like_single_runs():
+    runs = [_sigmoid_run(tc) for tc in (2500.0, 3000.0, 3500.0)] + [_sigmoid_run(n=3001)]
+    params = dict(length0=10.0, window=31, green_density=0.6)
+    batch = sintering.kinetics_batch(runs, **params)
+    for run, res in zip(runs, batch):
+        ref = sintering.kinetics(*run, **params)
+        assert set(res) == set(ref)
+        for key in ref:
+            np.testing.assert_allclose(res[key], ref[key], rtol=1e-12, atol=1e-15)
+    table = sintering.summary_table(["a", "b", "c", "d"], batch)
+    assert list(table["Run"]) == ["a", "b", "c", "d"]
+    assert list(table.columns[1:]) == list(sintering.SUMMARY_COLUMNS.values())
+    np.testing.assert_allclose(table[sintering.SUMMARY_COLUMNS["final_shrinkage"]], [100.0 * r["final_shrinkage"] for r in batch])
+
+
+def test_time_index_lookup_matches_np_interp_on_unsorted_logs():
+    rng = np.random.default_rng(3)
+    t = np.sort(rng.uniform(0.0, 1000.0, 5000))
+    temp, disp = 25.0 + t, np.sin(t / 50.0)
+    order = rng.permutation(t.size)
+    index = sintering.TimeIndex(t[order])
+    times = np.r_[-5.0, rng.uniform(t[0], t[-1], 200), t[10], 2000.0]
+    out = index.lookup(times, {"Temperature": temp[order], "Displacement": disp[order]})
+    np.testing.assert_array_equal(out["Time"], times)
+    for name, y in (("Temperature", temp), ("Displacement", disp)):
+        ref = np.interp(times, t, y, left=np.nan, right=np.nan)
+        np.testing.assert_allclose(out[name], ref, equal_nan=True)
+    rows = index.nearest_rows(times)
+    expected = np.abs(t[order][None, :] - times[:, None]).argmin(axis=1)
+    np.testing.assert_array_equal(t[order][rows], t[order][expected])
+
+
+@pytest.mark.parametrize("text,labels", [
+    ("Zaman,Olay\n10,start\n20.5,hold\n,skip\n30,end\n", ["start", "hold", "end"]),
+    ("10,start\n20.5,hold\n30,end\n", ["start", "hold", "end"]),
+    ("Time\n10\n20.5\n30\n", None),
+])
+def test_read_events_finds_time_and_label_columns(tmp_path, text, labels):
+    path = tmp_path / "events.csv"
+    path.write_text(text, encoding="utf-8")
+    times, got = loaders.read_events(str(path))
+    np.testing.assert_array_equal(times, [10.0, 20.5, 30.0])
+    assert got == labels
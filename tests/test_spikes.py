@@ -0,0 +1,13 @@
+import numpy as np
+
+from xrd_core.spikes import spike_mask
+
+
+def test_spike_mask_stack_matches_rows():
+    rng = np.random.default_rng(1)
+    Y = rng.poisson(100.0, (3, 4000)).astype(float)
+    Y[:, 1000] += 5000.0
+    mask = spike_mask(Y)
+    assert mask[:, 1000].all()
+    for y, row in zip(Y, mask):
+        np.testing.assert_array_equal(row, spike_mask(y))
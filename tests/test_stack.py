@@ -0,0 +1,59 @@
+import numpy as np
+
+from xrd_core import recipe
+from xrd_core.stack import DatasetStack, group_by_grid, normalization_params
+
+
+def test_normalization_ignores_nan_cells():
+    x = np.linspace(10.0, 20.0, 101)
+    Y = np.vstack([np.ones_like(x) * 2.0, np.linspace(0.0, 4.0, 101)])
+    Y[:, 50] = np.nan
+    for mode in ("max", "area", "minmax"):
+        lo, scale = normalization_params(x, Y, mode)
+        assert np.isfinite(lo).all() and np.isfinite(scale).all()
+    _, scale = normalization_params(x, Y, "max")
+    np.testing.assert_allclose(scale.ravel(), [2.0, 4.0])
+    _, area = normalization_params(x, Y[:1], "area")
+    assert 0.0 < area[0, 0] <= 20.0
+
+
+def test_every_builtin_step_runs_on_the_stack_like_on_single_scans():
+    rng = np.random.default_rng(2)
+    x = np.linspace(20.0, 80.0, 1200)
+    Y = 100.0 + 400.0 * np.exp(-0.5 * ((x - 40.0) / 0.2) ** 2) + rng.normal(0.0, 5.0, (3, x.size))
+    Y[1, 300] += 2000.0
+    params = {"savgol": {"window": 11, "polyorder": 3}, "rolling": {"window": 101}, "als": {"lam": 1e5},
+              "arpls": {"lam": 1e5}, "airpls": {"lam": 1e5}, "despike": {}, "strip_ka2": {"anode": "Cu"}}
+    assert set(params) == set(recipe.STACKABLE_STEPS)
+    steps = [recipe.make_step(op, **params[op]) for op in recipe.STACKABLE_STEPS]
+    outs = list(DatasetStack(x, Y).apply(steps))
+    assert len(outs) == len(steps)
+    for i, y in enumerate(Y):
+        np.testing.assert_allclose(outs[-1].Y[i], recipe.apply_steps(x, y, steps), atol=1e-8)
+        np.testing.assert_allclose(outs[2].Y[i], recipe.apply_steps(x, y, steps[:3]), atol=1e-8)
+
+
+def test_group_by_grid_and_resampling():
+    x1 = np.linspace(20.0, 80.0, 601)
+    x2 = np.linspace(25.0, 85.0, 301)
+    assert group_by_grid([x1, x2, x1.copy()]) == [[0, 2], [1]]
+    same = DatasetStack.from_scans([(x1, x1), (x1, 2.0 * x1)], names=["a", "b"])
+    assert same.shape == (2, 601) and np.array_equal(same.x, x1)
+    # different grids: the common range on the finest step, linear data stays exact
+    st = DatasetStack.from_scans([(x1, 3.0 * x1), (x2[::-1], x2[::-1] + 1.0)])
+    assert st.x[0] == 25.0 and st.x[-1] <= 80.0
+    np.testing.assert_allclose(np.diff(st.x), 0.1)
+    np.testing.assert_allclose(st.Y[0], 3.0 * st.x)
+    np.testing.assert_allclose(st.Y[1], st.x + 1.0)
+
+
+def test_normalize_and_wide_export():
+    x = np.linspace(10.0, 20.0, 11)
+    st = DatasetStack(x, np.vstack([x, 2.0 * x + 5.0]), names=["s", "s"])
+    np.testing.assert_allclose(st.normalize("max").Y.max(axis=1), 1.0)
+    mm = st.normalize("minmax", xrange=(12.0, 18.0)).Y
+    np.testing.assert_allclose(mm[:, 2], 0.0)
+    np.testing.assert_allclose(mm[:, 8], 1.0)
+    frame = st.to_frame()
+    assert list(frame.columns) == ["2θ", "s", "s-2"]
+    np.testing.assert_array_equal(frame["s-2"], 2.0 * x + 5.0)
@@ -0,0 +1,44 @@
+import io
+import sys
+
+from xrd_core.startup import StartupProfiler, is_loaded, lazy_import
+
+
+def test_lazy_import_runs_module_on_first_use(tmp_path, monkeypatch):
+    runs = tmp_path / "runs.txt"
+    runs.write_text("", encoding="utf-8")
+    (tmp_path / "slow_mod.py").write_text(f"open({str(runs)!r}, 'a').write('x')\nVALUE = 42\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "slow_mod", raising=False)
+    mod = lazy_import("slow_mod")
+    assert runs.read_text() == "" and not is_loaded("slow_mod")
+    assert mod.VALUE == 42
+    assert runs.read_text() == "x" and is_loaded("slow_mod")
+    assert lazy_import("slow_mod") is mod
+    assert runs.read_text() == "x"
+    monkeypatch.delitem(sys.modules, "slow_mod")
+
+
+def test_profiler_marks_and_report(monkeypatch):
+    prof = StartupProfiler(t0=0.0)
+    monkeypatch.setattr("time.perf_counter", iter([0.25, 0.75]).__next__)
+    prof.mark("import")
+    prof.mark("window")
+    assert prof.elapsed("import") == 0.25 and prof.elapsed() == 0.75 and prof.elapsed("x") is None
+    out = io.StringIO()
+    prof.report(out)
+    text = out.getvalue()
+    assert "import" in text and "750.0 ms" in text and "(+500.0)" in text
+    assert "ertelenen" in text
+
+
+def test_profiler_is_off_unless_requested(monkeypatch):
+    monkeypatch.delenv("XRD_PROFILE_STARTUP", raising=False)
+    off = StartupProfiler.from_argv(argv=["app.py"])
+    off.mark("window")
+    out = io.StringIO()
+    off.report(out)
+    assert off.marks == [] and out.getvalue() == ""
+    assert StartupProfiler.from_argv(argv=["app.py", "--profile-startup"]).enabled
+    monkeypatch.setenv("XRD_PROFILE_STARTUP", "1")
+    assert StartupProfiler.from_argv(argv=["app.py"]).enabled
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from xrd_core import tables
+
+
+def test_parse_block_accepts_tabs_commas_spaces_and_pads_short_rows():
+    out = tables.parse_block("1 2 3\n4,5\n\n6 x 7.5\n")
+    np.testing.assert_array_equal(out, [[1.0, 2.0, 3.0], [4.0, 5.0, np.nan], [6.0, np.nan, 7.5]])
+    np.testing.assert_array_equal(tables.parse_block("1\t\t3\n\t5"), [[1.0, np.nan, 3.0], [np.nan, 5.0, np.nan]])
+    assert tables.parse_block("  \n").shape == (0, 0)
+
+
+def test_format_block_round_trips_through_parse_block():
+    values = np.array([[0.1, 1.0 / 3.0], [np.nan, -2.5e-7]])
+    text = tables.format_block(values)
+    assert text.splitlines()[1].startswith("\t")
+    np.testing.assert_array_equal(tables.parse_block(text), values)
+    assert tables.format_value(1.0 / 3.0) == "0.3333333333"
+    assert tables.parse_number("") != tables.parse_number("")  # NaN
+    assert tables.parse_number("abc") is None
+
+
+def test_apply_operation_only_touches_the_mask():
+    values = np.arange(12, dtype=float).reshape(4, 3)
+    mask = np.zeros(values.shape, dtype=bool)
+    mask[1:3, 1:] = True
+    expected = values.copy()
+    expected[mask] *= 2.0
+    np.testing.assert_array_equal(tables.apply_operation(values, mask, "*", 2.0), expected)
+    tables.apply_operation(values, mask, "/", 0.0)
+    assert np.isinf(values[mask]).all() and np.isfinite(values[~mask]).all()
+    tables.apply_operation(values, mask, "=", 7.0)
+    assert (values[mask] == 7.0).all()
+    assert tables.mask_bounds(mask) == (1, 1, 2, 2)
+    assert tables.mask_bounds(np.zeros((2, 2), dtype=bool)) is None
+
+
+def test_convert_column_rejects_cells_that_do_not_fit_the_dtype():
+    values, ok = tables.convert_column(["1.5", " 2 ", "", "abc"], np.dtype(float))
+    np.testing.assert_array_equal(ok, [True, True, True, False])
+    np.testing.assert_array_equal(values[:3], [1.5, 2.0, np.nan])
+    values, ok = tables.convert_column(["3", "2.5", "", "x", "-4"], np.dtype("int64"))
+    np.testing.assert_array_equal(ok, [True, False, False, False, True])
+    assert values.dtype == np.int64 and values[0] == 3 and values[4] == -4
+    values, ok = tables.convert_column(["Evet", "0", "maybe"], np.dtype(bool))
+    np.testing.assert_array_equal(ok, [True, True, False])
+    assert values[0] and not values[1]
+    values, ok = tables.convert_column(["2024-01-02", "", "not a date"], np.dtype("datetime64[ns]"))
+    np.testing.assert_array_equal(ok, [True, True, False])
+    assert values[0] == np.datetime64("2024-01-02")
+
+
+def test_edit_log_commit_keeps_dtypes_and_leaves_rejected_cells_pending():
+    df = pd.DataFrame({"t": [0.0, 1.0, 2.0], "n": [1, 2, 3], "name": ["a", "b", "c"]})
+    log = tables.EditLog(max_entries=2)
+    seen = []
+    log.listeners.append(seen.append)
+    log.set(0, 0, "0.5")
+    log.set(2, 1, "7")
+    log.set(1, 1, "oops")
+    log.set(1, 2, "bb")
+    entry = log.commit(df)
+    assert list(df.dtypes) == [np.float64, np.int64, df.dtypes.iloc[2]]
+    assert df.iloc[0, 0] == 0.5 and df.iloc[2, 1] == 7 and df.iloc[1, 1] == 2 and df.iloc[1, 2] == "bb"
+    assert entry["count"] == 3 and entry["rejected"] == 1 and seen == [entry]
+    assert sorted(entry["columns"]) == ["n", "name", "t"]
+    np.testing.assert_array_equal(entry["columns"]["n"], [2])
+    assert len(log) == 1 and log.get(1, 1) == "oops"
+    log.commit(df)
+    log.commit(df)
+    assert len(log.entries) == 2
@@ -0,0 +1,41 @@
+import numpy as np
+
+from xrd_core.tracking import link_peaks, track_series
+
+
+def _series():
+    """Two drifting reflections, one missing for one scan, one appearing late, one noise peak."""
+    data = []
+    for s in range(10):
+        pos = [30.0 - 0.02 * s]
+        if s != 4:
+            pos.append(45.0 - 0.03 * s)
+        if s >= 6:
+            pos.append(60.0)
+        if s == 2:
+            pos.append(52.0)
+        pos = np.array(pos)
+        data.append((pos, np.full(pos.size, 100.0 + s), np.full(pos.size, 0.1)))
+    return data
+
+
+def test_links_drifting_peaks_across_a_gap():
+    ids = link_peaks([d[0] for d in _series()], max_shift=0.2, max_gap=2)
+    assert all(i[0] == ids[0][0] for i in ids)
+    track_45 = ids[0][1]
+    assert [i[1] for s, i in enumerate(ids) if s != 4] == [track_45] * 9
+    # the late reflection starts a new track and keeps it
+    assert len({int(i[-1]) for i in ids[6:]}) == 1 and ids[6][-1] not in (ids[0][0], track_45)
+
+
+def test_trajectory_table():
+    table = track_series(_series(), min_length=3)
+    # the single-scan noise peak is dropped; tracks are numbered by mean position
+    assert sorted(table["Track"].unique()) == [0, 1, 2]
+    first = table[table["Track"] == 0]
+    assert list(first["Scan"]) == list(range(10))
+    np.testing.assert_allclose(first["Shift"], -0.02 * np.arange(10))
+    second = table[table["Track"] == 1]
+    assert 4 not in set(second["Scan"]) and len(second) == 9
+    np.testing.assert_allclose(second["Shift"], -0.03 * second["Scan"].to_numpy())
+    assert list(table[table["Track"] == 2]["Scan"]) == [6, 7, 8, 9]
@@ -0,0 +1,68 @@
+"""
+Qt-free analysis kernels used by the XRD front-ends.
+
+Everything here works on plain numpy arrays (or lists of them) so it can be
+called from the GUI, from batch scripts or from worker processes. Nothing
+imports Qt or matplotlib, and the submodules (with their scipy / pandas
+imports) are loaded on first use, so `import xrd_core` itself is instant.
+
+Loading (loaders), preprocessing (recipe, baseline, spikes, kalpha), peaks,
+matching and export are the same code the GUIs run.
+"""
+import importlib
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "peaks": (
+        "compute_fwhm", "compute_fwhm_stack", "find_relative_peaks", "estimate_noise", "detect_peaks",
+        "detect_peaks_multiscale", "detect_peaks_stack", "multiscale_response",
+    ),
+    "microstructure": (
+        "CU_KA1", "SCHERRER_K", "fit_instrument_profile", "instrument_fwhm", "correct_broadening",
+        "scherrer_size", "williamson_hall", "analyze_series",
+    ),
+    "tracking": ("collect_peaks", "link_peaks", "track_series"),
+    "kalpha": ("ANODES", "wavelengths_from_meta", "strip_ka2"),
+    "refine": ("CRYSTAL_SYSTEMS", "generate_hkl", "refine_pattern", "refine_series"),
+    "baseline": (
+        "als", "arpls", "airpls", "baseline_stack", "rolling_min", "rolling_median", "opening",
+        "tophat", "rolling_baseline",
+    ),
+    "recipe": ("RecipeCache", "make_step", "validate_recipe"),
+    "parallel": ("run_recipes",),
+    "axes": ("UNITS", "wavelength_of", "two_theta_to", "to_two_theta", "AxisCache"),
+    "dataset": ("Dataset",),
+    "ranges": ("range_indices", "range_view"),
+    "stack": (
+        "NORMALIZE_MODES", "DatasetStack", "same_grid", "group_by_grid", "normalization_params",
+    ),
+    "history": ("History", "make_delta", "apply_delta"),
+    "loaders": ("read_xy", "read_xy_frame", "read_table", "read_table_chunked", "read_events"),
+    "matching": ("CARD_WAVELENGTH", "load_cards", "match_matrix", "match_peaks"),
+    "export": ("crystallinity", "peak_table"),
+    "spikes": ("spike_mask", "interpolate_masked", "remove_spikes"),
+    "startup": ("lazy_import", "StartupProfiler"),
+    "sintering": ("MinMaxPyramid", "TimeIndex", "shrinkage", "time_derivative", "relative_density", "kinetics",
+                  "kinetics_batch", "summary_table"),
+    "tables": ("parse_block", "format_block", "apply_operation", "convert_column", "EditLog"),
+}
+_WHERE = {name: mod for mod, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_WHERE)
+
+
+def __getattr__(name):
+    mod = _WHERE.get(name)
+    if mod is None:
+        # submodules (`from xrd_core import baseline`) are imported on demand too
+        try:
+            return importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f"{__name__}.{mod}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_WHERE))
@@ -0,0 +1,133 @@
+"""
+Capped, collision-aware peak labels.
+
+The layer owns a fixed pool of annotation artists. On every x- or y-limit
+change it picks the N strongest peaks inside the visible window, places them greedily
+(strongest first) at the first candidate offset that does not overlap an
+already placed label, and updates the pooled artists in place. Text extents
+are measured once per label string and cached.
+
+Only the Axes passed in is used, so importing this module does not import
+matplotlib.
+"""
+import numpy as np
+
+# Candidate offsets (points) tried in order: above, above-left/right, then higher
+_OFFSETS = [(0, 5), (-1, 5), (1, 5), (0, 17), (-1, 17), (1, 17), (0, 29)]
+
+
+class PeakAnnotationLayer:
+    def __init__(self, ax, max_labels=25, fontsize=8, color="black", fmt="{:.2f}"):
+        self.ax = ax
+        self.max_labels = int(max_labels)
+        self.fontsize = fontsize
+        self.color = color
+        self.fmt = fmt
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._text = []
+        self._pool = []
+        self._extent_cache = {}
+        self._probe = None
+        self._cids = [ax.callbacks.connect(name, self._on_lim_changed)
+                      for name in ("xlim_changed", "ylim_changed")]
+
+    # --- data ---
+    def set_peaks(self, x, y, strength=None):
+        """Register peak positions; strength (e.g. prominence) ranks them, default y."""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        strength = y if strength is None else np.asarray(strength, dtype=float)
+        order = np.argsort(-strength, kind="stable")
+        self._x, self._y = x[order], y[order]
+        self._text = [self.fmt.format(v) for v in self._x]
+        self.update()
+
+    def set_max_labels(self, n):
+        self.max_labels = int(n)
+        self.update()
+
+    def remove(self):
+        """Detach from the axes and drop all pooled artists."""
+        for cid in self._cids:
+            self.ax.callbacks.disconnect(cid)
+        for ann in self._pool:
+            try:
+                ann.remove()
+            except Exception:
+                pass
+        self._pool = []
+
+    # --- layout ---
+    def _on_lim_changed(self, ax):
+        self.update()
+
+    def _renderer(self):
+        canvas = self.ax.figure.canvas
+        get = getattr(canvas, "get_renderer", None)
+        return get() if get is not None else None
+
+    def _extent(self, text, renderer):
+        """(width, height) in pixels for a label, measured once per string."""
+        ext = self._extent_cache.get(text)
+        if ext is None:
+            if self._probe is None:
+                self._probe = self.ax.text(0, 0, "", fontsize=self.fontsize, visible=False)
+            self._probe.set_text(text)
+            if renderer is not None:
+                bb = self._probe.get_window_extent(renderer=renderer)
+                ext = (bb.width, bb.height)
+            else:
+                # rough fallback before the first draw
+                px = self.fontsize * self.ax.figure.dpi / 72.0
+                ext = (0.6 * px * len(text), px)
+            self._extent_cache[text] = ext
+        return ext
+
+    def _ensure_pool(self, n):
+        while len(self._pool) < n:
+            ann = self.ax.annotate("", (0, 0), textcoords="offset points", xytext=(0, 5),
+                                   ha="center", fontsize=self.fontsize, color=self.color)
+            ann.set_visible(False)
+            self._pool.append(ann)
+
+    def _select(self):
+        if self._x.size == 0:
+            return np.empty(0, dtype=np.intp)
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        visible = np.flatnonzero((self._x >= x0) & (self._x <= x1) & (self._y >= y0) & (self._y <= y1))
+        return visible[: self.max_labels]
+
+    def update(self):
+        idx = self._select()
+        self._ensure_pool(len(idx))
+        renderer = self._renderer()
+        pt = self.ax.figure.dpi / 72.0
+        anchors = self.ax.transData.transform(np.column_stack([self._x[idx], self._y[idx]])) if idx.size else np.empty((0, 2))
+        placed = np.empty((0, 4))  # x0, y0, x1, y1 in pixels
+        used = 0
+        for k, i in enumerate(idx):
+            w, h = self._extent(self._text[i], renderer)
+            ax_px, ay_px = anchors[k]
+            for ox, oy in _OFFSETS:
+                dx = ox * (w / pt + 2)
+                cx = ax_px + dx * pt
+                y0 = ay_px + oy * pt
+                box = np.array([cx - w / 2, y0, cx + w / 2, y0 + h])
+                if placed.size == 0 or not np.any(
+                        (placed[:, 0] < box[2]) & (box[0] < placed[:, 2]) &
+                        (placed[:, 1] < box[3]) & (box[1] < placed[:, 3])):
+                    break
+            else:
+                continue  # no free slot: drop this (weaker) label
+            placed = np.vstack([placed, box])
+            ann = self._pool[used]
+            ann.xy = (self._x[i], self._y[i])
+            ann.xyann = (dx, oy)
+            ann.set_text(self._text[i])
+            ann.set_visible(True)
+            used += 1
+        for ann in self._pool[used:]:
+            ann.set_visible(False)
+        self.ax.figure.canvas.draw_idle()
@@ -0,0 +1,97 @@
+"""
+Axis units: 2θ, d-spacing and Q.
+
+Scans are stored against 2θ; other units depend on the wavelength of each
+scan (anode line or a synchrotron wavelength in its metadata). AxisCache
+converts a scan's x array once per (unit, wavelength) and returns the same
+array on every later redraw.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from .kalpha import wavelengths_from_meta
+
+UNITS = {"2theta": "2θ (°)", "d": "d (Å)", "q": "Q (Å⁻¹)"}
+
+
+def wavelength_of(meta, default_anode="Cu"):
+    """Wavelength (Å) of a scan: meta["wavelength"] if set, else the Kα1 line of its anode."""
+    meta = meta or {}
+    if meta.get("wavelength"):
+        return float(meta["wavelength"])
+    return wavelengths_from_meta(meta, default_anode)[0]
+
+
+def two_theta_to(x, unit, wavelength):
+    """2θ (degrees) -> unit. d is inf at 2θ = 0."""
+    x = np.asarray(x, dtype=float)
+    if unit == "2theta":
+        return x
+    s = np.sin(np.radians(x) / 2.0)
+    if unit == "q":
+        return 4.0 * np.pi * s / wavelength
+    if unit == "d":
+        with np.errstate(divide="ignore"):
+            return wavelength / (2.0 * s)
+    raise ValueError(f"Bilinmeyen eksen birimi: {unit}")
+
+
+def to_two_theta(v, unit, wavelength):
+    """unit -> 2θ (degrees); NaN where the reflection is not reachable at this wavelength."""
+    v = np.asarray(v, dtype=float)
+    if unit == "2theta":
+        return v
+    if unit == "q":
+        s = v * wavelength / (4.0 * np.pi)
+    elif unit == "d":
+        with np.errstate(divide="ignore"):
+            s = wavelength / (2.0 * v)
+    else:
+        raise ValueError(f"Bilinmeyen eksen birimi: {unit}")
+    with np.errstate(invalid="ignore"):
+        return 2.0 * np.degrees(np.arcsin(np.where(np.abs(s) <= 1.0, s, np.nan)))
+
+
+def convert_two_theta(x, wavelength, target_wavelength):
+    """2θ measured at one wavelength -> 2θ of the same d-spacing at another."""
+    return to_two_theta(two_theta_to(x, "d", wavelength), "d", target_wavelength)
+
+
+class AxisCache:
+    """
+    Converted x arrays keyed by the object that owns the 2θ data (e.g. a
+    DataFrame). An entry is reused while the owner is the same object; a
+    replaced frame gets a new entry and old ones fall out of the LRU.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = int(max_entries)
+        self._data = OrderedDict()
+
+    def get(self, owner, x, unit, wavelength):
+        if unit == "2theta":
+            return np.asarray(x, dtype=float)
+        key = (id(owner), unit, round(float(wavelength), 9))
+        hit = self._data.get(key)
+        if hit is not None and hit[0] is owner:
+            self._data.move_to_end(key)
+            return hit[1]
+        out = two_theta_to(x, unit, wavelength)
+        out.flags.writeable = False
+        self._data[key] = (owner, out)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+        return out
+
+    def discard(self, owner):
+        """Drop the entries of one owner (e.g. a frame whose 2θ column was edited in place)."""
+        for key in [k for k, (o, _) in self._data.items() if o is owner]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,186 @@
+"""
+Baseline engines.
+
+Penalised least squares (ALS, arPLS, airPLS):
+
+All three solve (W + λ·DᵀD) z = W y repeatedly with D the second-difference
+operator. λ·DᵀD is a symmetric pentadiagonal matrix that only depends on the
+scan length and λ, so its band storage is built once per (n, λ) and cached;
+each iteration only adds the weights to the main diagonal and runs a banded
+Cholesky solve (LAPACK pbsv), which is O(n).
+
+Rolling (morphological) baselines: sliding min / max / median along the last
+axis with scipy.ndimage filters, which use a running-extremum algorithm for
+min/max (O(n) regardless of the window) and work on a whole 2D stack of
+scans in one call; the median runs the 1D filter per scan.
+"""
+from functools import lru_cache
+
+import numpy as np
+from scipy.linalg import solveh_banded
+from scipy.ndimage import maximum_filter1d, median_filter, minimum_filter1d
+
+
+@lru_cache(maxsize=16)
+def penalty_bands(n, lam):
+    """
+    λ·DᵀD in upper band storage (3, n) as used by solveh_banded:
+    row 0 = second superdiagonal, row 1 = first superdiagonal, row 2 = diagonal.
+    Cached and read-only; copy before modifying.
+    """
+    if n < 3:
+        raise ValueError("Arka plan için en az 3 nokta gerekli")
+    ab = np.zeros((3, n))
+    diag = np.full(n, 6.0)
+    diag[[0, -1]] = 1.0
+    diag[[1, -2]] = 5.0
+    off1 = np.full(n - 1, -4.0)
+    off1[[0, -1]] = -2.0
+    ab[2] = diag
+    ab[1, 1:] = off1
+    ab[0, 2:] = 1.0
+    if n == 3:
+        ab[2] = [1.0, 4.0, 1.0]
+        ab[1, 1:] = [-2.0, -2.0]
+    ab *= lam
+    ab.flags.writeable = False
+    return ab
+
+
+def _solve(y, w, lam):
+    ab = penalty_bands(y.size, float(lam)).copy()
+    ab[2] += w
+    return solveh_banded(ab, w * y, check_finite=False)
+
+
+def als(y, lam=1e5, p=0.01, niter=10):
+    """Asymmetric Least Squares baseline (Eilers & Boelens, 2005)."""
+    y = np.asarray(y, dtype=float)
+    w = np.ones(y.size)
+    z = y
+    for _ in range(niter):
+        z = _solve(y, w, lam)
+        w = p * (y > z) + (1 - p) * (y < z)
+    return z
+
+
+def arpls(y, lam=1e5, ratio=1e-6, niter=50):
+    """Asymmetrically reweighted PLS (Baek et al., 2015)."""
+    y = np.asarray(y, dtype=float)
+    w = np.ones(y.size)
+    z = y
+    for _ in range(niter):
+        z = _solve(y, w, lam)
+        d = y - z
+        dn = d[d < 0]
+        if dn.size < 2:
+            break
+        m, s = dn.mean(), dn.std()
+        if s == 0:
+            break
+        arg = np.clip(2.0 * (d - (2.0 * s - m)) / s, -50.0, 50.0)
+        wt = 1.0 / (1.0 + np.exp(arg))
+        if np.linalg.norm(w - wt) / np.linalg.norm(w) < ratio:
+            w = wt
+            break
+        w = wt
+    return z
+
+
+def airpls(y, lam=1e5, niter=15):
+    """Adaptive iteratively reweighted PLS (Zhang et al., 2010)."""
+    y = np.asarray(y, dtype=float)
+    w = np.ones(y.size)
+    z = y
+    total = np.abs(y).sum()
+    for t in range(1, niter + 1):
+        z = _solve(y, w, lam)
+        d = y - z
+        neg = d < 0
+        dssn = np.abs(d[neg]).sum()
+        if dssn < 1e-3 * total or not neg.any():
+            break
+        w = np.zeros(y.size)
+        w[neg] = np.exp(np.minimum(t * np.abs(d[neg]) / dssn, 50.0))
+        edge = np.exp(min(t * np.abs(d[neg]).max() / dssn, 50.0))
+        w[0] = w[-1] = edge
+    return z
+
+
+METHODS = {"als": als, "arpls": arpls, "airpls": airpls}
+
+
+def baseline(y, method="als", **params):
+    """Baseline of one scan, or of every row of a 2D stack, with the named method."""
+    if np.ndim(y) == 2:
+        return baseline_stack(y, method, **params)
+    return METHODS[method](y, **params)
+
+
+def baseline_stack(Y, method="als", **params):
+    """
+    Baselines for every row of a 2D stack (or list of scans). Rows of equal
+    length share the cached penalty bands.
+    """
+    fn = METHODS[method]
+    if isinstance(Y, np.ndarray) and Y.ndim == 2:
+        return np.vstack([fn(y, **params) for y in Y]) if len(Y) else np.empty_like(Y, dtype=float)
+    return [fn(y, **params) for y in Y]
+
+
+# --- rolling / morphological baselines ---
+ROLLING_METHODS = ("min", "median", "opening")
+
+
+def _window(window, n):
+    """Odd window length no longer than the scan."""
+    window = max(1, min(int(window), n if n % 2 else n - 1))
+    return window if window % 2 else window + 1
+
+
+def rolling_min(Y, window):
+    """Sliding minimum (grey erosion) along the last axis; edges use the truncated window."""
+    Y = np.asarray(Y, dtype=float)
+    return minimum_filter1d(Y, _window(window, Y.shape[-1]), axis=-1, mode="nearest")
+
+
+def median_rows(Y, window):
+    """Sliding median of each scan along the last axis (window used as given, forced odd).
+    A (1, w) footprint on a 2D stack sends median_filter down its slow generic N-d
+    path, so the 1D filter is run row by row instead."""
+    Y = np.asarray(Y, dtype=float)
+    window = int(window) | 1
+    if Y.ndim == 1:
+        return median_filter(Y, window, mode="nearest")
+    out = np.empty_like(Y)
+    for row, y in zip(out.reshape(-1, Y.shape[-1]), Y.reshape(-1, Y.shape[-1])):
+        row[:] = median_filter(y, window, mode="nearest")
+    return out
+
+
+def rolling_median(Y, window):
+    """Sliding median along the last axis."""
+    Y = np.asarray(Y, dtype=float)
+    return median_rows(Y, _window(window, Y.shape[-1]))
+
+
+def opening(Y, window):
+    """
+    Grey opening (erosion then dilation) along the last axis. Unlike the plain
+    rolling minimum it follows the background up to the foot of the peaks.
+    """
+    Y = np.asarray(Y, dtype=float)
+    w = _window(window, Y.shape[-1])
+    return maximum_filter1d(minimum_filter1d(Y, w, axis=-1, mode="nearest"), w, axis=-1, mode="nearest")
+
+
+def tophat(Y, window):
+    """White top-hat: the signal with its opening removed (peaks narrower than the window)."""
+    Y = np.asarray(Y, dtype=float)
+    return Y - opening(Y, window)
+
+
+def rolling_baseline(Y, window, method="min"):
+    """Rolling baseline of a scan (1D) or a stack of equal-length scans (2D)."""
+    fn = {"min": rolling_min, "median": rolling_median, "opening": opening}[method]
+    return fn(Y, window)
@@ -0,0 +1,196 @@
+"""
+Array-backed XRD dataset entry.
+
+A Dataset keeps one scan as contiguous, read-only float64 arrays: the 2θ
+grid x, the displayed (processed) intensities y and the raw intensities the
+preprocessing recipe starts from. Raw and processed share the same x, and
+until a recipe changes the data raw_y is the very same array as y, so an
+entry costs two to three columns instead of two DataFrames.
+
+Arrays are never modified in place; every change assigns a new array. That
+makes the array objects themselves usable as cache keys (axis transforms,
+normalization). DataFrames are built on request only, without copying.
+
+For older code paths (and project files) an entry still answers the dict
+keys it replaced: "filename", "df", "orig_df", "offset", "color", "meta",
+"recipe". Any other key is kept in a small side dict, as the old entries
+allowed.
+"""
+import numpy as np
+
+from .startup import lazy_import
+
+pd = lazy_import("pandas")
+
+_KEYS = {"filename": "name", "offset": "offset", "color": "color", "meta": "meta", "recipe": "recipe"}
+
+
+def _frozen(a):
+    """Read-only contiguous float64 array; arrays that are already read-only are shared."""
+    if isinstance(a, np.ndarray) and a.dtype == float and a.flags.c_contiguous and not a.flags.writeable:
+        return a
+    a = np.array(a, dtype=float)
+    a.flags.writeable = False
+    return a
+
+
+def _columns(df):
+    x, y = df.iloc[:, 0], df.iloc[:, 1]
+    return _frozen(x.to_numpy(dtype=float)), _frozen(y.to_numpy(dtype=float)), tuple(df.columns[:2])
+
+
+class Dataset:
+    """One XRD scan with its display settings and preprocessing recipe."""
+
+    __slots__ = ("name", "offset", "color", "meta", "recipe", "columns",
+                 "_x", "_y", "_raw_x", "_raw_y", "_frame", "_raw_frame", "_extra")
+
+    def __init__(self, name, x, y, offset=0.0, color="#1f77b4", meta=None, recipe=None,
+                 raw_y=None, columns=(0, 1)):
+        self.name = name
+        self.offset = float(offset)
+        self.color = color
+        self.meta = dict(meta or {})
+        self.recipe = list(recipe or [])
+        self.columns = tuple(columns)
+        self._x = _frozen(x)
+        self._y = _frozen(y)
+        if self._x.shape != self._y.shape:
+            raise ValueError("x ve y aynı uzunlukta olmalı")
+        self._raw_x = self._x
+        self._raw_y = self._y if raw_y is None else _frozen(raw_y)
+        self._frame = self._raw_frame = None
+        self._extra = None
+
+    @classmethod
+    def from_frame(cls, name, df, **kwargs):
+        """Entry from the first two columns of a DataFrame (copied once into float64 arrays)."""
+        x, y, columns = _columns(df)
+        return cls(name, x, y, columns=columns, **kwargs)
+
+    # --- arrays ---
+    @property
+    def x(self):
+        return self._x
+
+    @property
+    def y(self):
+        return self._y
+
+    @property
+    def raw_x(self):
+        return self._raw_x
+
+    @property
+    def raw_y(self):
+        return self._raw_y
+
+    def set_values(self, y, x=None):
+        """Replace the displayed intensities (and optionally the grid)."""
+        if x is not None:
+            self._x = self._raw_x if np.array_equal(x, self._raw_x) else _frozen(x)
+        y = _frozen(y)
+        if y.shape != self._x.shape:
+            raise ValueError("x ve y aynı uzunlukta olmalı")
+        self._y = y
+        self._frame = None
+
+    def set_raw(self, x, y):
+        """Replace the raw data the recipe starts from."""
+        x, y = _frozen(x), _frozen(y)
+        if np.array_equal(x, self._x):
+            x = self._x
+        self._raw_x, self._raw_y = x, y
+        self._raw_frame = None
+
+    def reset(self):
+        """Displayed data = raw data."""
+        self._x, self._y = self._raw_x, self._raw_y
+        self._frame = self._raw_frame
+
+    def __len__(self):
+        return self._x.size
+
+    @property
+    def nbytes(self):
+        seen, total = set(), 0
+        for a in (self._x, self._y, self._raw_x, self._raw_y):
+            if id(a) not in seen:
+                seen.add(id(a))
+                total += a.nbytes
+        return total
+
+    # --- DataFrame export ---
+    def _make_frame(self, x, y):
+        return pd.DataFrame({self.columns[0]: x, self.columns[1]: y}, copy=False)
+
+    @property
+    def df(self):
+        """Displayed data as a DataFrame (built once per change, no copy)."""
+        if self._frame is None:
+            self._frame = self._make_frame(self._x, self._y)
+        return self._frame
+
+    @df.setter
+    def df(self, frame):
+        x, y, self.columns = _columns(frame)
+        self.set_values(y, x)
+
+    @property
+    def raw_df(self):
+        if self._raw_frame is None:
+            self._raw_frame = self._make_frame(self._raw_x, self._raw_y)
+        return self._raw_frame
+
+    @raw_df.setter
+    def raw_df(self, frame):
+        x, y, _ = _columns(frame)
+        self.set_raw(x, y)
+
+    # --- dict-style access ---
+    def __getitem__(self, key):
+        if key == "df":
+            return self.df
+        if key == "orig_df":
+            return self.raw_df
+        if key in _KEYS:
+            return getattr(self, _KEYS[key])
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "df":
+            self.df = value
+        elif key == "orig_df":
+            if value is None:
+                self.set_raw(self._x, self._y)
+            else:
+                self.raw_df = value
+        elif key in _KEYS:
+            setattr(self, _KEYS[key], value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in _KEYS or key in ("df", "orig_df") or (self._extra is not None and key in self._extra)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def setdefault(self, key, default=None):
+        """dict.setdefault: a missing key (or an empty slot) is set to default, which is returned."""
+        value = self.get(key)
+        if value is None:
+            self[key] = default
+            value = self[key]
+        return value
+
+    def __repr__(self):
+        return f"Dataset({self.name!r}, {len(self)} nokta)"
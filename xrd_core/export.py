@@ -0,0 +1,42 @@
+"""Tables written by the export actions of the front-ends."""
+import numpy as np
+import pandas as pd
+
+from .axes import two_theta_to
+from .matching import CARD_WAVELENGTH, match_peaks
+from .peaks import compute_fwhm
+
+# FWHM (° 2θ) limits of the crystallinity classes
+CRYSTALLINITY_LIMITS = ((0.2, "Highly Crystalline"), (0.5, "Moderately Crystalline"))
+
+
+def crystallinity(fwhm):
+    """Crystallinity class of every FWHM value."""
+    fwhm = np.asarray(fwhm, dtype=float)
+    labels = np.full(fwhm.shape, "Poorly Crystalline", dtype=object)
+    for limit, label in reversed(CRYSTALLINITY_LIMITS):
+        labels[fwhm < limit] = label
+    return list(labels)
+
+
+def peak_table(x, y, peaks, cards=None, wavelength=CARD_WAVELENGTH, tol=0.3):
+    """
+    One row per peak: 2θ, d, Q, intensity, FWHM, matching phases (if cards
+    are given) and crystallinity class.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    peaks = np.asarray(peaks, dtype=np.intp)
+    pos = x[peaks]
+    fwhm = compute_fwhm(x, y, peaks)
+    table = pd.DataFrame({
+        "2θ": pos,
+        "d (Å)": two_theta_to(pos, "d", wavelength),
+        "Q (Å⁻¹)": two_theta_to(pos, "q", wavelength),
+        "Intensity": y[peaks],
+        "FWHM": fwhm,
+    })
+    if cards is not None:
+        table["PDF Match"] = match_peaks(pos, cards, tol, wavelength)
+    table["Crystallinity"] = crystallinity(fwhm)
+    return table
@@ -0,0 +1,255 @@
+"""
+Memory-bounded undo/redo history.
+
+A target's state is (columns, values, recipe, dtypes): its raw table as one
+array per column (each keeping its own dtype, so text, datetime and integer
+columns survive a round trip) and its preprocessing recipe. Entries do not
+store full copies; each change keeps only what differs:
+
+* recipe edits store the old and new step lists (a few hundred bytes),
+* value edits on a table of unchanged shape store the changed row indices
+  with their old and new values per column,
+* only shape changes (deleted/inserted rows, filters) store both tables.
+
+When the arrays held in memory exceed the budget, the oldest entries are
+written to .npz files in a spill directory and read back when they are
+undone or redone.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+State = namedtuple("State", "columns values recipe dtypes", defaults=(None,))
+
+_ARRAY_FIELDS = ("rows", "old", "new", "old_values", "new_values")
+
+
+def _columns_of(values):
+    """values as a list of 1D column arrays (a 2D array is split into its columns)."""
+    if isinstance(values, np.ndarray) and values.ndim == 2:
+        return [values[:, j] for j in range(values.shape[1])]
+    return [np.asarray(c) for c in values]
+
+
+def _dtypes_of(state):
+    return list(state.dtypes) if state.dtypes is not None else [str(c.dtype) for c in _columns_of(state.values)]
+
+
+def _n_rows(columns):
+    return len(columns[0]) if columns else 0
+
+
+def _equal(a, b):
+    """Elementwise a == b with NaN / NaT equal to themselves, for any dtype."""
+    with np.errstate(invalid="ignore"):
+        same = np.asarray(a == b, dtype=bool)
+        # x != x only holds for NaN-like values (float NaN, NaT, NaN inside object columns)
+        return same | (np.asarray(a != a, dtype=bool) & np.asarray(b != b, dtype=bool))
+
+
+def fingerprint(state):
+    """Content hash of a State; used to check that an entry still matches the data."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([list(map(str, state.columns)), state.recipe, _dtypes_of(state)],
+                        sort_keys=True, default=str).encode("utf-8"))
+    for col in _columns_of(state.values):
+        h.update(str(col.shape).encode("utf-8"))
+        if col.dtype.kind in "biufcmM":
+            h.update(np.ascontiguousarray(col).tobytes())
+        else:
+            h.update("\x1f".join(map(repr, col.tolist())).encode("utf-8"))
+    return h.hexdigest()
+
+
+def make_delta(before, after):
+    """Compact difference between two States (empty dict if equal). The
+    fingerprints of both sides are kept in delta["fp"]."""
+    delta = {}
+    if before.recipe != after.recipe:
+        delta["recipe"] = ([dict(s) for s in before.recipe], [dict(s) for s in after.recipe])
+    b, a = _columns_of(before.values), _columns_of(after.values)
+    same_layout = (tuple(before.columns) == tuple(after.columns) and _dtypes_of(before) == _dtypes_of(after)
+                   and _n_rows(b) == _n_rows(a))
+    if same_layout:
+        diff = np.zeros(_n_rows(b), dtype=bool)
+        for cb, ca in zip(b, a):
+            diff |= ~_equal(cb, ca)
+        rows = np.flatnonzero(diff)
+        if rows.size:
+            delta["rows"] = rows
+            delta["old"] = [c[rows].copy() for c in b]
+            delta["new"] = [c[rows].copy() for c in a]
+    else:
+        delta["columns"] = (list(before.columns), list(after.columns))
+        delta["dtypes"] = (_dtypes_of(before), _dtypes_of(after))
+        delta["old_values"] = [np.array(c) for c in b]
+        delta["new_values"] = [np.array(c) for c in a]
+    if delta:
+        delta["fp"] = (fingerprint(before), fingerprint(after))
+    return delta
+
+
+def apply_delta(state, delta, undo=True):
+    """State before (undo=True) or after (undo=False) the change, starting from the other side."""
+    columns, values, steps, dtypes = state.columns, _columns_of(state.values), state.recipe, _dtypes_of(state)
+    if "recipe" in delta:
+        steps = [dict(s) for s in delta["recipe"][0 if undo else 1]]
+    if "rows" in delta:
+        values = [np.array(c) for c in values]
+        for col, part in zip(values, delta["old" if undo else "new"]):
+            col[delta["rows"]] = part
+    elif "old_values" in delta:
+        side = 0 if undo else 1
+        columns = delta["columns"][side]
+        dtypes = delta["dtypes"][side]
+        values = [np.array(c) for c in delta["old_values" if undo else "new_values"]]
+    return State(list(columns), values, steps, list(dtypes))
+
+
+def _arrays(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _nbytes(entry):
+    return sum(arr.nbytes for d in entry["changes"].values() for f in _ARRAY_FIELDS if f in d
+               for arr in _arrays(d[f]))
+
+
+class History:
+    """Undo/redo stacks of {"label", "changes": {target: delta}} entries."""
+
+    def __init__(self, budget_bytes=64 * 2**20, max_entries=200, spill_dir=None):
+        self.budget_bytes = int(budget_bytes)
+        self.max_entries = int(max_entries)
+        self._spill_dir = spill_dir
+        self._own_dir = spill_dir is None
+        self._undo = []
+        self._redo = []
+        self._counter = 0
+
+    # --- public API ---
+    def push(self, label, changes):
+        """Record a change; changes maps target -> delta. Empty deltas are dropped."""
+        changes = {t: d for t, d in changes.items() if d}
+        if not changes:
+            return False
+        for e in self._redo:
+            self._discard(e)
+        self._redo = []
+        self._undo.append({"label": label, "changes": changes, "spill": None})
+        while len(self._undo) > self.max_entries:
+            self._discard(self._undo.pop(0))
+        self._enforce_budget()
+        return True
+
+    def undo(self):
+        """(label, changes) of the most recent change, moved to the redo stack; None if empty."""
+        if not self._undo:
+            return None
+        e = self._undo.pop()
+        self._load(e)
+        self._redo.append(e)
+        self._enforce_budget()
+        return e["label"], e["changes"]
+
+    def redo(self):
+        if not self._redo:
+            return None
+        e = self._redo.pop()
+        self._load(e)
+        self._undo.append(e)
+        self._enforce_budget()
+        return e["label"], e["changes"]
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo_label(self):
+        return self._undo[-1]["label"] if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1]["label"] if self._redo else None
+
+    def memory_bytes(self):
+        """Bytes of history arrays currently held in RAM."""
+        return sum(_nbytes(e) for e in self._undo + self._redo if e["spill"] is None)
+
+    def clear(self):
+        for e in self._undo + self._redo:
+            self._discard(e)
+        self._undo, self._redo = [], []
+
+    def close(self):
+        self.clear()
+        if self._own_dir and self._spill_dir and os.path.isdir(self._spill_dir):
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+        self._spill_dir = None if self._own_dir else self._spill_dir
+
+    def __len__(self):
+        return len(self._undo)
+
+    # --- spilling ---
+    def _enforce_budget(self):
+        """Spill the oldest entries (undo stack bottom first, then far redo) until under budget."""
+        used = self.memory_bytes()
+        if used <= self.budget_bytes:
+            return
+        for e in self._undo[:-1] + self._redo[:-1][::-1]:
+            if e["spill"] is None and _nbytes(e):
+                used -= _nbytes(e)
+                self._spill(e)
+                if used <= self.budget_bytes:
+                    return
+
+    def _dir(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="xrd_history_")
+        os.makedirs(self._spill_dir, exist_ok=True)
+        return self._spill_dir
+
+    def _spill(self, e):
+        arrays = {}
+        for i, d in enumerate(e["changes"].values()):
+            for f in _ARRAY_FIELDS:
+                if f in d:
+                    value = d.pop(f)
+                    if isinstance(value, list):
+                        # per-column arrays: remember how many to read back
+                        d.setdefault("_spilled_lists", {})[f] = len(value)
+                    for j, arr in enumerate(_arrays(value)):
+                        arrays[f"{i}_{f}_{j}"] = arr
+        self._counter += 1
+        path = os.path.join(self._dir(), f"entry_{self._counter}.npz")
+        np.savez(path, **arrays)
+        e["spill"] = path
+
+    def _load(self, e):
+        if e["spill"] is None:
+            return
+        # our own temp files; object (text) columns need pickle
+        with np.load(e["spill"], allow_pickle=True) as data:
+            for i, d in enumerate(e["changes"].values()):
+                lists = d.pop("_spilled_lists", {})
+                for f in _ARRAY_FIELDS:
+                    if f in lists:
+                        d[f] = [data[f"{i}_{f}_{j}"] for j in range(lists[f])]
+                    elif f"{i}_{f}_0" in data.files:
+                        d[f] = data[f"{i}_{f}_0"]
+        os.remove(e["spill"])
+        e["spill"] = None
+
+    def _discard(self, e):
+        if e["spill"] is not None:
+            try:
+                os.remove(e["spill"])
+            except OSError:
+                pass
+            e["spill"] = None
@@ -0,0 +1,63 @@
+"""
+Kα2 stripping.
+
+Rachinger's recursion I1(2θ) = I(2θ) − R·I1(2θα1) is unrolled into its
+Neumann series I1 = Σ (−R)^k · I(2θ_k), where 2θ_k is the Kα1 position whose
+Kα2 line falls on 2θ_{k−1}. Every term is a single interpolation, so the
+whole correction is a handful of array operations and runs on a 2D stack of
+scans sharing one 2θ grid in one pass.
+"""
+import numpy as np
+
+# Anode lines (Å) and Kα2/Kα1 intensity ratio
+ANODES = {
+    "Cu": {"ka1": 1.540562, "ka2": 1.544390, "ka2_ratio": 0.5},
+    "Co": {"ka1": 1.788965, "ka2": 1.792850, "ka2_ratio": 0.5},
+    "Fe": {"ka1": 1.936042, "ka2": 1.939980, "ka2_ratio": 0.5},
+    "Cr": {"ka1": 2.289700, "ka2": 2.293606, "ka2_ratio": 0.5},
+    "Mo": {"ka1": 0.709300, "ka2": 0.713590, "ka2_ratio": 0.5},
+    "Ag": {"ka1": 0.559421, "ka2": 0.563813, "ka2_ratio": 0.5},
+}
+
+
+def wavelengths_from_meta(meta, default_anode="Cu"):
+    """(ka1, ka2, ratio) from a scan metadata dict, filling gaps from the anode table."""
+    meta = meta or {}
+    base = ANODES.get(meta.get("anode", default_anode), ANODES[default_anode])
+    return (float(meta.get("ka1", base["ka1"])),
+            float(meta.get("ka2", base["ka2"])),
+            float(meta.get("ka2_ratio", base["ka2_ratio"])))
+
+
+def ka1_position(two_theta, ka1, ka2):
+    """2θ of the Kα1 line whose Kα2 partner appears at two_theta."""
+    s = (ka1 / ka2) * np.sin(np.radians(np.asarray(two_theta, dtype=float) / 2.0))
+    return 2.0 * np.degrees(np.arcsin(np.clip(s, -1.0, 1.0)))
+
+
+def strip_ka2(x, y, ka1=ANODES["Cu"]["ka1"], ka2=ANODES["Cu"]["ka2"], ratio=0.5, tol=1e-4):
+    """
+    Remove the Kα2 contribution from intensity y measured on the 2θ grid x.
+    y may be 1D (n,) or 2D (n_scans, n) with every row on the same grid.
+    Terms are added until ratio**k < tol. The series only converges for
+    0 < ratio < 1; anything else raises ValueError.
+    """
+    if not 0.0 < ratio < 1.0:
+        raise ValueError(f"Kα2/Kα1 oranı 0 ile 1 arasında olmalı: {ratio}")
+    if not 0.0 < tol < 1.0:
+        raise ValueError(f"Tolerans 0 ile 1 arasında olmalı: {tol}")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_terms = max(1, int(np.ceil(np.log(tol) / np.log(ratio))))
+    n = x.size
+    out = y.copy()
+    pos = x
+    coef = 1.0
+    for _ in range(n_terms):
+        pos = ka1_position(pos, ka1, ka2)
+        coef *= -ratio
+        # linear interpolation weights on the shared grid, edge value outside
+        j = np.clip(np.searchsorted(x, pos, side="right") - 1, 0, n - 2)
+        w = np.clip((pos - x[j]) / (x[j + 1] - x[j]), 0.0, 1.0)
+        out += coef * (y[..., j] * (1.0 - w) + y[..., j + 1] * w)
+    return out
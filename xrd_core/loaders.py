@@ -0,0 +1,111 @@
+"""
+File loading for scans and tabular logs.
+
+read_xy reads two-column XRD exports (.txt / .xy / .csv) whatever the
+separator (tab, comma, semicolon or spaces) and skips header lines, so the
+front-ends do not each guess the format. read_table loads the Excel/CSV
+logs used by the sintering views; read_table_chunked streams long CSV logs
+in row chunks with progress reporting; read_events loads event lists
+(times with optional labels) for annotating those logs.
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+_SEPARATORS = ("\t", ";", ",")
+_NUMBER = re.compile(r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+
+
+def _sniff(path, max_lines=200):
+    """(number of header lines, separator) of a text scan. The first line that starts with
+    two numeric fields starts the data, so a header such as "2Theta Intensity" is skipped."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for i, line in enumerate(f):
+            if i >= max_lines:
+                break
+            line = line.split("#", 1)[0]
+            sep = next((s for s in _SEPARATORS if s in line), r"\s+")
+            fields = [v.strip() for v in re.split(sep, line.strip())]
+            if len(fields) >= 2 and all(_NUMBER.match(v) for v in fields[:2]):
+                return i, sep
+    raise ValueError(f"{os.path.basename(path)}: sayısal veri bulunamadı")
+
+
+def read_xy(path, columns=(0, 1)):
+    """(x, y) float64 arrays from a text scan; rows with missing values are dropped."""
+    skip, sep = _sniff(path)
+    df = pd.read_csv(path, sep=sep, header=None, skiprows=skip, usecols=list(columns),
+                     engine="c" if sep != r"\s+" else "python", comment="#")
+    data = df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    data = data[~np.isnan(data).any(axis=1)]
+    if len(data) < 2:
+        raise ValueError(f"{os.path.basename(path)}: en az iki sütun ve iki satır gerekli")
+    return np.ascontiguousarray(data[:, 0]), np.ascontiguousarray(data[:, 1])
+
+
+def read_xy_frame(path):
+    """read_xy as a two-column DataFrame (columns 0 and 1)."""
+    x, y = read_xy(path)
+    return pd.DataFrame({0: x, 1: y})
+
+
+def read_table(path, **kwargs):
+    """Excel or CSV log as a DataFrame (by file extension)."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xls", ".xlsm"):
+        return pd.read_excel(path, **kwargs)
+    return pd.read_csv(path, **kwargs)
+
+
+def read_table_chunked(path, chunksize=500_000, progress=None, **kwargs):
+    """
+    read_table for long logs: CSV/text is parsed `chunksize` rows at a time and
+    each column is collected as arrays, then joined once. progress(fraction)
+    is called after every chunk; if it returns False the read stops and None
+    is returned. Excel files cannot be streamed and are read at once.
+    """
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xls", ".xlsm"):
+        return read_table(path, **kwargs)
+    total = max(os.path.getsize(path), 1)
+    parts = None
+    with open(path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize, **kwargs):
+            if parts is None:
+                parts = {c: [] for c in chunk.columns}
+            for c in parts:
+                parts[c].append(chunk[c].to_numpy())
+            if progress is not None and progress(min(f.tell() / total, 1.0)) is False:
+                return None
+    if parts is None:
+        return pd.DataFrame()
+    return pd.DataFrame({c: np.concatenate(v) for c, v in parts.items()}, copy=False)
+
+
+_TIME_NAMES = ("time", "zaman", "t", "time (s)", "zaman (s)")
+
+
+def read_events(path):
+    """
+    (times, labels) of an event list (CSV or Excel). The time column is the
+    one named Time / Zaman, else the first numeric column; labels come from
+    the first text column (None if there is none). Files without a header
+    row (the first row has a number where a column name would be) are read
+    too. Rows without a time are dropped.
+    """
+    df = read_table(path)
+    if any(_NUMBER.match(str(c).strip()) for c in df.columns):
+        df = read_table(path, header=None)
+    numeric = {c: pd.to_numeric(df[c], errors="coerce") for c in df.columns}
+    tcol = next((c for c in df.columns if str(c).strip().lower() in _TIME_NAMES), None)
+    if tcol is None:
+        tcol = next((c for c in df.columns if numeric[c].notna().any()), None)
+    if tcol is None:
+        raise ValueError(f"{os.path.basename(path)}: zaman sütunu bulunamadı")
+    times = numeric[tcol].to_numpy(dtype=float)
+    keep = ~np.isnan(times)
+    lcol = next((c for c in df.columns if c != tcol and numeric[c].isna().all()), None)
+    labels = None
+    if lcol is not None:
+        labels = [str(v) if not pd.isna(v) else "" for v in df[lcol].to_numpy()[keep]]
+    return times[keep], labels
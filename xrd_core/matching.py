@@ -0,0 +1,44 @@
+"""
+Phase matching of peak positions against reference cards.
+
+Cards map a phase name to its reflection positions in 2θ for
+card_wavelength (pdf_cards.json uses Cu Kα1). Peaks measured at another
+wavelength are compared at the same d-spacing.
+"""
+import json
+
+import numpy as np
+
+from .axes import convert_two_theta
+from .kalpha import ANODES
+
+CARD_WAVELENGTH = ANODES["Cu"]["ka1"]
+
+
+def load_cards(path="pdf_cards.json"):
+    """Reference cards {phase: [2θ, ...]}; empty if the file does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def match_matrix(two_theta, cards, tol=0.3, wavelength=CARD_WAVELENGTH, card_wavelength=CARD_WAVELENGTH):
+    """(phases, hits) where hits[i, j] is True if peak i lies within tol of a reflection of phase j."""
+    pos = np.asarray(two_theta, dtype=float)
+    if wavelength != card_wavelength:
+        pos = convert_two_theta(pos, wavelength, card_wavelength)
+    phases = list(cards)
+    hits = np.zeros((pos.size, len(phases)), dtype=bool)
+    for j, phase in enumerate(phases):
+        refs = np.asarray(cards[phase], dtype=float)
+        if refs.size:
+            hits[:, j] = (np.abs(pos[:, None] - refs[None, :]) <= tol).any(axis=1)
+    return phases, hits
+
+
+def match_peaks(two_theta, cards, tol=0.3, wavelength=CARD_WAVELENGTH, card_wavelength=CARD_WAVELENGTH):
+    """Per peak, the matching phases joined by ", " ("-" if none)."""
+    phases, hits = match_matrix(two_theta, cards, tol, wavelength, card_wavelength)
+    return [", ".join(p for p, h in zip(phases, row) if h) or "-" for row in hits]
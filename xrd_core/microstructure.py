@@ -0,0 +1,162 @@
+"""
+Crystallite size / microstrain analysis (Scherrer and Williamson–Hall).
+
+All per-peak quantities are computed on flat arrays that hold the peaks of
+every scan at once, with a parallel `scan` index; the per-scan W–H fits are
+closed-form least squares reduced with np.bincount, so a whole sample series
+is analysed without a Python loop over peaks.
+"""
+import numpy as np
+import pandas as pd
+
+from .peaks import compute_fwhm_stack, detect_peaks_stack
+
+CU_KA1 = 1.5406  # Å
+SCHERRER_K = 0.9
+
+
+def fit_instrument_profile(two_theta, fwhm):
+    """
+    Fit the Caglioti relation FWHM² = U·tan²θ + V·tanθ + W to the peaks of a
+    line-profile standard (LaB6, Si, ...). Returns (U, V, W).
+    With fewer than three peaks only a constant W is fitted.
+    """
+    two_theta = np.asarray(two_theta, dtype=float)
+    fwhm = np.asarray(fwhm, dtype=float)
+    ok = np.isfinite(two_theta) & np.isfinite(fwhm) & (fwhm > 0)
+    two_theta, fwhm = two_theta[ok], fwhm[ok]
+    if fwhm.size == 0:
+        raise ValueError("Standartta geçerli tepe bulunamadı")
+    if fwhm.size < 3:
+        return 0.0, 0.0, float(np.mean(fwhm ** 2))
+    t = np.tan(np.radians(two_theta / 2.0))
+    A = np.column_stack([t ** 2, t, np.ones_like(t)])
+    (U, V, W), *_ = np.linalg.lstsq(A, fwhm ** 2, rcond=None)
+    return float(U), float(V), float(W)
+
+
+def instrument_fwhm(profile, two_theta):
+    """Instrumental FWHM (degrees) at two_theta for a (U, V, W) Caglioti profile."""
+    U, V, W = profile
+    t = np.tan(np.radians(np.asarray(two_theta, dtype=float) / 2.0))
+    return np.sqrt(np.clip(U * t ** 2 + V * t + W, 0.0, None))
+
+
+def correct_broadening(fwhm_obs, fwhm_inst, shape="gaussian"):
+    """
+    Remove instrumental broadening from observed FWHMs (degrees).
+    gaussian: β² = B² − b², lorentzian: β = B − b. Peaks narrower than the
+    instrument give NaN instead of a negative width.
+    """
+    fwhm_obs = np.asarray(fwhm_obs, dtype=float)
+    fwhm_inst = np.asarray(fwhm_inst, dtype=float)
+    if shape == "lorentzian":
+        beta = fwhm_obs - fwhm_inst
+    else:
+        beta = np.sqrt(np.clip(fwhm_obs ** 2 - fwhm_inst ** 2, 0.0, None))
+    return np.where(beta > 0, beta, np.nan)
+
+
+def scherrer_size(two_theta, beta_deg, wavelength=CU_KA1, k=SCHERRER_K):
+    """Scherrer crystallite size in nm: D = Kλ / (β cosθ)."""
+    theta = np.radians(np.asarray(two_theta, dtype=float) / 2.0)
+    beta = np.radians(np.asarray(beta_deg, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return k * wavelength / (beta * np.cos(theta)) / 10.0
+
+
+def williamson_hall(two_theta, beta_deg, scan, n_scans=None, wavelength=CU_KA1, k=SCHERRER_K):
+    """
+    Per-scan Williamson–Hall fit β·cosθ = Kλ/D + 4ε·sinθ.
+    `scan` gives the scan index of every peak. Returns arrays
+    (n_peaks, size_nm, strain, r2) of length n_scans; scans with fewer
+    than two usable peaks get NaN.
+    """
+    theta = np.radians(np.asarray(two_theta, dtype=float) / 2.0)
+    beta = np.radians(np.asarray(beta_deg, dtype=float))
+    scan = np.asarray(scan, dtype=np.intp)
+    if n_scans is None:
+        n_scans = int(scan.max()) + 1 if scan.size else 0
+    ok = np.isfinite(beta) & np.isfinite(theta)
+    xs = 4.0 * np.sin(theta[ok])
+    ys = beta[ok] * np.cos(theta[ok])
+    g = scan[ok]
+
+    def s(w=None):
+        return np.bincount(g, weights=w, minlength=n_scans).astype(float)
+
+    n, sx, sy = s(), s(xs), s(ys)
+    sxx, sxy, syy = s(xs * xs), s(xs * ys), s(ys * ys)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = n * sxx - sx ** 2
+        slope = (n * sxy - sx * sy) / denom
+        intercept = (sy - slope * sx) / n
+        ss_tot = syy - sy ** 2 / n
+        ss_res = syy - intercept * sy - slope * sxy
+        r2 = 1.0 - ss_res / ss_tot
+        size = np.where(intercept > 0, k * wavelength / intercept / 10.0, np.nan)
+    bad = (n < 2) | (denom <= 0)
+    slope[bad] = np.nan
+    size[bad] = np.nan
+    r2[bad | (n < 3)] = np.nan
+    return n.astype(int), size, slope, r2
+
+
+def analyze_series(scans, names=None, profile=None, peaks=None, wavelength=CU_KA1,
+                   k=SCHERRER_K, shape="gaussian", reference="prominence"):
+    """
+    Scherrer + Williamson–Hall analysis over a list of (x, y) scans.
+
+    peaks: optional list of peak index arrays (one per scan); defaults to the
+    export_peaks rule (height > 10 % of max). profile: (U, V, W) from
+    fit_instrument_profile, or None to skip the instrumental correction.
+    reference: FWHM reference level (see compute_fwhm); half prominence keeps
+    the background out of the widths. Peak picking and widths run as one call
+    over the whole series. Returns (peak_table, wh_table) as DataFrames.
+    """
+    n_scans = len(scans)
+    if names is None:
+        names = [f"Dataset {i + 1}" for i in range(n_scans)]
+    xs = [np.asarray(x, dtype=float) for x, _ in scans]
+    ys = [np.asarray(y, dtype=float) for _, y in scans]
+    if peaks is None:
+        peaks = [p for p, _ in detect_peaks_stack(ys, mode="threshold")]
+    peaks = [np.asarray(p, dtype=np.intp) for p in peaks]
+    scan = np.repeat(np.arange(n_scans, dtype=np.intp), [p.size for p in peaks])
+    pos = np.concatenate([x[p] for x, p in zip(xs, peaks)]) if n_scans else np.empty(0)
+    height = np.concatenate([y[p] for y, p in zip(ys, peaks)]) if n_scans else np.empty(0)
+    fwhm = np.concatenate(compute_fwhm_stack(xs, ys, peaks, reference)) if n_scans else np.empty(0)
+
+    inst = instrument_fwhm(profile, pos) if profile is not None else np.zeros_like(pos)
+    beta = correct_broadening(fwhm, inst, shape=shape)
+    size = scherrer_size(pos, beta, wavelength=wavelength, k=k)
+    names_arr = np.asarray(names, dtype=object)
+
+    peak_table = pd.DataFrame({
+        "Dataset": names_arr[scan],
+        "2θ": pos,
+        "Intensity": height,
+        "FWHM": fwhm,
+        "FWHM Inst": inst,
+        "β (°)": beta,
+        "Scherrer Size (nm)": size,
+    })
+    n, wh_size, strain, r2 = williamson_hall(pos, beta, scan, n_scans=n_scans,
+                                             wavelength=wavelength, k=k)
+    wh_table = pd.DataFrame({
+        "Dataset": names_arr,
+        "N Peaks": n,
+        "Mean Scherrer Size (nm)": _group_nanmean(size, scan, n_scans),
+        "W-H Size (nm)": wh_size,
+        "W-H Strain": strain,
+        "W-H R²": r2,
+    })
+    return peak_table, wh_table
+
+
+def _group_nanmean(values, groups, n_groups):
+    ok = np.isfinite(values)
+    total = np.bincount(groups[ok], weights=values[ok], minlength=n_groups)
+    count = np.bincount(groups[ok], minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / count, np.nan)
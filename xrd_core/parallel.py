@@ -0,0 +1,101 @@
+"""
+Run preprocessing recipes over many scans in a process pool.
+
+The x / y arrays of all scans are packed into one shared-memory block and
+the results are written into a second one, so only small job descriptions
+(offsets, steps, metadata) cross the process boundary; no DataFrames or
+arrays are pickled. With intermediates=True the output block holds the
+result of every step, so the caller can memoise the whole chain.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .recipe import apply_steps, iter_steps
+
+# below this many scans the pool start-up costs more than it saves
+MIN_PARALLEL = 4
+
+
+def _pack(arrays, total):
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total) * 8)
+    buf = np.ndarray((total,), dtype=float, buffer=shm.buf)
+    pos = 0
+    for a in arrays:
+        buf[pos:pos + a.size] = a
+        pos += a.size
+    return shm
+
+
+def _recipe_job(args):
+    x_name, y_name, out_name, total, out_total, off, out_off, n, steps, meta, intermediates = args
+    blocks = [shared_memory.SharedMemory(name=nm) for nm in (x_name, y_name, out_name)]
+    x, y = (np.ndarray((total,), dtype=float, buffer=b.buf) for b in blocks[:2])
+    out = np.ndarray((out_total,), dtype=float, buffer=blocks[2].buf)
+    try:
+        if intermediates:
+            for i, res in enumerate(iter_steps(x[off:off + n], y[off:off + n], steps, meta)):
+                out[out_off + i * n:out_off + (i + 1) * n] = res
+        else:
+            out[out_off:out_off + n] = apply_steps(x[off:off + n], y[off:off + n], steps, meta)
+    finally:
+        # views must be released before the blocks can be closed
+        del x, y, out
+        for b in blocks:
+            b.close()
+    return off
+
+
+def run_recipes(jobs, processes=None, progress=None, intermediates=False):
+    """
+    Apply recipe steps to many scans.
+    jobs: list of (x, y, steps, meta); progress(done, total) is called in the
+    calling process after every finished scan. Returns the result arrays in
+    job order; with intermediates=True, a list per job with the output of
+    every step (the last one is the result).
+    """
+    jobs = [(np.asarray(x, dtype=float).ravel(), np.asarray(y, dtype=float).ravel(), list(steps), meta)
+            for x, y, steps, meta in jobs]
+    if processes == 1 or len(jobs) < MIN_PARALLEL:
+        out = []
+        for k, (x, y, steps, meta) in enumerate(jobs):
+            out.append(list(iter_steps(x, y, steps, meta)) if intermediates else apply_steps(x, y, steps, meta))
+            if progress is not None:
+                progress(k + 1, len(jobs))
+        return out
+
+    sizes = np.array([j[1].size for j in jobs])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    total = int(sizes.sum())
+    # output slots per scan: one, or one per step
+    slots = np.array([len(j[2]) if intermediates else 1 for j in jobs])
+    out_sizes = sizes * slots
+    out_offsets = np.concatenate([[0], np.cumsum(out_sizes)[:-1]])
+    out_total = int(out_sizes.sum())
+    shms = []
+    try:
+        shms.append(_pack([j[0] for j in jobs], total))
+        shms.append(_pack([j[1] for j in jobs], total))
+        shms.append(shared_memory.SharedMemory(create=True, size=max(1, out_total) * 8))
+        names = [s.name for s in shms]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_recipe_job, (*names, total, out_total, int(off), int(out_off), int(n),
+                                                 steps, meta, intermediates))
+                       for off, out_off, n, (_, _, steps, meta) in zip(offsets, out_offsets, sizes, jobs)]
+            for done, fut in enumerate(as_completed(futures), 1):
+                fut.result()
+                if progress is not None:
+                    progress(done, len(jobs))
+        res = np.ndarray((out_total,), dtype=float, buffer=shms[2].buf)
+        if intermediates:
+            out = [[res[o + i * n:o + (i + 1) * n].copy() for i in range(k)]
+                   for o, n, k in zip(out_offsets, sizes, slots)]
+        else:
+            out = [res[o:o + n].copy() for o, n in zip(out_offsets, sizes)]
+        del res
+        return out
+    finally:
+        for s in shms:
+            s.close()
+            s.unlink()
@@ -0,0 +1,258 @@
+"""Peak helpers shared by the XRD front-ends."""
+import numpy as np
+from scipy.ndimage import convolve1d
+from scipy.signal import find_peaks, peak_prominences, peak_widths, savgol_coeffs
+
+
+def compute_fwhm(x, y, peaks, reference="height"):
+    """
+    Full Width at Half Maximum for every index in peaks, in x units.
+    reference="height" (default) measures at half of the absolute peak height,
+    like the original per-peak loop and the export crystallinity limits;
+    "prominence" measures at half of the height above the surrounding
+    background, which is the width of the peak itself on a raw scan.
+    The search runs in C via peak_widths.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    peaks = np.asarray(peaks, dtype=np.intp)
+    if peaks.size == 0:
+        return np.empty(0)
+    _, _, left_ips, right_ips = peak_widths(y, peaks, rel_height=0.5,
+                                            prominence_data=_width_reference(y, peaks, 0, y.size, reference))
+    idx = np.arange(len(x))
+    return np.abs(np.interp(right_ips, idx, x) - np.interp(left_ips, idx, x))
+
+
+def compute_fwhm_stack(xs, ys, peaks, reference="height"):
+    """
+    compute_fwhm for many scans in one peak_widths call.
+    xs, ys: lists of 1D arrays (or 2D arrays) of matching lengths; peaks: one
+    index array per scan. Returns one FWHM array per scan.
+    """
+    flat, offsets, lengths = _join_rows(ys)
+    peaks = [np.asarray(p, dtype=np.intp) for p in peaks]
+    scan = np.repeat(np.arange(len(peaks)), [p.size for p in peaks])
+    if scan.size == 0:
+        return [np.empty(0) for _ in peaks]
+    gidx = np.concatenate(peaks) + offsets[scan]
+    _, _, left_ips, right_ips = peak_widths(
+        flat, gidx, rel_height=0.5,
+        prominence_data=_width_reference(flat, gidx, offsets[scan], offsets[scan] + lengths[scan], reference))
+    # ips -> x on every scan's own grid, with the same layout as flat
+    xflat = np.full(flat.size, np.nan)
+    for x, o, n in zip(xs, offsets, lengths):
+        xflat[o:o + n] = np.asarray(x, dtype=float)[:n]
+    fwhm = np.abs(_interp_flat(xflat, right_ips) - _interp_flat(xflat, left_ips))
+    return np.split(fwhm, np.cumsum([p.size for p in peaks])[:-1])
+
+
+def _width_reference(y, peaks, start, stop, reference):
+    """prominence_data for peak_widths: the whole scan as base at the absolute height, or
+    the real prominence and bases."""
+    if reference == "height":
+        return (y[peaks],
+                np.broadcast_to(np.asarray(start, dtype=np.intp), peaks.shape).copy(),
+                np.broadcast_to(np.asarray(stop, dtype=np.intp) - 1, peaks.shape).copy())
+    if reference == "prominence":
+        return peak_prominences(y, peaks)
+    raise ValueError(f"Bilinmeyen FWHM referansı: {reference}")
+
+
+def _interp_flat(xflat, ips):
+    i0 = np.floor(ips).astype(np.intp)
+    frac = ips - i0
+    i1 = np.where(frac > 0, i0 + 1, i0)
+    return xflat[i0] + frac * (xflat[i1] - xflat[i0])
+
+
+def _join_rows(ys):
+    """Scans laid end to end with one +inf separator after each. A separator ends every
+    base and width search exactly like the end of a separate array, and is never a peak
+    neighbour that a real peak could exceed. Returns (flat, offsets, lengths)."""
+    if isinstance(ys, np.ndarray) and ys.ndim == 2:
+        n_scans, n = ys.shape
+        joined = np.full((n_scans, n + 1), np.inf)
+        joined[:, :n] = ys
+        return (joined.ravel(), np.arange(n_scans, dtype=np.intp) * (n + 1),
+                np.full(n_scans, n, dtype=np.intp))
+    ys = [np.asarray(y, dtype=float) for y in ys]
+    lengths = np.array([y.size for y in ys], dtype=np.intp)
+    offsets = np.concatenate([[0], np.cumsum(lengths + 1)[:-1]]).astype(np.intp)
+    flat = np.full(int((lengths + 1).sum()), np.inf)
+    for y, o in zip(ys, offsets):
+        flat[o:o + y.size] = y
+    return flat, offsets, lengths
+
+
+def _split_rows(gidx, offsets, lengths, *values):
+    """Global flat indices -> per-scan (local indices, *values); separator hits are dropped."""
+    row = np.searchsorted(offsets, gidx, side="right") - 1
+    col = gidx - offsets[row]
+    keep = col < lengths[row]
+    row, col = row[keep], col[keep]
+    values = [v[keep] for v in values]
+    bounds = np.searchsorted(row, np.arange(offsets.size + 1))
+    return [(col[a:b], *(v[a:b] for v in values)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def find_relative_peaks(y, rel_height=0.1):
+    """Peaks higher than rel_height * max(y) (the export_peaks rule)."""
+    y = np.asarray(y, dtype=float)
+    if y.size == 0:
+        return np.empty(0, dtype=np.intp)
+    peaks, _ = find_peaks(y, height=np.max(y) * rel_height)
+    return peaks
+
+
+# --- Noise-adaptive detection ---
+MAD_TO_SIGMA = 1.4826
+
+
+def estimate_noise(y):
+    """
+    Robust noise sigma per scan: MAD of the second-difference (high-pass)
+    residual, scaled for white noise. Works on 1D or 2D (scans on axis 0).
+    """
+    y = np.asarray(y, dtype=float)
+    r = np.diff(y, n=2, axis=-1) / np.sqrt(6.0)
+    med = np.median(r, axis=-1, keepdims=True)
+    sigma = MAD_TO_SIGMA * np.median(np.abs(r - med), axis=-1)
+    return np.maximum(sigma, np.finfo(float).tiny)
+
+
+def _smooth_kernel(smooth):
+    """Savitzky–Golay (quadratic) smoothing kernel and its white-noise gain ||h||₂."""
+    h = savgol_coeffs(smooth, 2)
+    return h, float(np.sqrt(np.sum(h ** 2)))
+
+
+def detect_peaks(y, snr=5.0, smooth=7, distance=None):
+    """
+    Peaks whose prominence exceeds snr times the noise of a peak-to-base
+    difference (√2·σ). Prominence is measured on a lightly smoothed copy
+    (window `smooth`, odd, 0/1 disables) and σ is the noise left after that
+    smoothing. On pure Poisson noise snr=5 still gives about one false peak
+    per 10k-point scan (0–4); snr=6 about one per hundred scans.
+    Returns (indices, prominences).
+    """
+    y = np.asarray(y, dtype=float)
+    if y.size < 3:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    sigma = estimate_noise(y)
+    ys, gain = y, 1.0
+    if smooth and smooth > 2 and y.size > smooth:
+        h, gain = _smooth_kernel(smooth)
+        ys = convolve1d(y, h, mode="nearest")
+    peaks, props = find_peaks(ys, prominence=snr * np.sqrt(2.0) * sigma * gain, distance=distance)
+    return peaks, props["prominences"]
+
+
+def _ricker_bank(scales):
+    """Scale-normalised negative second-derivative-of-Gaussian kernels, zero padded to one length."""
+    scales = np.asarray(scales, dtype=float)
+    half = int(np.ceil(4 * scales.max()))
+    t = np.arange(-half, half + 1, dtype=float)
+    s = scales[:, None]
+    g = np.exp(-0.5 * (t / s) ** 2)
+    # -s² d²/dt² G, normalised so every kernel has the same response to a matched Gaussian
+    k = (1.0 - (t / s) ** 2) * g
+    k -= k.mean(axis=1, keepdims=True)
+    k /= np.abs(k).sum(axis=1, keepdims=True)
+    return k
+
+
+def multiscale_response(y, scales=(1, 2, 4, 8, 16)):
+    """
+    Smoothed second-derivative (Ricker/CWT-style) response for all scales in one
+    FFT convolution. y may be 1D (n,) or 2D (n_scans, n); the result has shape
+    (..., n_scales, n) and every scale is divided by its own robust noise sigma.
+    """
+    from scipy.signal import fftconvolve
+    y = np.asarray(y, dtype=float)
+    bank = _ricker_bank(scales)
+    half = bank.shape[1] // 2
+    # edge padding keeps the scan ends from looking like steps
+    pad = [(0, 0)] * (y.ndim - 1) + [(half, half)]
+    yp = np.pad(y, pad, mode="edge")
+    bank = bank.reshape((1,) * (y.ndim - 1) + bank.shape)
+    resp = fftconvolve(yp[..., None, :], bank, mode="same", axes=-1)[..., half:half + y.shape[-1]]
+    med = np.median(resp, axis=-1, keepdims=True)
+    mad = MAD_TO_SIGMA * np.median(np.abs(resp - med), axis=-1, keepdims=True)
+    return (resp - med) / np.maximum(mad, np.finfo(float).tiny)
+
+
+def detect_peaks_multiscale(y, snr=5.0, scales=(1, 2, 4, 8, 16)):
+    """
+    Multi-scale detection: peaks of the max-over-scales normalised response
+    above snr, snapped to the local intensity maximum at their best scale.
+    Returns (indices, response).
+    """
+    y = np.asarray(y, dtype=float)
+    return _peaks_from_response(y, multiscale_response(y, scales), snr, scales)
+
+
+def detect_peaks_stack(Y, mode="adaptive", snr=5.0, scales=(1, 2, 4, 8, 16), smooth=7):
+    """
+    Detect peaks in every scan of a stack with one call.
+    Y: 2D array (n_scans, n) or a list of 1D arrays of any length.
+    mode: "adaptive" (MAD-based prominence), "multiscale" or "threshold"
+    (the old 10 %-of-max rule). Returns a list of (indices, strength) tuples.
+    """
+    if mode == "threshold":
+        return _threshold_stack(Y)
+    if isinstance(Y, np.ndarray) and Y.ndim == 2:
+        if mode == "multiscale":
+            resp = multiscale_response(Y, scales)
+            return [_peaks_from_response(y, r, snr, scales) for y, r in zip(Y, resp)]
+        return _adaptive_stack(Y, snr, smooth)
+    if mode == "multiscale":
+        return [detect_peaks_multiscale(y, snr=snr, scales=scales) for y in Y]
+    return [detect_peaks(y, snr=snr, smooth=smooth) for y in Y]
+
+
+def _threshold_stack(Y, rel_height=0.1):
+    """find_relative_peaks for every scan in one find_peaks call with per-scan heights."""
+    flat, offsets, lengths = _join_rows(Y)
+    if offsets.size == 0:
+        return []
+    top = np.maximum.reduceat(np.where(np.isinf(flat), -np.inf, flat), offsets)
+    limit = np.repeat(top * rel_height, lengths + 1)
+    gidx, props = find_peaks(flat, height=(limit, None))
+    return _split_rows(gidx, offsets, lengths, props["peak_heights"])
+
+
+def _adaptive_stack(Y, snr, smooth):
+    """detect_peaks for every row of a 2D stack without a per-row loop (see _join_rows).
+    Separator peaks are dropped before the prominence pass, since their own base search
+    would run over the whole stack."""
+    n_scans, n = Y.shape
+    if n < 3 or n_scans == 0:
+        return [(np.empty(0, dtype=np.intp), np.empty(0)) for _ in range(n_scans)]
+    sig = estimate_noise(Y)
+    ys, gain = Y, 1.0
+    if smooth and smooth > 2 and n > smooth:
+        h, gain = _smooth_kernel(smooth)
+        ys = convolve1d(Y, h, axis=-1, mode="nearest")
+    flat, offsets, lengths = _join_rows(ys)
+    peaks, _ = find_peaks(flat)
+    peaks = peaks[peaks % (n + 1) < n]
+    prom = peak_prominences(flat, peaks)[0]
+    keep = prom >= snr * np.sqrt(2.0) * sig[peaks // (n + 1)] * gain
+    return _split_rows(peaks[keep], offsets, lengths, prom[keep])
+
+
+def _peaks_from_response(y, resp, snr, scales):
+    best = resp.max(axis=0)
+    cand, props = find_peaks(best, height=snr)
+    if cand.size == 0:
+        return cand, np.empty(0)
+    scale_of = np.asarray(scales)[resp[:, cand].argmax(axis=0)]
+    half = np.maximum(1, np.round(scale_of).astype(np.intp))
+    # snap to the intensity maximum within ±scale of the response ridge
+    offs = np.arange(-half.max(), half.max() + 1)
+    idx = np.clip(cand[:, None] + offs[None, :], 0, y.size - 1)
+    vals = np.where(np.abs(offs)[None, :] <= half[:, None], y[idx], -np.inf)
+    snapped = idx[np.arange(cand.size), vals.argmax(axis=1)]
+    snapped, first = np.unique(snapped, return_index=True)
+    return snapped, props["peak_heights"][first]
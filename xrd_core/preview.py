@@ -0,0 +1,65 @@
+"""
+Fast previews of a single preprocessing step.
+
+A preview first runs on a block-averaged copy of the visible 2θ range (at
+most max_points points) with the step parameters rescaled to the coarser
+grid, then on the full-resolution scan. Each stage returns the estimated
+background (baseline steps only) and the corrected curve.
+"""
+import numpy as np
+
+from .recipe import BACKGROUND_STEPS, apply_steps, make_step
+
+
+def decimate(x, y, xlim=None, max_points=2000):
+    """
+    Visible part of a scan, block-averaged to at most max_points points.
+    Returns (x, y, k) where k is the block size (1 = untouched).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if xlim is not None:
+        lo, hi = sorted(xlim)
+        i0, i1 = np.searchsorted(x, [lo, hi]) if x[0] <= x[-1] else (0, x.size)
+        # keep a margin so filters see some data beyond the visible edges
+        margin = max(1, (i1 - i0) // 10)
+        if i1 - i0 >= 16:  # otherwise the view does not show this scan: use all of it
+            x, y = x[max(0, i0 - margin):i1 + margin], y[max(0, i0 - margin):i1 + margin]
+    k = max(1, int(np.ceil(x.size / max_points))) if max_points else 1
+    if k == 1:
+        return x, y, 1
+    m = (x.size // k) * k
+    return x[:m].reshape(-1, k).mean(axis=1), y[:m].reshape(-1, k).mean(axis=1), k
+
+
+def scale_step(step, k):
+    """
+    Parameters of a step for a k-times coarser grid: point windows shrink by k;
+    the second-difference penalty λ keeps the same smoothness at λ / k⁴.
+    """
+    if k == 1:
+        return step
+    params = dict(step["params"])
+    if "window" in params:
+        w = max(3, int(round(params["window"] / k)))
+        if step["op"] == "savgol":
+            w = max(w, int(params.get("polyorder", 3)) + 2)
+        params["window"] = w | 1
+    if "lam" in params:
+        params["lam"] = max(params["lam"] / k ** 4, 1e-6)
+    return make_step(step["op"], **params)
+
+
+def preview_step(x, y, step, meta=None, xlim=None, max_points=None):
+    """
+    (x, background or None, corrected) for one step. With max_points the
+    step runs on a decimated copy of the xlim range.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if max_points or xlim is not None:
+        x, y, k = decimate(x, y, xlim, max_points)
+        step = scale_step(step, k)
+    out = apply_steps(x, y, [step], meta)
+    bg = y - out if step["op"] in BACKGROUND_STEPS else None
+    return x, bg, out
@@ -0,0 +1,34 @@
+"""
+Non-destructive 2θ range views.
+
+A range is kept as start/stop indices into the full scan, found by binary
+search on the sorted x array, so restricting every dataset to an analysis
+window slices the existing arrays (numpy views, no copy) and the data
+outside the window stays available.
+"""
+import numpy as np
+
+
+def range_indices(x, xrange):
+    """(start, stop) such that x[start:stop] is the part of x inside xrange.
+    xrange=None gives the whole scan. x should be sorted (either direction);
+    for unsorted x the span between the first and last point inside is used."""
+    x = np.asarray(x)
+    n = x.size
+    if xrange is None or n == 0:
+        return 0, n
+    lo, hi = sorted(float(v) for v in xrange)
+    if np.all(x[1:] >= x[:-1]):
+        return int(np.searchsorted(x, lo, "left")), int(np.searchsorted(x, hi, "right"))
+    if np.all(x[1:] <= x[:-1]):
+        # descending grid: search the reversed view
+        xr = x[::-1]
+        return n - int(np.searchsorted(xr, hi, "right")), n - int(np.searchsorted(xr, lo, "left"))
+    inside = np.flatnonzero((x >= lo) & (x <= hi))
+    return (int(inside[0]), int(inside[-1]) + 1) if inside.size else (0, 0)
+
+
+def range_view(x, y, xrange):
+    """x and y restricted to xrange as views of the original arrays."""
+    i0, i1 = range_indices(x, xrange)
+    return x[i0:i1], y[i0:i1]
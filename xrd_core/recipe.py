@@ -0,0 +1,228 @@
+"""
+Non-destructive preprocessing recipes.
+
+A recipe is an ordered list of steps, each a JSON-safe dict
+{"op": <name>, "params": {...}}. It is evaluated from the raw arrays of a
+scan and never modifies them. Every intermediate result is memoized under a
+chained key: the key of the raw scan is a hash of its content (x, y and
+metadata) and the key of step k is a hash of the key of step k-1 plus the op
+and parameters of step k. Editing step 3 therefore reuses the cached output
+of steps 1-2, and the same recipe can be reapplied to any other scan.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from . import kalpha as _kalpha
+from .startup import lazy_import
+
+# scipy-backed step kernels load when a step first runs, not with the recipe registry
+_signal = lazy_import("scipy.signal")
+_baseline = lazy_import(f"{__package__}.baseline")
+_spikes = lazy_import(f"{__package__}.spikes")
+
+# op -> (function(x, y, meta, **params) -> y, Turkish label)
+STEPS = {}
+
+# steps that subtract an estimated background (background = input - output)
+BACKGROUND_STEPS = ("als", "arpls", "airpls", "rolling")
+
+# steps whose function also accepts a 2D stack (rows = scans on the grid x); all the
+# built-in ones do, registered extensions only if they are added here
+STACKABLE_STEPS = ("despike", "savgol", "als", "arpls", "airpls", "rolling", "strip_ka2")
+
+
+def register_step(op, label):
+    """Decorator that adds a preprocessing step to the registry."""
+    def deco(fn):
+        STEPS[op] = (fn, label)
+        return fn
+    return deco
+
+
+@register_step("despike", "Sıçrama giderme (median/MAD)")
+def _step_despike(x, y, meta, window=7, threshold=6.0, min_ratio=0.5, max_width=3):
+    return _spikes.remove_spikes(x, y, window, threshold, min_ratio, int(max_width))[0]
+
+
+@register_step("savgol", "Yumuşatma (Savitzky–Golay)")
+def _step_savgol(x, y, meta, window=11, polyorder=3):
+    window = int(window) | 1
+    return _signal.savgol_filter(y, window_length=window, polyorder=int(polyorder))
+
+
+@register_step("als", "Arka plan (ALS)")
+def _step_als(x, y, meta, lam=1e5, p=0.01, niter=10):
+    return y - _baseline.baseline(y, "als", lam=lam, p=p, niter=int(niter))
+
+
+@register_step("arpls", "Arka plan (arPLS)")
+def _step_arpls(x, y, meta, lam=1e5, ratio=1e-6, niter=50):
+    return y - _baseline.baseline(y, "arpls", lam=lam, ratio=ratio, niter=int(niter))
+
+
+@register_step("airpls", "Arka plan (airPLS)")
+def _step_airpls(x, y, meta, lam=1e5, niter=15):
+    return y - _baseline.baseline(y, "airpls", lam=lam, niter=int(niter))
+
+
+@register_step("rolling", "Arka plan (Rolling)")
+def _step_rolling(x, y, meta, window=101, method="min"):
+    return y - _baseline.rolling_baseline(y, int(window), method)
+
+
+@register_step("strip_ka2", "Kα2 çıkarma (Rachinger)")
+def _step_strip_ka2(x, y, meta, anode=None, **lines):
+    """Wavelengths come from the scan metadata; explicit params (ka1, ka2, ka2_ratio) win."""
+    merged = dict(meta or {})
+    if anode and not any(k in merged for k in ("anode", "ka1")):
+        merged["anode"] = anode
+    merged.update(lines)
+    ka1, ka2, ratio = _kalpha.wavelengths_from_meta(merged)
+    return _kalpha.strip_ka2(x, y, ka1, ka2, ratio)
+
+
+def make_step(op, **params):
+    """A validated, JSON-safe step dict."""
+    if op not in STEPS:
+        raise ValueError(f"Bilinmeyen ön işleme adımı: {op}")
+    clean = {}
+    for k, v in params.items():
+        if isinstance(v, np.generic):
+            v = v.item()
+        clean[k] = v
+    json.dumps(clean)
+    return {"op": op, "params": clean}
+
+
+def step_label(step):
+    """Human readable one-line description of a step."""
+    label = STEPS.get(step["op"], (None, step["op"]))[1]
+    params = ", ".join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                       for k, v in step.get("params", {}).items())
+    return f"{label} [{params}]" if params else label
+
+
+def validate_recipe(recipe):
+    """Return a clean copy of a recipe loaded from JSON; raises on unknown ops."""
+    return [make_step(s["op"], **s.get("params", {})) for s in (recipe or [])]
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else str(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+def source_key(x, y, meta=None):
+    """Content hash of a raw scan."""
+    x = np.ascontiguousarray(x, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    return _digest(x.tobytes(), b"|", y.tobytes(), b"|", json.dumps(meta or {}, sort_keys=True, default=str))
+
+
+def step_key(parent, step):
+    """Key of a step's output given the key of its input."""
+    return _digest(parent, b"|", json.dumps(step, sort_keys=True))
+
+
+class RecipeCache:
+    """LRU store of intermediate results, bounded by total array bytes."""
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = int(max_bytes)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        arr = self._data.get(key)
+        if arr is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return arr
+
+    def put(self, key, arr):
+        if key in self._data:
+            self._data.move_to_end(key)
+            return
+        arr = np.array(arr, dtype=float)
+        arr.flags.writeable = False
+        self._data[key] = arr
+        self._bytes += arr.nbytes
+        while self._bytes > self.max_bytes and len(self._data) > 1:
+            _, old = self._data.popitem(last=False)
+            self._bytes -= old.nbytes
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+def chain_keys(x, y, steps, meta=None):
+    """Cache key of the output of every step."""
+    keys = []
+    key = source_key(x, y, meta)
+    for s in steps:
+        key = step_key(key, s)
+        keys.append(key)
+    return keys
+
+
+def cached_prefix(keys, cache):
+    """(number of steps already done, their output) for the longest cached prefix."""
+    if cache is not None:
+        for i in range(len(keys) - 1, -1, -1):
+            hit = cache.get(keys[i])
+            if hit is not None:
+                return i + 1, hit
+    return 0, None
+
+
+def iter_steps(x, y, steps, meta=None):
+    """Output of every step in turn, without any caching."""
+    out = np.asarray(y, dtype=float)
+    for s in steps:
+        out = np.asarray(STEPS[s["op"]][0](x, np.array(out, dtype=float), meta, **s.get("params", {})), dtype=float)
+        yield out
+
+
+def apply_steps(x, y, steps, meta=None):
+    """Run steps on y without any caching (used by worker processes)."""
+    out = np.asarray(y, dtype=float)
+    for out in iter_steps(x, out, steps, meta):
+        pass
+    return out
+
+
+def evaluate(x, y, recipe, meta=None, cache=None, upto=None):
+    """
+    Output of the first `upto` steps of recipe (all by default) applied to
+    the raw scan (x, y). Results are read-only arrays; the raw arrays are not
+    modified. With a cache, only the steps after the longest cached prefix
+    are computed.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    steps = list(recipe or [])[:upto]
+    if not steps:
+        return y
+    keys = chain_keys(x, y, steps, meta)
+    start, out = cached_prefix(keys, cache)
+    if out is None:
+        out = y
+    for i in range(start, len(steps)):
+        out = apply_steps(x, out, steps[i:i + 1], meta)
+        out.flags.writeable = False
+        if cache is not None:
+            cache.put(keys[i], out)
+    return out
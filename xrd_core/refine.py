@@ -0,0 +1,466 @@
+"""
+Whole-pattern lattice refinement (Pawley and Le Bail extraction).
+
+Model: y(2θ) = Σ_k I_k · pV(2θ − 2θ_k; H_k, η) + Σ_j b_j · T_j(2θ)
+  - 2θ_k from the cell (crystal-system constraints) and a zero shift
+  - H_k² = U·tan²θ + V·tanθ + W (Caglioti), one η for all peaks
+  - T_j Chebyshev polynomials over the scan range
+
+The peak part is assembled as a sparse (n_points × n_reflections) design
+matrix: every reflection only touches the points within a few FWHM of it.
+Intensities and background are linear, so for a given set of non-linear
+parameters (cell, zero, profile) they are solved directly (Pawley) or by
+Le Bail partitioning; scipy's least_squares only sees the ~10 non-linear
+parameters. Their Jacobian is analytic: the profile derivatives are sparse
+matrices with the design's pattern, and the linear part is projected out
+(variable projection), so each iteration costs one evaluation instead of
+one per parameter. Results are plain dicts so series refinements can run in a
+process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from numpy.polynomial import chebyshev
+from scipy import sparse
+from scipy.optimize import least_squares
+from scipy.sparse.linalg import splu
+
+# free cell parameters per crystal system
+CRYSTAL_SYSTEMS = {
+    "cubic": ("a",),
+    "tetragonal": ("a", "c"),
+    "hexagonal": ("a", "c"),
+    "rhombohedral": ("a", "alpha"),
+    "orthorhombic": ("a", "b", "c"),
+    "monoclinic": ("a", "b", "c", "beta"),
+    "triclinic": ("a", "b", "c", "alpha", "beta", "gamma"),
+}
+
+CENTERINGS = ("P", "I", "F", "C", "A", "B", "R")
+
+
+def expand_cell(system, free):
+    """(a, b, c, α, β, γ) from the free parameters of a crystal system."""
+    f = dict(zip(CRYSTAL_SYSTEMS[system], free))
+    if system == "cubic":
+        return f["a"], f["a"], f["a"], 90.0, 90.0, 90.0
+    if system == "tetragonal":
+        return f["a"], f["a"], f["c"], 90.0, 90.0, 90.0
+    if system == "hexagonal":
+        return f["a"], f["a"], f["c"], 90.0, 90.0, 120.0
+    if system == "rhombohedral":
+        return f["a"], f["a"], f["a"], f["alpha"], f["alpha"], f["alpha"]
+    if system == "orthorhombic":
+        return f["a"], f["b"], f["c"], 90.0, 90.0, 90.0
+    if system == "monoclinic":
+        return f["a"], f["b"], f["c"], 90.0, f["beta"], 90.0
+    return f["a"], f["b"], f["c"], f["alpha"], f["beta"], f["gamma"]
+
+
+def free_cell(system, cell):
+    """Inverse of expand_cell: pick the free parameters out of a full cell."""
+    full = dict(zip(("a", "b", "c", "alpha", "beta", "gamma"), cell))
+    return [full[k] for k in CRYSTAL_SYSTEMS[system]]
+
+
+def reciprocal_metric(cell):
+    a, b, c, al, be, ga = cell
+    ca, cb, cg = np.cos(np.radians([al, be, ga]))
+    G = np.array([[a * a, a * b * cg, a * c * cb],
+                  [a * b * cg, b * b, b * c * ca],
+                  [a * c * cb, b * c * ca, c * c]])
+    return np.linalg.inv(G)
+
+
+def cell_volume(cell):
+    a, b, c, al, be, ga = cell
+    ca, cb, cg = np.cos(np.radians([al, be, ga]))
+    return a * b * c * np.sqrt(max(1 - ca * ca - cb * cb - cg * cg + 2 * ca * cb * cg, 0.0))
+
+
+def d_spacing(hkl, cell):
+    hkl = np.asarray(hkl, dtype=float)
+    q = np.einsum("ni,ij,nj->n", hkl, reciprocal_metric(cell), hkl)
+    return 1.0 / np.sqrt(q)
+
+
+def _allowed(h, k, l, centering):
+    """Lattice-centering reflection conditions."""
+    if centering == "I":
+        return (h + k + l) % 2 == 0
+    if centering == "F":
+        return ((h % 2 == k % 2) & (k % 2 == l % 2))
+    if centering == "C":
+        return (h + k) % 2 == 0
+    if centering == "A":
+        return (k + l) % 2 == 0
+    if centering == "B":
+        return (h + l) % 2 == 0
+    if centering == "R":
+        return (-h + k + l) % 3 == 0
+    return np.ones_like(h, dtype=bool)
+
+
+def generate_hkl(cell, wavelength, two_theta_max, centering="P"):
+    """
+    Unique reflections up to two_theta_max for a cell and lattice centering.
+    Reflections with the same d-spacing (symmetry equivalents, Friedel pairs)
+    are merged; returns (hkl, multiplicity) sorted by increasing 2θ.
+    Only centering extinctions are applied: reflections killed by glide or
+    screw operations are kept and simply refine to ~0 intensity.
+    """
+    d_min = wavelength / (2.0 * np.sin(np.radians(two_theta_max) / 2.0))
+    n_max = [int(np.floor(edge / d_min)) + 1 for edge in cell[:3]]
+    h, k, l = np.meshgrid(*[np.arange(-n, n + 1) for n in n_max], indexing="ij")
+    h, k, l = h.ravel(), k.ravel(), l.ravel()
+    keep = ~((h == 0) & (k == 0) & (l == 0)) & _allowed(h, k, l, centering)
+    hkl = np.column_stack([h[keep], k[keep], l[keep]])
+    d = d_spacing(hkl, cell)
+    sel = d >= d_min
+    hkl, d = hkl[sel], d[sel]
+    # merge equal d: keep the "most positive" index as representative
+    key = np.round(d, 5)
+    order = np.lexsort((-hkl[:, 2], -hkl[:, 1], -hkl[:, 0], -key))
+    key, hkl = key[order], hkl[order]
+    uniq, first, mult = np.unique(key, return_index=True, return_counts=True)
+    rep = hkl[first]
+    # sort by decreasing d == increasing 2θ
+    order = np.argsort(-uniq)
+    return rep[order], mult[order]
+
+
+def pseudo_voigt(dx, fwhm, eta):
+    """Area-normalised pseudo-Voigt."""
+    t = (dx / fwhm) ** 2
+    g = np.sqrt(4 * np.log(2) / np.pi) / fwhm * np.exp(-4 * np.log(2) * t)
+    lor = 2.0 / (np.pi * fwhm) / (1.0 + 4.0 * t)
+    return eta * lor + (1.0 - eta) * g
+
+
+def pseudo_voigt_derivs(dx, fwhm, eta):
+    """pseudo_voigt and its partial derivatives (∂/∂dx, ∂/∂fwhm, ∂/∂η)."""
+    a = 4 * np.log(2)
+    t = (dx / fwhm) ** 2
+    g = np.sqrt(a / np.pi) / fwhm * np.exp(-a * t)
+    den = 1.0 + 4.0 * t
+    lor = 2.0 / (np.pi * fwhm) / den
+    g_dx = -2.0 * a * dx / fwhm ** 2 * g
+    g_dh = g * (2.0 * a * t - 1.0) / fwhm
+    l_dx = -8.0 * dx / (fwhm ** 2 * den) * lor
+    l_dh = lor * (8.0 * t / den - 1.0) / fwhm
+    return (eta * lor + (1.0 - eta) * g, eta * l_dx + (1.0 - eta) * g_dx,
+            eta * l_dh + (1.0 - eta) * g_dh, lor - g)
+
+
+class _Model:
+    """Geometry shared by the residual evaluations of one refinement."""
+
+    def __init__(self, x, y, system, hkl, wavelength, n_bg, window):
+        self.x = x
+        self.y = y
+        self.system = system
+        self.hkl = hkl
+        self.wavelength = wavelength
+        self.window = window
+        self.n_cell = len(CRYSTAL_SYSTEMS[system])
+        u = 2.0 * (x - x[0]) / (x[-1] - x[0]) - 1.0
+        self.bg = chebyshev.chebvander(u, n_bg - 1) if n_bg > 0 else np.empty((x.size, 0))
+        # Poisson-like weights
+        self.sw = 1.0 / np.sqrt(np.maximum(y, 1.0))
+
+    def unpack(self, p):
+        nc = self.n_cell
+        cell = expand_cell(self.system, p[:nc])
+        zero, U, V, W, eta = p[nc:nc + 5]
+        return cell, zero, U, V, W, eta
+
+    def peaks(self, p):
+        cell, zero, U, V, W, eta = self.unpack(p)
+        d = d_spacing(self.hkl, cell)
+        s = np.clip(self.wavelength / (2.0 * d), -1.0, 1.0)
+        tth = 2.0 * np.degrees(np.arcsin(s)) + zero
+        t = np.tan(np.radians(tth / 2.0))
+        fwhm = np.sqrt(np.maximum(U * t * t + V * t + W, 1e-8))
+        return tth, fwhm, eta
+
+    def _support(self, tth, fwhm):
+        """(rows, column pointers) of the points within window·FWHM of every reflection.
+        Rows come out sorted inside each column, so they are CSC indices as they are."""
+        lo = np.searchsorted(self.x, tth - self.window * fwhm)
+        hi = np.searchsorted(self.x, tth + self.window * fwhm)
+        counts = hi - lo
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        rows = np.arange(indptr[-1]) - np.repeat(indptr[:-1], counts) + np.repeat(lo, counts)
+        return rows, indptr, np.repeat(np.arange(tth.size), counts)
+
+    def design(self, p, derivs=False):
+        """Sparse (n_points × n_refl) profile matrix for the current parameters. With
+        derivs=True also the matrices of ∂/∂(2θ_k), ∂/∂H_k and ∂/∂η with the same pattern."""
+        tth, fwhm, eta = self.peaks(p)
+        rows, indptr, cols = self._support(tth, fwhm)
+        shape = (self.x.size, tth.size)
+        dx = self.x[rows] - tth[cols]
+        if not derivs:
+            return sparse.csc_matrix((pseudo_voigt(dx, fwhm[cols], eta), rows, indptr), shape=shape)
+        vals, d_dx, d_dh, d_eta = pseudo_voigt_derivs(dx, fwhm[cols], eta)
+        # a shift of the peak centre is a shift of dx with the opposite sign
+        return tuple(sparse.csc_matrix((v, rows, indptr), shape=shape) for v in (vals, -d_dx, d_dh, d_eta))
+
+    def peak_jacobian(self, p):
+        """(∂2θ_k/∂p, ∂H_k/∂p), each (n_refl × n_params). Reflection positions are
+        differentiated numerically in the few cell parameters (cheap: n_refl values
+        each); everything else is analytic."""
+        nc = self.n_cell
+        tth, fwhm, _ = self.peaks(p)
+        dtth = np.zeros((tth.size, p.size))
+        for j in range(nc):
+            h = 1e-6 * max(abs(p[j]), 1.0)
+            hi, lo = p.copy(), p.copy()
+            hi[j] += h
+            lo[j] -= h
+            dtth[:, j] = (self.peaks(hi)[0] - self.peaks(lo)[0]) / (2.0 * h)
+        dtth[:, nc] = 1.0
+        U, V, W = p[nc + 1:nc + 4]
+        t = np.tan(np.radians(tth / 2.0))
+        live = U * t * t + V * t + W > 1e-8  # below that the width is clamped
+        inv = np.where(live, 0.5 / fwhm, 0.0)
+        dh = (inv * (2 * U * t + V) * (1.0 + t * t) * np.pi / 360.0)[:, None] * dtth
+        dh[:, nc + 1] = inv * t * t
+        dh[:, nc + 2] = inv * t
+        dh[:, nc + 3] = inv
+        return dtth, dh
+
+    def model_jacobian(self, p, mats, intensities):
+        """∂(P(p) @ intensities)/∂p (n_points × n_params) with the intensities held fixed."""
+        _, d_tth, d_h, d_eta = mats
+        dtth, dh = self.peak_jacobian(p)
+        J = d_tth @ (intensities[:, None] * dtth) + d_h @ (intensities[:, None] * dh)
+        J[:, self.n_cell + 4] = d_eta @ intensities
+        return J
+
+    def solve_linear(self, P, damping=1e-8, factor=False):
+        """Pawley step: weighted LSQ for intensities + background, solved as sparse
+        normal equations. factor=True also returns (weighted design, LU of the
+        normal matrix) for projecting the Jacobian."""
+        A = sparse.hstack([P, sparse.csc_matrix(self.bg)], format="csc")
+        Aw = sparse.diags(self.sw) @ A
+        M = (Aw.T @ Aw).tocsc()
+        M = M + sparse.diags(damping * np.maximum(M.diagonal(), 1e-12))
+        lu = splu(M.tocsc())
+        coef = lu.solve(Aw.T @ (self.sw * self.y))
+        out = coef[:P.shape[1]], coef[P.shape[1]:]
+        return (*out, (Aw, lu)) if factor else out
+
+    def solve_background(self, P, intensities):
+        rest = self.y - P @ intensities
+        Bw = self.bg * self.sw[:, None]
+        coef, *_ = np.linalg.lstsq(Bw, rest * self.sw, rcond=None)
+        return coef
+
+    def lebail_intensities(self, P, intensities, bg_coef, n_iter=3):
+        """Le Bail partitioning of the observed (background-free) pattern."""
+        obs = np.maximum(self.y - self.bg @ bg_coef, 0.0)
+        step = np.gradient(self.x)
+        for _ in range(n_iter):
+            calc = P @ intensities
+            ratio = np.where(calc > 1e-12, obs / np.maximum(calc, 1e-12), 0.0)
+            intensities = intensities * (P.T @ (ratio * step))
+        return intensities
+
+
+def _fit_subset(residual, jacobian, p, free, intensities, lower, upper, max_nfev):
+    """least_squares over p[free] only; returns the result with .x as the full vector."""
+    def full(q):
+        out = p.copy()
+        out[free] = q
+        return out
+
+    fit = least_squares(lambda q: residual(full(q), intensities),
+                        p[free], jac=lambda q: jacobian(full(q), intensities)[:, free],
+                        bounds=(lower[free], upper[free]), x_scale="jac", max_nfev=max_nfev)
+    fit.x = full(fit.x)
+    return fit
+
+
+def _rfactors(y, calc, sw):
+    rwp = np.sqrt(np.sum((sw * (y - calc)) ** 2) / np.sum((sw * y) ** 2))
+    rp = np.sum(np.abs(y - calc)) / np.sum(np.abs(y))
+    return float(rwp), float(rp)
+
+
+def refine_pattern(x, y, cell, system="cubic", centering="P", wavelength=1.540562,
+                   method="pawley", zero=0.0, profile=(0.0, 0.0, 0.01), eta=0.5,
+                   n_bg=6, window=8.0, cycles=50, max_nfev=200, tol=1e-3):
+    """
+    Pawley or Le Bail refinement of one pattern.
+
+    cell: starting (a, b, c, α, β, γ) or just the free parameters of `system`.
+    profile: starting Caglioti (U, V, W) in degrees².
+    Both methods fit the non-linear parameters with an analytic
+    (variable-projection) Jacobian. Le Bail runs up to `cycles` rounds of
+    partitioning + fit per stage (cell and zero first, then everything) and
+    stops a stage when Rwp improves by less than a fraction `tol`; max_nfev
+    bounds each fit. Le Bail needs a starting cell close enough that most
+    reflections overlap their observed peaks; exactly overlapping
+    reflections share their intensity by the partition ratio.
+    Returns a dict with the refined cell, volume, zero, profile, background,
+    the reflection list with extracted intensities, the calculated pattern and
+    Rwp / Rp.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+    if system not in CRYSTAL_SYSTEMS:
+        raise ValueError(f"Bilinmeyen kristal sistemi: {system}")
+    cell = list(cell)
+    free = cell if len(cell) == len(CRYSTAL_SYSTEMS[system]) else free_cell(system, cell)
+    full = expand_cell(system, free)
+    hkl, mult = generate_hkl(full, wavelength, x[-1] + 2.0, centering=centering)
+    if hkl.size == 0:
+        raise ValueError("Bu hücre için tarama aralığında yansıma yok")
+    model = _Model(x, y, system, hkl, wavelength, n_bg, window)
+
+    p0 = np.array(list(free) + [zero, *profile, eta], dtype=float)
+    nc = model.n_cell
+    lower = np.full(p0.size, -np.inf)
+    upper = np.full(p0.size, np.inf)
+    lower[:nc] = [0.5 * v for v in free]
+    upper[:nc] = [1.5 * v for v in free]
+    lower[nc], upper[nc] = -1.0, 1.0                    # zero shift (°)
+    lower[nc + 3], upper[nc + 3] = 1e-6, 1.0            # W
+    lower[nc + 4], upper[nc + 4] = 0.0, 1.0             # η
+    p0 = np.clip(p0, lower + 1e-12, upper - 1e-12)
+
+    cache = {}
+
+    def evaluate(p, intensities=None):
+        """Profile matrices (and the Pawley solution) at p, computed once for the
+        residual and the Jacobian of the same point."""
+        key = p.tobytes()
+        if cache.get("key") != key or cache.get("start") is not intensities:
+            mats = model.design(p, derivs=True)
+            cache.clear()
+            cache.update(key=key, start=intensities, mats=mats)
+            if intensities is None:
+                cache["I"], cache["bg"], cache["factor"] = model.solve_linear(mats[0], factor=True)
+            else:
+                # partition the observed pattern at p, so the intensities follow the cell
+                inten = model.lebail_intensities(mats[0], intensities, model.solve_background(mats[0], intensities),
+                                                  n_iter=10)
+                cache["I"] = inten
+                cache["bg"] = model.solve_background(mats[0], inten)
+        return cache
+
+    def residual(p, intensities=None):
+        c = evaluate(p, intensities)
+        return model.sw * (c["mats"][0] @ c["I"] + model.bg @ c["bg"] - y)
+
+    def jacobian(p, intensities=None):
+        # variable projection: the linear parameters are re-solved at every p, so the
+        # Jacobian is the weighted model derivative with their column space projected out
+        c = evaluate(p, intensities)
+        Jw = model.sw[:, None] * model.model_jacobian(p, c["mats"], c["I"])
+        if intensities is None:
+            Aw, lu = c["factor"]
+            return Jw - Aw @ lu.solve(np.asarray(Aw.T @ Jw))
+        return Jw - bg_q @ (bg_q.T @ Jw)
+
+    if method == "pawley":
+        fit = least_squares(residual, p0, jac=jacobian, bounds=(lower, upper), x_scale="jac", max_nfev=max_nfev)
+        p = fit.x
+        P = model.design(p)
+        inten, bgc = model.solve_linear(P)
+        nfev = fit.nfev
+    else:
+        bg_q = np.linalg.qr(model.bg * model.sw[:, None])[0]
+        p = p0
+        P = model.design(p)
+        inten, bgc = model.solve_linear(P)
+        inten = np.maximum(inten, 1e-6 * max(np.max(inten), 1.0))
+        nfev = 0
+        # Le Bail alternates partitioning and the non-linear fit until Rwp stops improving;
+        # the profile is held until the cell and zero have converged, otherwise broad
+        # peaks soak up the misfit of misplaced reflections (and the background)
+        for fitted in (np.arange(nc + 1), np.arange(p.size)):
+            best = None
+            for _ in range(cycles):
+                bgc = model.solve_background(P, inten)
+                inten = model.lebail_intensities(P, inten, bgc)
+                q = _fit_subset(residual, jacobian, p, fitted, inten, lower, upper, max_nfev)
+                nfev += q.nfev
+                p = q.x
+                inten = evaluate(p, inten)["I"]
+                P = model.design(p)
+                bgc = model.solve_background(P, inten)
+                rwp = _rfactors(y, P @ inten + model.bg @ bgc, model.sw)[0]
+                prev = np.inf if best is None else best[0]
+                if rwp < prev:
+                    best = (rwp, p, inten)
+                if rwp > prev * (1.0 - tol):
+                    break
+            _, p, inten = best
+            P = model.design(p)
+        bgc = model.solve_background(P, inten)
+
+    calc = P @ inten + model.bg @ bgc
+    rwp, rp = _rfactors(y, calc, model.sw)
+    tth, fwhm, _ = model.peaks(p)
+    cell_out, zero_out, U, V, W, eta_out = model.unpack(p)
+    return {
+        "method": method,
+        "system": system,
+        "centering": centering,
+        "cell": tuple(float(v) for v in cell_out),
+        "volume": float(cell_volume(cell_out)),
+        "zero": float(zero_out),
+        "profile": (float(U), float(V), float(W)),
+        "eta": float(eta_out),
+        "background": bgc,
+        "hkl": hkl,
+        "multiplicity": mult,
+        "two_theta": tth,
+        "fwhm": fwhm,
+        "intensity": inten,
+        "x": x,
+        "y_obs": y,
+        "y_calc": calc,
+        "rwp": rwp,
+        "rp": rp,
+        "nfev": int(nfev),
+    }
+
+
+def _refine_job(args):
+    x, y, kwargs = args
+    try:
+        return refine_pattern(x, y, **kwargs)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def refine_series(scans, processes=None, progress=None, **kwargs):
+    """
+    Refine every (x, y) scan of a series with the same starting model in a
+    process pool. Failed scans return {"error": message}. progress(fraction)
+    is called after every finished scan; if it returns False the scans not
+    yet started are dropped and None is returned.
+    """
+    jobs = [(np.asarray(x, dtype=float), np.asarray(y, dtype=float), kwargs) for x, y in scans]
+    results = [None] * len(jobs)
+    if processes == 1 or len(jobs) < 2:
+        for i, job in enumerate(jobs):
+            results[i] = _refine_job(job)
+            if progress is not None and progress((i + 1) / len(jobs)) is False:
+                return None
+        return results
+    pool = ProcessPoolExecutor(max_workers=processes)
+    try:
+        futures = {pool.submit(_refine_job, job): i for i, job in enumerate(jobs)}
+        for done, fut in enumerate(as_completed(futures), 1):
+            results[futures[fut]] = fut.result()
+            if progress is not None and progress(done / len(jobs)) is False:
+                return None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
@@ -0,0 +1,308 @@
+"""
+Sintering (furnace / dilatometer) logs: Time, Temperature, Displacement.
+
+Logs taken at 10 Hz over days have millions of rows. Analysis always runs
+on the full columns; only the display is reduced. MinMaxPyramid keeps, for
+buckets of base, base*fanout, base*fanout², ... rows, the row indices of the
+minimum and maximum of a column. A view of any time range picks the finest
+level that fits the pixel budget and returns real data points (the extremes
+of every bucket, in time order), so spikes and plateaus stay visible at
+every zoom while the line never has more than ~max_points vertices.
+TimeIndex answers "what were the columns at these times" for many times at
+once by binary search and interpolation.
+
+The kinetics functions derive shrinkage, shrinkage rate (Savitzky–Golay
+derivative), relative density and the onset / peak-rate temperatures from
+whole columns at once. They work along the last axis, so short runs of
+equal length can be analysed as one 2D stack; kinetics_batch groups them
+that way and runs long logs one by one.
+"""
+import numpy as np
+
+from .startup import lazy_import
+
+_signal = lazy_import("scipy.signal")
+pd = lazy_import("pandas")
+
+
+def _index_dtype(n):
+    return np.int32 if n < 2**31 else np.int64
+
+
+def _arg_extreme(vals, find_max):
+    """Row-wise argmin / argmax of a 2D block, ignoring NaN."""
+    if np.isnan(vals).any():
+        vals = np.where(np.isnan(vals), -np.inf if find_max else np.inf, vals)
+    return vals.argmax(axis=1) if find_max else vals.argmin(axis=1)
+
+
+def _raw_extremes(y, size):
+    """(argmin, argmax) rows of consecutive buckets of `size` rows of y (the last one may be short)."""
+    m = y.size // size
+    main = y[:m * size].reshape(m, size)
+    start = np.arange(m) * size
+    lo, hi = [start + _arg_extreme(main, False)], [start + _arg_extreme(main, True)]
+    if y.size > m * size:
+        tail = y[m * size:].reshape(1, -1)
+        lo.append(m * size + _arg_extreme(tail, False))
+        hi.append(m * size + _arg_extreme(tail, True))
+    return np.concatenate(lo), np.concatenate(hi)
+
+
+def _merge_extremes(y, rows, size, find_max):
+    """Rows of the extreme of y among each group of `size` consecutive entries of rows."""
+    pad = -rows.size % size
+    if pad:
+        rows = np.concatenate([rows, np.repeat(rows[-1:], pad)])
+    groups = rows.reshape(-1, size)
+    return groups[np.arange(groups.shape[0]), _arg_extreme(y[groups], find_max)]
+
+
+def _interleave(lo, hi):
+    """Time-ordered rows of both extremes; bucket j holds lo[j] and hi[j], so ordering
+    within each bucket orders the whole level."""
+    rows = np.empty(2 * lo.size, dtype=lo.dtype)
+    rows[0::2] = np.minimum(lo, hi)
+    rows[1::2] = np.maximum(lo, hi)
+    return rows[np.r_[True, rows[1:] != rows[:-1]]]
+
+
+class MinMaxPyramid:
+    """
+    Resolution levels of one column y over a sorted time axis t.
+
+    Level k summarises buckets of base * fanout**k rows by the indices of
+    their min and max; levels stop at min_buckets buckets, and short logs
+    get no levels at all (they are drawn raw). Index storage is at most 2 * n / base * fanout / (fanout - 1)
+    integers, independent of how often the view changes.
+    """
+
+    def __init__(self, t, y, base=16, fanout=4, min_buckets=512):
+        t = np.asarray(t, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if t.shape != y.shape:
+            raise ValueError("t ve y aynı uzunlukta olmalı")
+        if t.size > 1 and np.any(t[1:] < t[:-1]):
+            # the view uses binary search on time: keep a time-sorted copy
+            order = np.argsort(t, kind="stable")
+            t, y = t[order], y[order]
+        self.t, self.y = t, y
+        self.base, self.fanout = int(base), int(fanout)
+        self.levels = []  # (bucket size, time-ordered row indices)
+        if t.size <= 2 * min_buckets * self.base:
+            return
+        dtype = _index_dtype(t.size)
+        lo, hi = (a.astype(dtype) for a in _raw_extremes(y, self.base))
+        size = self.base
+        while True:
+            self.levels.append((size, _interleave(lo, hi)))
+            if lo.size <= min_buckets:
+                break
+            lo = _merge_extremes(y, lo, self.fanout, False)
+            hi = _merge_extremes(y, hi, self.fanout, True)
+            size *= self.fanout
+
+    def __len__(self):
+        return self.t.size
+
+    @property
+    def nbytes(self):
+        """Bytes of the summary levels (the data columns are not counted)."""
+        return sum(idx.nbytes for _, idx in self.levels)
+
+    def range_rows(self, t0=None, t1=None):
+        """(i0, i1) rows covering [t0, t1] plus one row on each side, so a line reaches the edges."""
+        i0 = 0 if t0 is None else max(0, int(np.searchsorted(self.t, t0, "left")) - 1)
+        i1 = self.t.size if t1 is None else min(self.t.size, int(np.searchsorted(self.t, t1, "right")) + 1)
+        return i0, i1
+
+    def level_for(self, n_rows, max_points):
+        """Index of the finest level drawing n_rows in at most max_points vertices; -1 = raw rows."""
+        if n_rows <= max_points:
+            return -1
+        for k, (size, _) in enumerate(self.levels):
+            if 2 * n_rows / size <= max_points:
+                return k
+        return len(self.levels) - 1
+
+    def view_rows(self, t0=None, t1=None, max_points=4000):
+        """Rows (of the time-sorted data) to draw for [t0, t1]: a slice when raw rows fit."""
+        i0, i1 = self.range_rows(t0, t1)
+        k = self.level_for(i1 - i0, max_points)
+        if k < 0:
+            return slice(i0, i1)
+        idx = self.levels[k][1]
+        j0, j1 = np.searchsorted(idx, [i0, i1])
+        # bucket extremes plus the first and last row of the range
+        rows = np.concatenate([[i0], idx[j0:j1], [i1 - 1]])
+        return rows[np.r_[True, rows[1:] != rows[:-1]]]
+
+    def view(self, t0=None, t1=None, max_points=4000):
+        """(t, y) to draw for the time range [t0, t1] (None = open end)."""
+        rows = self.view_rows(t0, t1, max_points)
+        return self.t[rows], self.y[rows]
+
+
+class TimeIndex:
+    """
+    Sorted time axis of a log for batch lookups. Built once per log (one
+    argsort if the log is not already in time order); every query is a
+    binary search, so looking up k times costs O(k log n) instead of a
+    full-column scan per time.
+    """
+
+    def __init__(self, t):
+        t = np.asarray(t, dtype=float)
+        self.order = None
+        if t.size > 1 and np.any(t[1:] < t[:-1]):
+            self.order = np.argsort(t, kind="stable")
+            t = t[self.order]
+        self.t = t
+
+    def __len__(self):
+        return self.t.size
+
+    def sorted(self, y):
+        """Column y in the time order of the index."""
+        y = np.asarray(y, dtype=float)
+        return y if self.order is None else y[self.order]
+
+    def nearest_rows(self, times):
+        """Row (of the original log) with the time closest to each of times."""
+        times = np.asarray(times, dtype=float)
+        pos = np.clip(np.searchsorted(self.t, times), 1, max(self.t.size - 1, 1))
+        left = self.t[pos - 1]
+        pos = pos - (np.abs(times - left) <= np.abs(self.t[np.minimum(pos, self.t.size - 1)] - times))
+        return pos if self.order is None else self.order[pos]
+
+    def interpolate(self, times, y):
+        """y linearly interpolated at each of times; NaN outside the logged time range."""
+        return np.interp(np.asarray(times, dtype=float), self.t, self.sorted(y), left=np.nan, right=np.nan)
+
+    def lookup(self, times, columns):
+        """{"Time": times, name: interpolated values} for a {name: column} mapping."""
+        times = np.asarray(times, dtype=float)
+        out = {"Time": times}
+        for name, y in columns.items():
+            out[name] = self.interpolate(times, y)
+        return out
+
+
+# --- sintering kinetics ---
+DENSITY_MODES = {"axial": 1, "isotropic": 3}  # shrinkage exponent (die-constrained / free sintering)
+
+
+def shrinkage(disp, length0, increasing=True):
+    """Linear shrinkage ΔL/L0 from the displacement (same unit as length0), zero at the first row.
+    increasing=True: the displacement grows as the sample shrinks (punch travel)."""
+    disp = np.asarray(disp, dtype=float)
+    s = (disp - disp[..., :1]) / float(length0)
+    return s if increasing else -s
+
+
+def time_derivative(t, y, window=101, polyorder=2):
+    """dy/dt along the last axis by Savitzky–Golay differentiation. Unevenly sampled time is
+    handled by differentiating t and y against the row index and taking the ratio."""
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = y.shape[-1]
+    window = min(int(window) | 1, n if n % 2 else n - 1)
+    polyorder = min(int(polyorder), window - 1)
+    if t.ndim == 1 and n > 1:
+        step = np.diff(t)
+        if step[0] > 0 and np.allclose(step, step[0], rtol=1e-6, atol=0):
+            # evenly sampled: one filter pass with the sample spacing
+            return _signal.savgol_filter(y, window, polyorder, deriv=1, delta=step[0], axis=-1)
+    dy = _signal.savgol_filter(y, window, polyorder, deriv=1, axis=-1)
+    dt = _signal.savgol_filter(np.broadcast_to(t, y.shape), window, polyorder, deriv=1, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dt != 0, dy / dt, np.nan)
+
+
+def relative_density(shrink, green_density, mode="axial"):
+    """Relative density from linear shrinkage: ρ = ρ0 / (1 − ΔL/L0)^k with k = 1 for
+    die-constrained (axial) and k = 3 for isotropic shrinkage."""
+    k = DENSITY_MODES[mode]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(green_density) / (1.0 - np.asarray(shrink, dtype=float)) ** k
+
+
+def _take(a, idx):
+    return np.take_along_axis(a, np.expand_dims(idx, -1), axis=-1)[..., 0]
+
+
+def kinetics(t, temp, disp, length0, window=101, polyorder=2, onset_fraction=0.05,
+             green_density=None, mode="axial", increasing=True):
+    """
+    Kinetics of one run (1D columns) or of a stack of equal-length runs (2D, one
+    run per row). Curves: "shrinkage" (ΔL/L0), "rate" (d(ΔL/L0)/dt, 1/s),
+    "density" (relative; only with green_density). Per run: "onset_T" and
+    "onset_time" (first row where the rate reaches onset_fraction of its
+    maximum), "peak_rate", "peak_rate_T", "peak_rate_time", "final_shrinkage",
+    "final_density".
+    """
+    t = np.asarray(t, dtype=float)
+    temp = np.asarray(temp, dtype=float)
+    s = shrinkage(disp, length0, increasing)
+    rate = time_derivative(t, s, window, polyorder)
+    filled = np.where(np.isnan(rate), -np.inf, rate)
+    peak = filled.argmax(axis=-1)
+    peak_rate = _take(rate, peak)
+    # first row at or above the threshold (the peak itself always is)
+    onset = (filled >= onset_fraction * np.expand_dims(peak_rate, -1)).argmax(axis=-1)
+    out = {
+        "shrinkage": s,
+        "rate": rate,
+        "onset_T": _take(np.broadcast_to(temp, s.shape), onset),
+        "onset_time": _take(np.broadcast_to(t, s.shape), onset),
+        "peak_rate": peak_rate,
+        "peak_rate_T": _take(np.broadcast_to(temp, s.shape), peak),
+        "peak_rate_time": _take(np.broadcast_to(t, s.shape), peak),
+        "final_shrinkage": s[..., -1],
+    }
+    if green_density:
+        out["density"] = relative_density(s, green_density, mode)
+        out["final_density"] = out["density"][..., -1]
+    return out
+
+
+SUMMARY_COLUMNS = {
+    "onset_T": "Başlangıç Sıcaklığı (°C)",
+    "peak_rate_T": "En Yüksek Hız Sıcaklığı (°C)",
+    "peak_rate_time": "En Yüksek Hız Zamanı (s)",
+    "peak_rate": "En Yüksek Hız (%/dk)",
+    "final_shrinkage": "Son Büzülme (%)",
+    "final_density": "Son Göreli Yoğunluk (%)",
+}
+_PERCENT = {"peak_rate": 100.0 * 60.0, "final_shrinkage": 100.0, "final_density": 100.0}
+
+
+def kinetics_batch(runs, stack_limit=2_000_000, **params):
+    """kinetics for a list of (t, temp, disp) runs, results in input order. Short runs
+    of equal length (up to stack_limit values in total) are analysed as one 2D stack;
+    long logs are done one at a time so no stacked copy of millions of rows is made."""
+    results = [None] * len(runs)
+    by_len = {}
+    for i, (_, _, disp) in enumerate(runs):
+        by_len.setdefault(len(disp), []).append(i)
+    for n, idx in by_len.items():
+        if len(idx) == 1 or n * len(idx) > stack_limit:
+            for i in idx:
+                results[i] = kinetics(*runs[i], **params)
+            continue
+        res = kinetics(*(np.vstack([np.asarray(runs[i][c], dtype=float) for i in idx]) for c in range(3)), **params)
+        for row, i in enumerate(idx):
+            results[i] = {k: v[row] for k, v in res.items()}
+    return results
+
+
+def summary_table(names, results):
+    """One row per run with the scalar kinetics (rates in %/min, shrinkage and density in %)."""
+    rows = []
+    for name, res in zip(names, results):
+        row = {"Run": name}
+        for key, label in SUMMARY_COLUMNS.items():
+            if key in res:
+                row[label] = float(res[key]) * _PERCENT.get(key, 1.0)
+        rows.append(row)
+    return pd.DataFrame(rows)
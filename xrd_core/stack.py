@@ -0,0 +1,161 @@
+"""
+Scans that share one 2θ grid, held as a single contiguous 2D array.
+
+Most series come from the same scan program, so their grids are identical
+and preprocessing recipes, normalization and export run as one NumPy call
+along axis=1 instead of a Python loop over DataFrames. Scans on different grids can be resampled
+onto a common one.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from . import recipe as _recipe
+from .ranges import range_indices
+
+NORMALIZE_MODES = ("max", "area", "minmax", "internal")
+
+
+def same_grid(xs, atol=1e-9):
+    """True if every x array equals the first one (within atol)."""
+    x0 = np.asarray(xs[0], dtype=float)
+    return all(len(x) == x0.size and np.allclose(x, x0, rtol=0.0, atol=atol) for x in xs[1:])
+
+
+def group_by_grid(xs, atol=1e-9):
+    """Lists of indices whose x arrays share a grid, in first-seen order."""
+    groups = []
+    for i, x in enumerate(xs):
+        x = np.asarray(x, dtype=float)
+        for g in groups:
+            x0 = np.asarray(xs[g[0]], dtype=float)
+            if x.size == x0.size and np.allclose(x, x0, rtol=0.0, atol=atol):
+                g.append(i)
+                break
+        else:
+            groups.append([i])
+    return groups
+
+
+def _range_slice(x, xrange):
+    i0, i1 = range_indices(x, xrange)
+    if i1 - i0 < 2:
+        lo, hi = sorted(xrange)
+        raise ValueError(f"{lo:g}–{hi:g}° aralığında yeterli nokta yok")
+    return slice(i0, i1)
+
+
+def normalization_params(x, Y, mode="max", xrange=None, ref=None, ref_window=0.3):
+    """
+    (offset, scale), each of shape (n_scans, 1), such that (Y - offset) / scale is
+    the normalized stack. Modes:
+
+    * "max": maximum = 1 (within xrange if given),
+    * "area": unit integrated area over xrange (whole scan by default),
+    * "minmax": [0, 1] within xrange,
+    * "internal": net height (max - min) of the internal-standard reflection
+      at 2θ = ref ± ref_window equals 1.
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    lo = np.zeros((len(Y), 1))
+    if mode == "internal":
+        if ref is None:
+            raise ValueError("İç standart yansımasının 2θ konumu gerekli")
+        xrange = (ref - ref_window, ref + ref_window)
+    sl = _range_slice(x, xrange)
+    Ys = Y[:, sl]
+    # blank cells from the table editors are NaN: ignore them instead of poisoning the scan
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN scans
+        if mode == "max":
+            scale = np.nanmax(Ys, axis=1, keepdims=True)
+        elif mode == "area":
+            seg = 0.5 * (Ys[:, 1:] + Ys[:, :-1]) * np.diff(x[sl])
+            scale = np.nansum(seg, axis=1, keepdims=True)
+        elif mode == "minmax":
+            lo = np.nanmin(Ys, axis=1, keepdims=True)
+            scale = np.nanmax(Ys, axis=1, keepdims=True) - lo
+        elif mode == "internal":
+            scale = np.nanmax(Ys, axis=1, keepdims=True) - np.nanmin(Ys, axis=1, keepdims=True)
+        else:
+            raise ValueError(f"Bilinmeyen normalizasyon: {mode}")
+    lo = np.where(np.isnan(lo), 0.0, lo)
+    return lo, np.where((scale == 0) | ~np.isfinite(scale), 1.0, scale)
+
+
+class DatasetStack:
+    """(n_scans, n_points) intensities Y on the shared grid x."""
+
+    def __init__(self, x, Y, names=None):
+        self.x = np.ascontiguousarray(x, dtype=float)
+        self.Y = np.ascontiguousarray(np.atleast_2d(Y), dtype=float)
+        if self.Y.shape[1] != self.x.size:
+            raise ValueError("Yoğunluk dizisi 2θ ızgarasıyla aynı uzunlukta olmalı")
+        self.names = list(names) if names is not None else [f"Dataset {i + 1}" for i in range(len(self.Y))]
+
+    @classmethod
+    def from_scans(cls, scans, names=None, resample=True, step=None):
+        """
+        Stack a list of (x, y). Scans on the same grid are copied as is;
+        otherwise, with resample=True, all are interpolated onto the common
+        2θ range with the finest step (or `step`).
+        """
+        xs = [np.asarray(x, dtype=float) for x, _ in scans]
+        ys = [np.asarray(y, dtype=float) for _, y in scans]
+        if not xs:
+            raise ValueError("Boş veri listesi")
+        if same_grid(xs):
+            return cls(xs[0], np.vstack(ys), names)
+        if not resample:
+            raise ValueError("Taramalar aynı 2θ ızgarasında değil")
+        lo = max(x.min() for x in xs)
+        hi = min(x.max() for x in xs)
+        if hi <= lo:
+            raise ValueError("Taramaların ortak 2θ aralığı yok")
+        if step is None:
+            step = min(np.median(np.abs(np.diff(x))) for x in xs)
+        grid = np.arange(lo, hi + step / 2, step)
+        grid = grid[grid <= hi]
+        Y = np.empty((len(ys), grid.size))
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            order = np.argsort(x, kind="stable")
+            Y[i] = np.interp(grid, x[order], y[order])
+        return cls(grid, Y, names)
+
+    def __len__(self):
+        return len(self.Y)
+
+    @property
+    def shape(self):
+        return self.Y.shape
+
+    def with_values(self, Y):
+        """A stack with the same grid and names and new intensities."""
+        return DatasetStack(self.x, Y, self.names)
+
+    # --- batch operations (one call over axis=1) ---
+    def apply(self, steps, meta=None):
+        """
+        Run preprocessing recipe steps (all from recipe.STACKABLE_STEPS) on every
+        scan at once; yields the stack after each step.
+        """
+        for Y in _recipe.iter_steps(self.x, self.Y, steps, meta):
+            yield self.with_values(Y)
+
+    def normalize(self, mode="max", xrange=None, ref=None, ref_window=0.3):
+        """Scale every scan (see normalization_params for the modes)."""
+        lo, scale = normalization_params(self.x, self.Y, mode, xrange, ref, ref_window)
+        return self.with_values((self.Y - lo) / scale)
+
+    def to_frame(self, x_label="2θ"):
+        """Wide table: the grid followed by one intensity column per scan."""
+        cols = {x_label: self.x}
+        for name, y in zip(self.names, self.Y):
+            key, n = str(name), 2
+            while key in cols:
+                key = f"{name}-{n}"
+                n += 1
+            cols[key] = y
+        return pd.DataFrame(cols)
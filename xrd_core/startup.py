@@ -0,0 +1,89 @@
+"""
+Startup helpers: deferred imports and time-to-first-window profiling.
+
+lazy_import returns a module object right away but only executes the module
+on its first attribute access, so heavy packages (scipy.signal, sklearn,
+pandas, the scipy-backed xrd_core kernels) cost nothing until a feature
+actually uses them.
+
+StartupProfiler records named time marks from a reference point (taken at
+the very top of the front-end script) and reports the time between them,
+plus which of the heavy modules were loaded before the window appeared.
+"""
+import importlib.util
+import os
+import sys
+import time
+
+# modules whose presence in sys.modules at first paint means a deferral leaked
+HEAVY_MODULES = ("pandas", "scipy.signal", "scipy.sparse", "scipy.optimize", "scipy.ndimage", "sklearn")
+
+
+def lazy_import(name):
+    """Module `name`, executed on first attribute access instead of now.
+    An already imported module is returned as is."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name):
+    """True when `name` has really been executed (not just registered lazily)."""
+    module = sys.modules.get(name)
+    if module is None:
+        return False
+    # a lazy module still has the _LazyModule class until it is touched
+    return not isinstance(module, importlib.util._LazyModule)
+
+
+class StartupProfiler:
+    """Named time marks relative to t0 (seconds from time.perf_counter)."""
+
+    def __init__(self, t0=None, enabled=True):
+        self.t0 = time.perf_counter() if t0 is None else float(t0)
+        self.enabled = bool(enabled)
+        self.marks = []
+
+    @classmethod
+    def from_argv(cls, t0=None, argv=None):
+        """Profiler enabled by a --profile-startup argument or the XRD_PROFILE_STARTUP variable."""
+        argv = sys.argv if argv is None else argv
+        return cls(t0, enabled="--profile-startup" in argv or bool(os.environ.get("XRD_PROFILE_STARTUP")))
+
+    def mark(self, label):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - self.t0))
+
+    def elapsed(self, label=None):
+        """Seconds from t0 to the mark `label` (the last mark if None); None if missing."""
+        for name, t in reversed(self.marks):
+            if label is None or name == label:
+                return t
+        return None
+
+    def report(self, stream=None):
+        """Write the marks with their increments and the heavy-module status."""
+        if not self.enabled:
+            return
+        stream = sys.stderr if stream is None else stream
+        lines = ["Başlangıç profili:"]
+        prev = 0.0
+        width = max((len(name) for name, _ in self.marks), default=0)
+        for name, t in self.marks:
+            lines.append(f"  {name:<{width}}  {t * 1000:8.1f} ms  (+{(t - prev) * 1000:.1f})")
+            prev = t
+        loaded = [m for m in HEAVY_MODULES if is_loaded(m)]
+        deferred = [m for m in HEAVY_MODULES if m not in loaded]
+        lines.append(f"  yüklü ağır modüller: {', '.join(loaded) or '-'}")
+        lines.append(f"  ertelenen: {', '.join(deferred) or '-'}")
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
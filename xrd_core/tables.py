@@ -0,0 +1,189 @@
+"""
+Array-backed table editing.
+
+The data table editors keep the scan as one (rows, columns) float64 array.
+Only the cells the view draws are turned into text; pasted blocks are parsed
+in one step and fill / arithmetic act on a boolean selection mask, so edits
+go straight into the array without a per-cell round trip through strings.
+
+Editors over a DataFrame with mixed column types record edits in an EditLog
+instead: only the dirty cells are kept (as text), and committing converts
+each edited column in one step to that column's dtype and writes it back
+with a single assignment. Listeners get the changed columns and rows, so a
+plot only has to update the artists drawn from those columns.
+"""
+import numpy as np
+
+from .startup import lazy_import
+
+pd = lazy_import("pandas")
+
+# operator -> (ufunc, Turkish label)
+OPERATIONS = {
+    "+": (np.add, "Ekle (+)"),
+    "-": (np.subtract, "Çıkar (−)"),
+    "*": (np.multiply, "Çarp (×)"),
+    "/": (np.divide, "Böl (÷)"),
+}
+
+
+def format_value(v, full=False):
+    """Cell text: 10 significant digits for display, round-trip repr for editing; NaN is blank."""
+    v = float(v)
+    if np.isnan(v):
+        return ""
+    return repr(v) if full else f"{v:.10g}"
+
+
+def parse_number(text):
+    """float from cell text; blank -> NaN, anything else that is not a number -> None."""
+    text = str(text).strip()
+    if not text:
+        return np.nan
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def format_cell(v):
+    """Cell text of any DataFrame value (missing values are blank)."""
+    if isinstance(v, (float, np.floating)):
+        return format_value(v)
+    if v is None or v is pd.NaT or (not isinstance(v, str) and pd.isna(v)):
+        return ""
+    return str(v)
+
+
+def parse_block(text):
+    """(rows, columns) float array from pasted text. Rows are lines; columns are
+    separated by tabs, commas or spaces. Short rows, blank and non-numeric cells become NaN;
+    tab separated text (as copied by format_block) keeps its empty cells in place."""
+    lines = [line for line in str(text).strip("\r\n").splitlines() if line.strip()]
+    if any("\t" in line for line in lines):
+        rows = [[tok.strip() or "nan" for tok in line.split("\t")] for line in lines]
+    else:
+        rows = [line.replace(",", " ").split() for line in lines]
+    if not rows:
+        return np.empty((0, 0))
+    width = max(len(r) for r in rows)
+    tokens = np.array([r + ["nan"] * (width - len(r)) for r in rows])
+    try:
+        return tokens.astype(float)
+    except ValueError:
+        # at least one bad token: convert the rest, bad ones become NaN
+        out = np.full(tokens.shape, np.nan)
+        for idx, tok in np.ndenumerate(tokens):
+            v = parse_number(tok)
+            if v is not None:
+                out[idx] = v
+        return out
+
+
+def format_block(values):
+    """Tab/newline separated text of a 2D array (for the clipboard)."""
+    return "\n".join("\t".join(format_value(v, full=True) for v in row) for row in np.atleast_2d(values))
+
+
+def apply_operation(values, mask, op, operand):
+    """In place: values[mask] = values[mask] <op> operand, or = operand for op "=" (fill)."""
+    if op == "=":
+        values[mask] = operand
+        return values
+    fn = OPERATIONS[op][0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values[mask] = fn(values[mask], operand)
+    return values
+
+
+def mask_bounds(mask):
+    """(top, left, bottom, right) inclusive bounding box of the True cells; None if there are none."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not rows.size:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(rows[0]), int(cols[0]), int(rows[-1]), int(cols[-1])
+
+
+# --- typed writeback of edited DataFrame cells ---
+_TRUE = ("true", "1", "evet", "yes")
+_FALSE = ("false", "0", "hayır", "hayir", "no")
+
+
+def convert_column(texts, dtype):
+    """Convert the edited texts of one column to its dtype in one step.
+    Returns (values, ok): ok is False where a text does not fit the dtype
+    (those cells are not written). Blank is NaN / NaT where the dtype allows it."""
+    texts = np.char.strip(np.asarray(texts, dtype=str))
+    blank = texts == ""
+    api = pd.api.types
+    if api.is_bool_dtype(dtype):
+        low = np.char.lower(texts)
+        true = np.isin(low, _TRUE)
+        return true, true | np.isin(low, _FALSE)
+    if api.is_datetime64_any_dtype(dtype):
+        parsed = pd.to_datetime(pd.Series(texts), errors="coerce")
+        return parsed.to_numpy(), parsed.notna().to_numpy() | blank
+    if api.is_numeric_dtype(dtype):
+        num = pd.to_numeric(pd.Series(np.where(blank, "nan", texts)), errors="coerce").to_numpy(dtype=float)
+        if api.is_integer_dtype(dtype):
+            ok = np.isfinite(num) & (num == np.round(num))
+            return np.where(ok, num, 0).astype(getattr(dtype, "numpy_dtype", dtype)), ok
+        return num.astype(dtype), ~np.isnan(num) | blank
+    return texts.astype(object), np.ones(texts.shape, dtype=bool)
+
+
+class EditLog:
+    """
+    Dirty cells of a DataFrame editor and the log of applied edits.
+
+    set() only records text; commit() groups the dirty cells by column,
+    converts each column with convert_column and writes it with one iloc
+    assignment, so the frame keeps its dtypes. Cells that do not fit their
+    column stay pending. Every commit appends an entry
+    {"columns": {name: rows}, "count": n, "rejected": n} and is passed to
+    the listeners.
+    """
+
+    def __init__(self, max_entries=100):
+        self.pending = {}
+        self.entries = []
+        self.listeners = []
+        self.max_entries = int(max_entries)
+
+    def set(self, row, col, text):
+        self.pending[(int(row), int(col))] = str(text)
+
+    def get(self, row, col, default=None):
+        return self.pending.get((row, col), default)
+
+    def __len__(self):
+        return len(self.pending)
+
+    def clear(self):
+        self.pending = {}
+
+    def commit(self, df):
+        """Write the pending cells into df in place; returns the log entry."""
+        by_col = {}
+        for (r, c), text in self.pending.items():
+            rows, texts = by_col.setdefault(c, ([], []))
+            rows.append(r)
+            texts.append(text)
+        changed, kept, count = {}, {}, 0
+        for c, (rows, texts) in by_col.items():
+            rows = np.asarray(rows, dtype=np.intp)
+            values, ok = convert_column(texts, df.dtypes.iloc[c])
+            if ok.any():
+                df.iloc[rows[ok], c] = values[ok]
+                changed[df.columns[c]] = rows[ok]
+                count += int(ok.sum())
+            for r in rows[~ok]:
+                kept[(int(r), c)] = self.pending[(int(r), c)]
+        self.pending = kept
+        entry = {"columns": changed, "count": count, "rejected": len(kept)}
+        self.entries.append(entry)
+        del self.entries[:-self.max_entries]
+        for fn in self.listeners:
+            fn(entry)
+        return entry
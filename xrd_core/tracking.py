@@ -0,0 +1,108 @@
+"""
+Follow reflections through an in-situ (temperature / time) scan series.
+
+Peaks of consecutive scans are linked with a gated optimal assignment
+(Hungarian algorithm on |Δ2θ|). Tracks that are not matched stay open for
+`max_gap` scans so a reflection that drops below the detection limit for a
+scan or two keeps its identity; unmatched peaks start new tracks.
+"""
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+
+from .peaks import compute_fwhm
+
+
+def collect_peaks(scans, peaks):
+    """
+    Per-scan peak arrays for tracking.
+    scans: list of (x, y); peaks: list of index arrays (one per scan).
+    Returns a list of (position, intensity, fwhm) tuples.
+    """
+    out = []
+    for (x, y), p in zip(scans, peaks):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        p = np.asarray(p, dtype=np.intp)
+        out.append((x[p], y[p], compute_fwhm(x, y, p)))
+    return out
+
+
+def link_peaks(positions, max_shift=0.2, max_gap=2):
+    """
+    Assign a track id to every peak of every scan.
+    positions: list of 1D arrays of peak positions (one per scan).
+    Returns a list of int arrays of the same shapes.
+    """
+    big = 1e6
+    track_ids = []
+    last_pos = np.empty(0)       # last known position of every track
+    last_scan = np.empty(0, int)  # scan index where the track was last seen
+    for s, pos in enumerate(positions):
+        pos = np.asarray(pos, dtype=float)
+        ids = np.full(pos.size, -1, dtype=int)
+        active = np.flatnonzero(s - last_scan <= max_gap + 1) if last_scan.size else np.empty(0, int)
+        if active.size and pos.size:
+            cost = np.abs(pos[:, None] - last_pos[active][None, :])
+            gated = cost <= max_shift
+            # only solve the rows/columns that have at least one candidate in the window
+            rows = np.flatnonzero(gated.any(axis=1))
+            cols = np.flatnonzero(gated.any(axis=0))
+            if rows.size and cols.size:
+                sub = np.where(gated[np.ix_(rows, cols)], cost[np.ix_(rows, cols)], big)
+                r, c = linear_sum_assignment(sub)
+                keep = sub[r, c] < big
+                ids[rows[r[keep]]] = active[cols[c[keep]]]
+        new = np.flatnonzero(ids < 0)
+        if new.size:
+            ids[new] = np.arange(last_pos.size, last_pos.size + new.size)
+            last_pos = np.concatenate([last_pos, np.zeros(new.size)])
+            last_scan = np.concatenate([last_scan, np.zeros(new.size, int)])
+        last_pos[ids] = pos
+        last_scan[ids] = s
+        track_ids.append(ids)
+    return track_ids
+
+
+def track_series(peak_data, labels=None, max_shift=0.2, max_gap=2, min_length=3):
+    """
+    Link peaks through a series and return a tidy trajectory table with one
+    row per (track, scan): Track, Scan, Label, 2θ, Shift, Intensity, FWHM.
+    Shift is relative to the first position of the track. Tracks seen in
+    fewer than min_length scans are dropped.
+    peak_data: list of (position, intensity, fwhm) per scan (see collect_peaks).
+    """
+    n_scans = len(peak_data)
+    if labels is None:
+        labels = np.arange(n_scans)
+    labels = np.asarray(labels, dtype=object)
+    ids = link_peaks([p[0] for p in peak_data], max_shift=max_shift, max_gap=max_gap)
+    counts = np.array([len(i) for i in ids], dtype=int)
+    if counts.sum() == 0:
+        return pd.DataFrame(columns=["Track", "Scan", "Label", "2θ", "Shift", "Intensity", "FWHM"])
+    track = np.concatenate(ids)
+    scan = np.repeat(np.arange(n_scans), counts)
+    pos = np.concatenate([p[0] for p in peak_data])
+    inten = np.concatenate([p[1] for p in peak_data])
+    fwhm = np.concatenate([p[2] for p in peak_data])
+
+    length = np.bincount(track)
+    keep = length[track] >= min_length
+    track, scan, pos, inten, fwhm = track[keep], scan[keep], pos[keep], inten[keep], fwhm[keep]
+    # order by track then scan; renumber surviving tracks by mean position
+    order = np.lexsort((scan, track))
+    track, scan, pos, inten, fwhm = track[order], scan[order], pos[order], inten[order], fwhm[order]
+    uniq, first, inv = np.unique(track, return_index=True, return_inverse=True)
+    mean_pos = np.bincount(inv, weights=pos) / np.bincount(inv)
+    rank = np.empty(uniq.size, int)
+    rank[np.argsort(mean_pos)] = np.arange(uniq.size)
+    shift = pos - pos[first][inv]
+    return pd.DataFrame({
+        "Track": rank[inv],
+        "Scan": scan,
+        "Label": labels[scan],
+        "2θ": pos,
+        "Shift": shift,
+        "Intensity": inten,
+        "FWHM": fwhm,
+    }).sort_values(["Track", "Scan"], kind="stable").reset_index(drop=True)
@@ -1,13 +1,19 @@
 import sys
 import json
-import numpy as np
-import pandas as pd
+import time
+_STARTUP_T0 = time.perf_counter()
 import matplotlib
 matplotlib.use('Qt5Agg')
 import matplotlib.pyplot as plt
-from scipy.signal import find_peaks, savgol_filter
-from scipy import sparse
-from scipy.sparse.linalg import spsolve
+
+from xrd_core.startup import StartupProfiler, lazy_import
+
+# heavy modules are executed on first use
+pd = lazy_import("pandas")
+signal = lazy_import("scipy.signal")
+xrd_baseline = lazy_import("xrd_core.baseline")
+xrd_peaks = lazy_import("xrd_core.peaks")
+loaders = lazy_import("xrd_core.loaders")
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -15,7 +21,7 @@ from PyQt5.QtWidgets import (
     QInputDialog, QDialog, QTableWidget, QTableWidgetItem, QMessageBox,
     QMenu, QAction, QFontDialog, QDoubleSpinBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 
@@ -145,9 +151,7 @@ class XRDViewer(QMainWindow):
         if not path:
             return
         try:
-            df = pd.read_csv(path, sep=None, engine='python', header=None)
-            if df.shape[1] < 2:
-                raise ValueError("Dosya iki sütun içermeli")
+            df = loaders.read_xy_frame(path)
             name = path.split('/')[-1]
             self.datasets.append({"name": name, "df": df, "color": None, "offset": 0.0})
             self.redraw()
@@ -306,7 +310,7 @@ class XRDViewer(QMainWindow):
             d = self.datasets[0]
             x = d['df'].iloc[:,0].values
             y = d['df'].iloc[:,1].values
-            peaks, _ = find_peaks(y, height=max(y)*0.1)
+            peaks = xrd_peaks.find_relative_peaks(y, 0.1)
             self.ax.plot(x[peaks], y[peaks], 'ro', label='Peaks')
             self.ax.legend()
             self.canvas.draw()
@@ -325,7 +329,7 @@ class XRDViewer(QMainWindow):
             return
         for d in self.datasets:
             y = d['df'].iloc[:,1].values
-            d['df'].iloc[:,1] = savgol_filter(y, win, poly)
+            d['df'].iloc[:,1] = signal.savgol_filter(y, win, poly)
         self.redraw()
 
     def baseline_als(self):
@@ -339,14 +343,7 @@ class XRDViewer(QMainWindow):
             return
         for d in self.datasets:
             y = d['df'].iloc[:,1].values
-            L = len(y)
-            D = sparse.diags([1,-2,1],[0,-1,-2], shape=(L,L-2)).T
-            w = np.ones(L)
-            for _ in range(10):
-                W = sparse.spdiags(w, 0, L, L)
-                Z = W + lam * (D.T @ D)
-                z = spsolve(Z, w*y)
-                w = p*(y>z) + (1-p)*(y<z)
+            z = xrd_baseline.als(y, lam=lam, p=p, niter=10)
             d['df'].iloc[:,1] = y - z
         self.redraw()
 
@@ -356,10 +353,16 @@ class XRDViewer(QMainWindow):
 
 
 def main():
+    # --profile-startup (or XRD_PROFILE_STARTUP=1) prints time-to-first-window to stderr
+    profiler = StartupProfiler.from_argv(_STARTUP_T0)
+    profiler.mark("içe aktarmalar")
     app = QApplication(sys.argv)
     viewer = XRDViewer()
     viewer.resize(900, 600)
+    profiler.mark("pencere kuruldu")
     viewer.show()
+    if profiler.enabled:
+        QTimer.singleShot(0, lambda: (profiler.mark("ilk pencere görüntülendi"), profiler.report()))
     sys.exit(app.exec_())
 
 